@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import date
 from sqlalchemy.future import select
 from sqlalchemy import func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
-from app.models.schemas import User, Event
+from app.models.schemas import User, Event, ScrapeJob, IngestRun
 from app.auth import get_current_user
+from app.services.event_query import EventFilterSpec, fetch_event_page
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
@@ -64,27 +66,76 @@ async def get_users(
 async def get_events(
     page: int = 1,
     limit: int = 10,
+    cursor: str = None,
     session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     offset = (page - 1) * limit
     
-    # Total Count
-    count_res = await session.execute(select(func.count(Event.id)))
-    total = count_res.scalar()
-    
-    # Paginated Events
-    result = await session.execute(
-        select(Event)
-        .order_by(Event.start_time.asc())
-        .offset(offset)
-        .limit(limit)
-    )
-    events = result.scalars().all()
+    # Paginated Events + Total Count in one query (keyset when a cursor is given)
+    try:
+        events, total, next_cursor = await fetch_event_page(
+            session,
+            EventFilterSpec(),
+            order="start",
+            limit=limit,
+            offset=offset,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     return {
         "data": events,
         "total": total,
         "page": page,
-        "limit": limit
+        "limit": limit,
+        "next_cursor": next_cursor
     }
+
+@router.get("/scrape-jobs")
+async def get_scrape_jobs(
+    run_date: str = None,  # 'YYYY-MM-DD', defaults to today
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Progress of the daily scrape plan: one row per city/category/page job.
+    """
+    run_date = run_date or date.today().isoformat()
+    result = await session.execute(
+        select(ScrapeJob).where(ScrapeJob.run_date == run_date).order_by(ScrapeJob.scheduled_at, ScrapeJob.id)
+    )
+    jobs = result.scalars().all()
+
+    summary = {}
+    for job in jobs:
+        summary[job.status] = summary.get(job.status, 0) + 1
+
+    return {"run_date": run_date, "summary": summary, "jobs": jobs}
+
+@router.get("/ingest-runs")
+async def get_ingest_runs(
+    limit: int = 20,
+    trigger: str = None,  # scheduled, manual, sync, refresh
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Latest ingestion run summaries with the time spent per pipeline stage,
+    plus each stage's average over those runs to spot the one that regressed.
+    """
+    limit = max(1, min(limit, 200))
+    query = select(IngestRun).order_by(IngestRun.started_at.desc(), IngestRun.id.desc()).limit(limit)
+    if trigger:
+        query = query.where(IngestRun.trigger == trigger)
+    result = await session.execute(query)
+    runs = result.scalars().all()
+
+    totals = {}
+    for run in runs:
+        for name, seconds in (run.stage_seconds or {}).items():
+            totals[name] = totals.get(name, 0) + seconds
+    stage_averages = {name: round(seconds / len(runs), 3) for name, seconds in totals.items()}
+
+    return {"stage_averages": stage_averages, "runs": runs}
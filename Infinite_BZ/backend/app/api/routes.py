@@ -1,21 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy import delete
 from typing import List, Optional, Dict, Any
 import shutil
 import os
+import json
 
 from app.core.database import get_session
-from app.models.schemas import Event, UserRegistration, EventListResponse, User, EventCreate, Follow, TicketClass, TicketClassCreate
+from app.models.schemas import Event, EventCategory, EventOccurrence, UserRegistration, EventListResponse, User, EventCreate, Follow, TicketClass, TicketClassCreate
 from app.services.scraper import scrape_events_playwright # Async import
+from app.services.categorizer import assign_categories
+from app.services.geocoder import geocode_events
+from app.services.event_ingest import upsert_events
+from app.services.event_query import EventFilterSpec, fetch_event_page
+from app.services.facets import get_facet_counts
+from app.services.feed_cache import feed_cache, feed_cache_key
+from app.services.event_export import EXPORT_FORMATS, stream_events_export
+from app.services.autocomplete import autocomplete_index
+from app.services.event_changes import notify_events_changed
+from app.services.dedup import dedupe_events, release_duplicates
+from app.services.recurrence import sync_occurrences
+from app.services.ingest_metrics import ingest_run
 from app.auth import get_current_user
-from app.core.email_utils import generate_qr_code, send_event_ticket_email
+from app.core.email_utils import generate_qr_code
+from app.services.email_outbox import enqueue_ticket_email, outbox_sender
 from sqlmodel import SQLModel
 import uuid
 
 router = APIRouter()
 
+# Largest page GET /events serves; use GET /events/export for everything
+MAX_PAGE_SIZE = 100
+# GET /events/calendar range and size limits
+MAX_CALENDAR_DAYS = 62
+MAX_CALENDAR_SESSIONS = 1000
+
 # --- 1. SYNC (Admin Only / Debug) ---
 @router.post("/sync")
 async def sync_events(city: str = "chennai", session: AsyncSession = Depends(get_session)):
@@ -23,27 +45,18 @@ async def sync_events(city: str = "chennai", session: AsyncSession = Depends(get
     Triggers the Playwright Scraper
     """
     print(f"Starting Sync for {city}...")
-    try:
-        print("Calling scraper function...")
-        events_data = await scrape_events_playwright(city)
-        print("Scraper returned.")
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    
-    saved_count = 0
-    for data in events_data:
-        # Check duplicates via eventbrite_id
-        stmt = select(Event).where(Event.eventbrite_id == data["eventbrite_id"])
-        result = await session.execute(stmt)
-        existing = result.scalars().first()
+    # Stage timings + run summary (services/ingest_metrics.py)
+    async with ingest_run("sync"):
+        try:
+            print("Calling scraper function...")
+            events_data = await scrape_events_playwright(city)
+            print("Scraper returned.")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
         
-        if not existing:
-            new_event = Event(**data)
-            session.add(new_event)
-            saved_count += 1
-            
-    await session.commit()
-    return {"status": "success", "added": saved_count, "total_found": len(events_data)}
+        # Bulk upsert keyed on eventbrite_id (see services/event_ingest.py)
+        counts = await upsert_events(session, events_data)
+    return {"status": "success", "added": counts["inserted"], "updated": counts["updated"], "total_found": len(events_data)}
 
 # --- 1.5 CREATE EVENT (User Generated) ---
 
@@ -133,12 +146,22 @@ async def create_event(
         organizer_email=current_user.email,
         capacity=final_capacity,
         is_free=final_is_free,
+        is_native=True,
+        source="InfiniteBZ",
         raw_data=raw_data_dump
     )
+    geocode_events([new_event])
     
     session.add(new_event)
     await session.commit()
     await session.refresh(new_event)
+
+    # Classify into feed categories
+    await assign_categories(session, [new_event])
+    await sync_occurrences(session, [new_event.id])
+    # Hide scraped listings of the same event (services/dedup.py)
+    merged_ids = await dedupe_events(session, [new_event.id])
+    await session.commit()
     
     # Now create TicketClass records linked to this event
     if event_data.tickets:
@@ -149,6 +172,8 @@ async def create_event(
             )
             session.add(new_ticket)
         await session.commit()
+
+    await notify_events_changed([new_event.id] + merged_ids)
     
     return new_event
 
@@ -185,11 +210,19 @@ async def delete_event(
     delete_tickets_stmt = delete(TicketClass).where(TicketClass.event_id == event_id)
     await session.execute(delete_tickets_stmt)
 
+    # Delete category assignments and sessions
+    await session.execute(delete(EventCategory).where(EventCategory.event_id == event_id))
+    await session.execute(delete(EventOccurrence).where(EventOccurrence.event_id == event_id))
+
+    # Listings merged into this event (services/dedup.py) are shown again
+    released_ids = await release_duplicates(session, [event_id])
+
     # 4. Delete the event (Core delete to ensure order)
     delete_event_stmt = delete(Event).where(Event.id == event_id)
     await session.execute(delete_event_stmt)
 
     await session.commit()
+    await notify_events_changed([event_id] + released_ids)
 
     return {"status": "success", "message": "Event deleted"}
 
@@ -239,10 +272,18 @@ async def update_event(
         
     # Recalculate derived fields if needed (e.g. venue_name from mode)
     # For now assuming frontend sends correct venue_name/address via payload
+    geocode_events([event])
+
+    # Title/description may have changed, so re-classify
+    await assign_categories(session, [event])
     
     session.add(event)
+    await session.flush()
+    await sync_occurrences(session, [event.id])
+    merged_ids = await dedupe_events(session, [event.id])
     await session.commit()
     await session.refresh(event)
+    await notify_events_changed([event.id] + merged_ids)
     return event
 
 @router.get("/events/my-events")
@@ -253,30 +294,9 @@ async def get_my_events(
     """
     Fetch events created by the current user.
     """
-    # Query events where raw_data->>'created_by' matches email
-    # Note: JSONB querying in SQLModel/SQLAlchemy
-    from sqlalchemy import cast, String
-    from sqlalchemy.dialects.postgresql import JSONB
-    
-    # 1. Get Events
-    query = select(Event).where(
-        cast(Event.raw_data['created_by'], String) == f'"{current_user.email}"' 
-        # Note: JSON value might be quoted or not depending on driver. 
-        # Safest is often astext or explicit cast. 
-        # Let's try simple python filtration if list is small, or specific operator if large.
-        # Given potential complexities with JSON operators in asyncpg/sqlmodel, 
-        # let's fetch all "Source=InfiniteBZ" and filter in python for MVP reliability 
-        # unless we want to risk syntax errors.
-        # Actually, let's try the proper JSONB contains operator which is cleaner.
-    )
-    
-    # Alternative: Use the contains operator @>
-    # query = select(Event).where(Event.raw_data.contains({"created_by": current_user.email}))
-    
-    # Let's stick to the containment operator, it's standard PG.
-    stmt = select(Event).where(Event.raw_data.contains({"created_by": current_user.email}))
-    result = await session.execute(stmt)
-    my_events = result.scalars().all()
+    # 1. Get Events (raw_data @> {"created_by": email}, via the shared filter spec)
+    spec = EventFilterSpec(created_by=current_user.email)
+    my_events, _, _ = await fetch_event_page(session, spec, order="start")
     
     # 2. Calculate Stats
     active_count = len(my_events) # Assuming all are active for now
@@ -309,7 +329,7 @@ async def get_my_events(
 
 # --- 2. PUBLIC EVENTS API ---
 from sqlalchemy import func, select, or_, desc, cast, Date
-from datetime import datetime, date as date_type
+from datetime import datetime, timedelta, date as date_type
 @router.get("/events", response_model=EventListResponse) # Changed response model
 async def list_events(
     city: str = None,
@@ -319,173 +339,212 @@ async def list_events(
     is_free: str = None, # 'true', 'false', or None
     mode: str = None,    # 'online', 'offline', or None
     date: str = None,    # 'YYYY-MM-DD'
+    lat: float = None,   # Radius search around a point...
+    lon: float = None,
+    near: str = None,    # ...or around a place, e.g. 'Saidapet, Chennai'
+    radius_km: float = None,
     page: int = 1,
     limit: int = 10,
+    cursor: str = None,  # next_cursor from the previous response (preferred over page)
     session: AsyncSession = Depends(get_session)
 ):
     """
     Returns events with optional filtering (City, Search) and true pagination.
+    Pass `cursor` (next_cursor of the previous response) for constant-cost
+    infinite scrolling; `page` keeps working for old clients.
+    Responses are cached per normalized query (see services/feed_cache.py).
     """
-    from sqlalchemy import or_
+    # Bulk downloads go through GET /events/export, which streams
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    page = max(1, page)
+
+    cache_key = feed_cache_key(
+        city=city, category=category, search=search, source=source,
+        is_free=is_free, mode=mode, date=date,
+        lat=lat, lon=lon, near=near, radius_km=radius_km,
+        page=page, limit=limit, cursor=cursor
+    )
+    cached = await feed_cache.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    spec = EventFilterSpec(
+        city=city,
+        category=category,
+        search=search,
+        source=source,
+        is_free=is_free,
+        mode=mode,
+        date=date,
+        lat=lat,
+        lon=lon,
+        near=near,
+        radius_km=radius_km
+    )
 
-    offset = (page - 1) * limit
-    
-    # Base query for filtering
-    filter_query = select(Event)
-    
-    # 0. Category/Industry Filter (Keyword Search)
-    if category and category.lower() != "all":
-        # Broaden logic: Map category names to a list of related keywords
-        keyword_map = {
-            "startup": ["startup", "founder", "entrepreneur", "venture", "pitch", "funding", "incubator", "accelerator", "innovation"],
-            "business": ["business", "networking", "marketing", "sales", "finance", "leadership", "management", "corporate", "career", "resume", "job", "interview", "workshop", "money", "income", "profit", "ecommerce", "trade", "expo", "exhibition", "organization", "team", "strategy", "communication"],
-            "tech": ["tech", "software", "developer", "ai", "data", "code", "programming", "cloud", "security", "web", "digital", "cyber", "electronics", "engineering"],
-            "music": ["music", "concert", "live", "dj", "band", "festival", "performance"],
-            "sports": ["sport", "cricket", "football", "run", "marathon", "yoga", "fitness", "badminton"],
-            "arts": ["art", "design", "creative", "gallery", "painting"]
-        }
-        
-        # Get keywords for the selected category (default to just the category name if not in map)
-        search_keywords = keyword_map.get(category.lower(), [category.lower()])
-        
-        # Construct OR query for all keywords in Title OR Description
-        conditions = []
-        for kw in search_keywords:
-            kw_term = f"%{kw}%"
-            conditions.append(Event.title.ilike(kw_term))
-            conditions.append(Event.description.ilike(kw_term))
-            
-        filter_query = filter_query.where(or_(*conditions))
-        
-    # 1. City Filter
-    if city and city.lower() != "all":
-        filter_query = filter_query.where(Event.venue_address.ilike(f"%{city}%"))
-        
-    # 2. Search Filter (Title, Desc, Venue, Organizer)
-    if search:
-        search_term = f"%{search}%"
-        filter_query = filter_query.where(
-            or_(
-                Event.title.ilike(search_term),
-                Event.description.ilike(search_term),
-                Event.venue_name.ilike(search_term),
-                Event.venue_address.ilike(search_term),
-                Event.organizer_name.ilike(search_term)
-            )
-        )
-        
-    # 3. Source Filter (Platform)
-    if source and source.strip().lower() != "all":
-        # Check URL for the source name (e.g. 'eventbrite', 'meetup')
-        filter_query = filter_query.where(Event.url.ilike(f"%{source.strip()}%"))
-        # Add more sources here if needed
-        
-    # 4. Cost Filter
-    if is_free:
-        if is_free.lower() == "free":
-            filter_query = filter_query.where(Event.is_free == True)
-        elif is_free.lower() == "paid":
-            filter_query = filter_query.where(Event.is_free == False)
-            
-    # 5. Mode Filter
-    if mode:
-        if mode.lower() == "online":
-            filter_query = filter_query.where(Event.online_event == True)
-        elif mode.lower() == "offline":
-            filter_query = filter_query.where(Event.online_event == False)
-    
-    # 6. Date Filter
-    if date:
-        try:
-            filter_date = datetime.strptime(date, "%Y-%m-%d").date()
-            filter_query = filter_query.where(cast(Event.start_time, Date) == filter_date)
-        except ValueError:
-            pass # Ignore invalid date formats
-    
-    # 3. Get TOTAL Count (Count BEFORE applying limit/offset)
-    # We substitute the selection of 'Event' with 'count(Event.id)'
-    count_query = select(func.count(Event.id)).select_from(filter_query.subquery())
-    
-    # SQLAlchemy Async execution for count
-    # Note: Using subquery approach is safer for complex wheres
-    # Simplified: select(func.count()).select_from(Event).where(...)
-    
-    # Re-constructing count query cleanly:
-    count_stmt = select(func.count()).select_from(Event)
-    if city and city.lower() != "all":
-        count_stmt = count_stmt.where(Event.venue_address.ilike(f"%{city}%"))
-    if search:
-        search_term = f"%{search}%"
-        count_stmt = count_stmt.where(
-            or_(
-                Event.title.ilike(search_term),
-                Event.description.ilike(search_term),
-                Event.venue_name.ilike(search_term),
-                Event.venue_address.ilike(search_term),
-                Event.organizer_name.ilike(search_term)
-            )
+    # Page + total in one round-trip (see services/event_query.py)
+    try:
+        events, total_events, next_cursor = await fetch_event_page(
+            session, spec, limit=limit, offset=(page - 1) * limit, cursor=cursor
         )
-        
-    # Apply same filters to count_stmt
-    if category and category.lower() != "all":
-        keyword_map = {
-            "startup": ["startup", "founder", "entrepreneur", "venture", "pitch", "funding", "incubator", "accelerator", "innovation"],
-            "business": ["business", "networking", "marketing", "sales", "finance", "leadership", "management", "corporate", "career", "resume", "job", "interview", "workshop", "money", "income", "profit", "ecommerce", "trade", "expo", "exhibition", "organization", "team", "strategy", "communication"],
-            "tech": ["tech", "software", "developer", "ai", "data", "code", "programming", "cloud", "security", "web", "digital", "cyber", "electronics", "engineering"],
-            "music": ["music", "concert", "live", "dj", "band", "festival", "performance"],
-            "sports": ["sport", "cricket", "football", "run", "marathon", "yoga", "fitness", "badminton"],
-            "arts": ["art", "design", "creative", "gallery", "painting"]
-        }
-        search_keywords = keyword_map.get(category.lower(), [category.lower()])
-        
-        conditions = []
-        for kw in search_keywords:
-            kw_term = f"%{kw}%"
-            conditions.append(Event.title.ilike(kw_term))
-            conditions.append(Event.description.ilike(kw_term))
-            
-        count_stmt = count_stmt.where(or_(*conditions))
-        
-    if source and source.strip().lower() != "all":
-        count_stmt = count_stmt.where(Event.url.ilike(f"%{source.strip()}%"))
-
-    if is_free:
-        if is_free.lower() == "free":
-            count_stmt = count_stmt.where(Event.is_free == True)
-        elif is_free.lower() == "paid":
-            count_stmt = count_stmt.where(Event.is_free == False)
-
-    if mode:
-        if mode.lower() == "online":
-            count_stmt = count_stmt.where(Event.online_event == True)
-        elif mode.lower() == "offline":
-            count_stmt = count_stmt.where(Event.online_event == False)
-
-    if date:
-        try:
-            filter_date = datetime.strptime(date, "%Y-%m-%d").date()
-            count_stmt = count_stmt.where(cast(Event.start_time, Date) == filter_date)
-        except ValueError:
-            pass
-
-    count_result = await session.execute(count_stmt)
-    total_events = count_result.scalar()
-
-    # 4. Get DATA (Apply limit/offset)
-    # Order by InfiniteBZ events first (URL contains infinitebz.com), then by start_time
-    if limit >= 10000:
-        query = filter_query.order_by(Event.url.ilike("%infinitebz.com%").desc(), Event.start_time)
-    else:
-        query = filter_query.order_by(Event.url.ilike("%infinitebz.com%").desc(), Event.start_time).offset(offset).limit(limit)
-        
-    result = await session.execute(query)
-    events = result.scalars().all()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return EventListResponse(
+    response = EventListResponse(
         data=events,
         total=total_events,
         page=page,
-        limit=limit
+        limit=limit,
+        next_cursor=next_cursor
+    )
+    body = json.dumps(jsonable_encoder(response), separators=(",", ":")).encode()
+    await feed_cache.set(cache_key, body)
+    return Response(content=body, media_type="application/json")
+
+@router.get("/events/facets")
+async def get_event_facets(
+    city: str = None,
+    category: str = None,
+    search: str = None,
+    source: str = None,
+    is_free: str = None,
+    mode: str = None,
+    date: str = None,
+    lat: float = None,
+    lon: float = None,
+    near: str = None,
+    radius_km: float = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Counts per filter option (category, city, source, free/paid, mode, date)
+    under the current filters, for the events sidebar. Same query params as GET /events.
+    """
+    spec = EventFilterSpec(
+        city=city,
+        category=category,
+        search=search,
+        source=source,
+        is_free=is_free,
+        mode=mode,
+        date=date,
+        lat=lat,
+        lon=lon,
+        near=near,
+        radius_km=radius_km
+    )
+    return await get_facet_counts(session, spec)
+
+@router.get("/events/autocomplete")
+async def autocomplete_events(q: str = "", limit: int = 8):
+    """
+    Typeahead suggestions (event titles, organizers, venues) for the search box.
+    Served from the in-memory index in services/autocomplete.py, no database query.
+    """
+    limit = max(1, min(limit, 20))
+    return {"query": q, "suggestions": autocomplete_index.suggest(q, limit)}
+
+@router.get("/events/calendar")
+async def events_calendar(
+    start: str = None,   # 'YYYY-MM-DD', default today
+    days: int = 7,
+    city: str = None,
+    category: str = None,
+    search: str = None,
+    source: str = None,
+    is_free: str = None,
+    mode: str = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    One entry per session between `start` and `days` later, for calendar
+    views: each week of a recurring series is its own entry. Read from the
+    occurrence table (services/recurrence.py). Same filters as GET /events.
+    """
+    try:
+        range_start = datetime.strptime(start, "%Y-%m-%d") if start else datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="start must be YYYY-MM-DD")
+    days = max(1, min(days, MAX_CALENDAR_DAYS))
+
+    spec = EventFilterSpec(city=city, category=category, search=search, source=source, is_free=is_free, mode=mode)
+    query = (
+        select(
+            EventOccurrence.start_time, EventOccurrence.end_time,
+            Event.id, Event.title, Event.venue_name, Event.image_url, Event.url,
+            Event.is_free, Event.online_event, Event.recurrence
+        )
+        .select_from(Event)
+        .join(EventOccurrence, EventOccurrence.event_id == Event.id)
+    )
+    query, _ = spec.apply(query, session.bind.dialect.name)
+    query = (
+        query.where(
+            EventOccurrence.start_time >= range_start,
+            EventOccurrence.start_time < range_start + timedelta(days=days)
+        )
+        .order_by(EventOccurrence.start_time, Event.id)
+        .limit(MAX_CALENDAR_SESSIONS)
+    )
+    result = await session.execute(query)
+
+    sessions = [
+        {
+            "event_id": row.id,
+            "title": row.title,
+            "start_time": row.start_time,
+            "end_time": row.end_time,
+            "venue_name": row.venue_name,
+            "image_url": row.image_url,
+            "url": row.url,
+            "is_free": row.is_free,
+            "online_event": row.online_event,
+            "recurring": row.recurrence is not None,
+        }
+        for row in result.all()
+    ]
+    return {"start": range_start.date(), "days": days, "sessions": sessions}
+
+@router.get("/events/export")
+async def export_events(
+    format: str = "ndjson",  # 'ndjson' or 'csv'
+    city: str = None,
+    category: str = None,
+    search: str = None,
+    source: str = None,
+    is_free: str = None,
+    mode: str = None,
+    date: str = None,
+    lat: float = None,
+    lon: float = None,
+    near: str = None,
+    radius_km: float = None
+):
+    """
+    Streams every event matching the filters (same params as GET /events)
+    as NDJSON (one JSON object per line) or CSV.
+    """
+    fmt = format.lower()
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported format '{format}'. Use one of: {', '.join(EXPORT_FORMATS)}")
+
+    spec = EventFilterSpec(
+        city=city,
+        category=category,
+        search=search,
+        source=source,
+        is_free=is_free,
+        mode=mode,
+        date=date,
+        lat=lat,
+        lon=lon,
+        near=near,
+        radius_km=radius_km
+    )
+    return StreamingResponse(
+        stream_events_export(spec, fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="events.{fmt}"'}
     )
 
 @router.get("/events/{event_id}", response_model=Event)
@@ -531,7 +590,6 @@ class RegistrationPayload(SQLModel):
 async def register_for_event(
     event_id: int, 
     payload: RegistrationPayload,
-    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     session: AsyncSession = Depends(get_session)
 ):
@@ -560,12 +618,11 @@ async def register_for_event(
 
     # 3. MANUAL CONFIRMATION (API called after user confirms in UI)
     
-    # Generate a Self-Verified Confirmation ID
+    # Generate a Self-Verified Confirmation ID (unique within a signup burst)
     import time
-    from app.services.ticket_service import generate_ticket_pdf
-    from app.core.email_utils import send_ticket_email
+    from app.core.email_utils import ENABLE_EMAIL
     
-    confirmation_id = f"SELF-{int(time.time())}"
+    confirmation_id = f"SELF-{int(time.time())}-{uuid.uuid4().hex[:6].upper()}"
 
     new_reg = UserRegistration(
         event_id=event_id,
@@ -575,49 +632,26 @@ async def register_for_event(
         raw_data=payload.dict()
     )
     session.add(new_reg)
-    await session.commit()
-    
-    # --- NEW: Phase 1 Ticket Generation ---
-    # --- NEW: Phase 1 Ticket Generation ---
-    try:
-        # 1. Generate PDF
-        ticket_path = generate_ticket_pdf(
-            registration_id=confirmation_id,
-            event_title=event.title,
-            user_name=current_user.full_name or current_user.email,
-            event_date=event.start_time,
-            event_location=event.venue_name or "Online"
-        )
-        
-        # 2. Send Email (BACKGROUND TASK)
-        # We pass the async function send_ticket_email to background_tasks
-        background_tasks.add_task(
-            send_ticket_email,
-            email=current_user.email,
-            name=current_user.full_name or "Attendee",
-            event_title=event.title,
-            ticket_path=ticket_path
-        )
-        
-        email_status = "QUEUED_IN_BACKGROUND"
-        
-    except Exception as e:
-        print(f"Ticket Gen Error: {str(e)}")
-        email_status = f"ERROR: {str(e)}"
 
-    # Send QR code and PDF via email after successful registration
-    event_data = {
-        "id": event.id,
-        "title": event.title,
-        "start_time": event.start_time.strftime('%Y-%m-%d %H:%M %p'),
-        "venue_name": event.venue_name,
-        "organizer_name": event.organizer_name
-    }
-    email_sent = await send_event_ticket_email(current_user.email, event_data, confirmation_id, user_name=current_user.full_name)
+    # The ticket email goes into the outbox in the same transaction and is
+    # rendered and sent by the background sender (services/email_outbox.py);
+    # the same ticket file is served by GET /user/registrations/{event_id}/ticket
+    if ENABLE_EMAIL:
+        event_data = {
+            "id": event.id,
+            "title": event.title,
+            "start_time": event.start_time.strftime('%Y-%m-%d %H:%M %p'),
+            "venue_name": event.venue_name,
+            "organizer_name": event.organizer_name
+        }
+        enqueue_ticket_email(session, current_user.email, event_data, confirmation_id, user_name=current_user.full_name)
+    await session.commit()
+    outbox_sender.wake()
+    email_status = "QUEUED" if ENABLE_EMAIL else "EMAIL_DISABLED"
 
     message = "Registration verified and saved!"
-    if email_sent:
-        message += " Event ticket sent to your email."
+    if ENABLE_EMAIL:
+        message += " Event ticket will be sent to your email."
     else:
         message += " (Note: Email sending is not configured.)"
 
@@ -1033,13 +1067,55 @@ async def send_event_qr_email_route(
         "venue_name": event.venue_name,
         "organizer_name": event.organizer_name
     }
-    success = await send_event_ticket_email(current_user.email, event_data)
-
-    if success:
-        return {"status": "success", "message": "QR code and PDF sent to your email"}
-    else:
+    from app.core.email_utils import ENABLE_EMAIL
+    if not ENABLE_EMAIL:
         raise HTTPException(status_code=500, detail="Failed to send email")
 
+    # Queued with the registration's stored ticket; sent by the outbox sender
+    enqueue_ticket_email(session, current_user.email, event_data, registration.confirmation_id, user_name=current_user.full_name)
+    await session.commit()
+    outbox_sender.wake()
+    return {"status": "success", "message": "QR code and PDF will be sent to your email"}
+
+@router.get("/user/registrations/{event_id}/ticket")
+async def download_event_ticket(
+    event_id: int,
+    current_user: User = Depends(get_current_user),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Download the ticket PDF of a registered event (the same file that is emailed).
+    """
+    from app.services.ticket_service import get_ticket
+
+    stmt = select(UserRegistration).where(
+        UserRegistration.user_email == current_user.email,
+        UserRegistration.event_id == event_id,
+        UserRegistration.status == "SUCCESS"
+    )
+    result = await session.execute(stmt)
+    registration = result.scalars().first()
+    if not registration or not registration.confirmation_id:
+        raise HTTPException(status_code=403, detail="You are not registered for this event")
+
+    event = await session.get(Event, event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+
+    event_data = {
+        "id": event.id,
+        "title": event.title,
+        "start_time": event.start_time.strftime('%Y-%m-%d %H:%M %p'),
+        "venue_name": event.venue_name,
+        "organizer_name": event.organizer_name
+    }
+    ticket = await get_ticket(event_data, current_user.email, registration.confirmation_id, current_user.full_name)
+    return Response(
+        content=ticket.pdf,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="ticket_{registration.confirmation_id}.pdf"'}
+    )
+
 # --- 9. USER ACTIVITIES ENDPOINT ---
 @router.get("/user/activities")
 async def get_user_activities(
@@ -0,0 +1,150 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from app.core.metrics import counter
+
+class TTLCache:
+    """
+    Small in-process cache with a per-entry TTL and LRU eviction once
+    max_size entries are stored. Not shared between workers.
+    """
+
+    def __init__(self, ttl_seconds: float = 60, max_size: int = 512):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+
+        # Mark as most recently used
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+# --- Response cache (local LRU + optional shared Redis) ---
+
+
+REDIS_URL = os.getenv("REDIS_URL")
+
+cache_requests = counter("response_cache_requests_total", "Response cache lookups by namespace and result (hit_local, hit_shared, miss)")
+
+_redis_client = None
+_redis_checked = False
+
+def get_redis():
+    """
+    Returns a shared redis.asyncio client when REDIS_URL is set and the
+    optional `redis` package is installed, else None (local cache only).
+    """
+    global _redis_client, _redis_checked
+    if _redis_checked:
+        return _redis_client
+
+    _redis_checked = True
+    if not REDIS_URL:
+        return None
+    try:
+        import redis.asyncio as redis_asyncio
+        _redis_client = redis_asyncio.from_url(REDIS_URL)
+        print(f"Response cache: sharing entries via {REDIS_URL}")
+    except ImportError:
+        print("WARNING: REDIS_URL is set but the 'redis' package is not installed. Using local cache only.")
+    return _redis_client
+
+class ResponseCache:
+    """
+    Caches serialized responses (bytes) per key.
+
+    Level 1 is a per-worker TTL/LRU cache. When REDIS_URL is configured,
+    entries are also stored in Redis so every worker shares hits.
+    Invalidation bumps a version number (a Redis counter when shared), and
+    the version is part of every key, so stale entries are simply never read
+    again and age out via TTL / LRU.
+    """
+
+    def __init__(self, namespace: str, ttl_seconds: float = 30, max_size: int = 1024):
+        self.namespace = namespace
+        self.ttl_seconds = ttl_seconds
+        self.local = TTLCache(ttl_seconds=ttl_seconds, max_size=max_size)
+        self._local_version = 0
+
+    @property
+    def _version_key(self) -> str:
+        return f"cache:{self.namespace}:version"
+
+    async def _version(self, redis) -> int:
+        if redis is None:
+            return self._local_version
+        try:
+            value = await redis.get(self._version_key)
+            return int(value or 0)
+        except Exception as e:
+            print(f"Response cache: redis unavailable ({e})")
+            return -1  # never matches a stored version, so nothing stale is served
+
+    async def get(self, key: str) -> Optional[bytes]:
+        redis = get_redis()
+        version = await self._version(redis)
+
+        value = self.local.get((version, key))
+        if value is not None:
+            cache_requests.inc(namespace=self.namespace, result="hit_local")
+            return value
+
+        if redis is not None and version >= 0:
+            try:
+                value = await redis.get(f"cache:{self.namespace}:{version}:{key}")
+            except Exception:
+                value = None
+            if value is not None:
+                self.local.set((version, key), value)
+                cache_requests.inc(namespace=self.namespace, result="hit_shared")
+                return value
+
+        cache_requests.inc(namespace=self.namespace, result="miss")
+        return None
+
+    async def set(self, key: str, value: bytes):
+        redis = get_redis()
+        version = await self._version(redis)
+        if version < 0:
+            return
+
+        self.local.set((version, key), value)
+        if redis is not None:
+            try:
+                await redis.set(f"cache:{self.namespace}:{version}:{key}", value, ex=int(self.ttl_seconds))
+            except Exception as e:
+                print(f"Response cache: failed to store in redis ({e})")
+
+    async def invalidate(self):
+        self._local_version += 1
+        self.local.clear()
+
+        redis = get_redis()
+        if redis is not None:
+            try:
+                await redis.incr(self._version_key)
+            except Exception as e:
+                print(f"Response cache: failed to bump redis version ({e})")
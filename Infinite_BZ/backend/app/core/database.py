@@ -20,9 +20,16 @@ if "postgresql" in DATABASE_URL and not DATABASE_URL.startswith("postgresql+asyn
 engine = create_async_engine(DATABASE_URL, echo=False, future=True)
 
 async def init_db():
+    from app.services.search_index import init_search_index
+    from app.services.geo_index import init_geo_index
+
     async with engine.begin() as conn:
         # verify that tables exist
         await conn.run_sync(SQLModel.metadata.create_all)
+        # full-text search column / FTS table + triggers
+        await init_search_index(conn)
+        # PostGIS / R-tree index for radius search
+        await init_geo_index(conn)
 
 async def get_session() -> AsyncSession:
     async_session = sessionmaker(
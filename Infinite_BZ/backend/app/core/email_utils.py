@@ -18,22 +18,30 @@ MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
 MAIL_FROM = os.getenv("MAIL_FROM", MAIL_USERNAME) # Default to username if not set
 MAIL_PORT = int(os.getenv("MAIL_PORT", 587))
 MAIL_SERVER = os.getenv("MAIL_SERVER", "smtp.gmail.com")
+MAIL_STARTTLS = os.getenv("MAIL_STARTTLS", "true").lower() == "true"
+MAIL_SSL_TLS = os.getenv("MAIL_SSL_TLS", "false").lower() == "true"
+# false for a local relay / SMTP sink (see run_smtp_sink.py) that takes mail without login
+MAIL_USE_CREDENTIALS = os.getenv("MAIL_USE_CREDENTIALS", "true").lower() == "true"
 
 # Check for Real SMTP and valid credentials
-ENABLE_EMAIL = bool(MAIL_USERNAME and MAIL_PASSWORD and not MAIL_USERNAME.startswith("your_") and not MAIL_PASSWORD.startswith("your_"))
+if MAIL_USE_CREDENTIALS:
+    ENABLE_EMAIL = bool(MAIL_USERNAME and MAIL_PASSWORD and not MAIL_USERNAME.startswith("your_") and not MAIL_PASSWORD.startswith("your_"))
+else:
+    MAIL_FROM = MAIL_FROM or "noreply@infinitebz.com"
+    ENABLE_EMAIL = True
 
 conf = None
 if ENABLE_EMAIL:
     try:
         conf = ConnectionConfig(
-            MAIL_USERNAME = MAIL_USERNAME,
-            MAIL_PASSWORD = MAIL_PASSWORD,
+            MAIL_USERNAME = MAIL_USERNAME or "",
+            MAIL_PASSWORD = MAIL_PASSWORD or "",
             MAIL_FROM = MAIL_FROM,
             MAIL_PORT = MAIL_PORT,
             MAIL_SERVER = MAIL_SERVER,
-            MAIL_STARTTLS = True,
-            MAIL_SSL_TLS = False,
-            USE_CREDENTIALS = True,
+            MAIL_STARTTLS = MAIL_STARTTLS,
+            MAIL_SSL_TLS = MAIL_SSL_TLS,
+            USE_CREDENTIALS = MAIL_USE_CREDENTIALS,
             VALIDATE_CERTS = True
         )
     except Exception as e:
@@ -137,6 +145,8 @@ def generate_qr_code(data: str) -> str:
 def generate_event_ticket_pdf(event_data: dict, qr_base64: str, user_email: str, unique_ticket_id: str, user_name: str = None) -> BytesIO:
     """
     Generate a beautifully styled vertical PDF ticket with InfiniteBZ branding and professional design.
+    Draws every layer in one pass; services/ticket_service.py renders the same design from a cached
+    per-event template (this is the baseline in bench_tickets.py).
     """
     buffer = BytesIO()
     c = canvas.Canvas(buffer, pagesize=(400, 600))  # Vertical layout - one page
@@ -263,85 +273,3 @@ def generate_event_ticket_pdf(event_data: dict, qr_base64: str, user_email: str,
     c.save()
     buffer.seek(0)
     return buffer
-
-async def send_event_ticket_email(email: EmailStr, event_data: dict, confirmation_id: str = None, user_name: str = None):
-    """
-    Generate QR code and ticket PDF, then send email with attachments.
-    """
-    if not ENABLE_EMAIL:
-        print(f"FAILED TO SEND EMAIL to {email}: Email credentials not configured.")
-        return False
-
-    temp_file_path = None
-    try:
-        print(f"Attempting to send ticket email to {email} using {MAIL_SERVER}:{MAIL_PORT} with user {MAIL_USERNAME}")
-
-        # Generate unique ticket number
-        import uuid
-        import time
-        unique_ticket_id = f"IBZ-{int(time.time())}-{str(uuid.uuid4())[:8].upper()}"
-
-        # Generate QR code data with unique ticket number
-        qr_data = f"Ticket ID: {unique_ticket_id}\nEvent: {event_data.get('title', 'N/A')}\nUser: {email}\nValid: {event_data.get('start_time', 'N/A')}"
-        qr_base64 = generate_qr_code(qr_data)
-
-        # Generate ticket PDF with confirmation ID (use the passed confirmation_id or unique_ticket_id as fallback)
-        ticket_id_to_use = confirmation_id or unique_ticket_id
-        pdf_buffer = generate_event_ticket_pdf(event_data, qr_base64, email, ticket_id_to_use, user_name)
-
-        # Save PDF to temporary file
-        import tempfile
-        import os
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            temp_file.write(pdf_buffer.getvalue())
-            temp_file_path = temp_file.name
-
-        # Create attachments with file path
-        attachments = [
-            {
-                "file": temp_file_path,
-                "filename": f"{event_data.get('title', 'event')}_ticket.pdf",
-                "headers": {"Content-Type": "application/pdf"}
-            }
-        ]
-
-        message = MessageSchema(
-            subject=f"Your Event Ticket for {event_data.get('title', 'Event')}",
-            recipients=[email],
-            body=f"""
-            <html>
-                <body style="font-family: Arial, sans-serif; padding: 20px; background-color: #f4f4f4;">
-                    <div style="max-width: 600px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px;">
-                        <h2 style="color: #333;">Event Registration Confirmed</h2>
-                        <p>Thank you for registering for <strong>{event_data.get('title', 'the event')}</strong>.</p>
-                        <p>Your event ticket is attached as a PDF. Please bring this ticket to the event.</p>
-                        <p>You can also scan the QR code below:</p>
-                        <img src="data:image/png;base64,{qr_base64}" alt="QR Code" style="max-width: 200px;" />
-                        <p style="font-size: 12px; color: #888;">Please bring this to the event.</p>
-                    </div>
-                </body>
-            </html>
-            """,
-            subtype=MessageType.html,
-            attachments=attachments
-        )
-        fm = FastMail(conf)
-        await fm.send_message(message)
-        print("Event ticket email sent successfully.")
-        return True
-    except Exception as e:
-        print(f"ERROR: Failed to send event ticket email: {e}")
-        print("Please check your Gmail credentials. Make sure:")
-        print("1. 2-Factor Authentication is enabled on your Gmail account")
-        print("2. You generated an App Password (not your regular password)")
-        print("3. The App Password is entered correctly without spaces")
-        print("4. Your Gmail account allows less secure apps or has the correct settings")
-        return False
-    finally:
-        # Clean up temporary file
-        if temp_file_path and os.path.exists(temp_file_path):
-            try:
-                os.unlink(temp_file_path)
-            except Exception as e:
-                print(f"Warning: Could not delete temp file {temp_file_path}: {e}")
-
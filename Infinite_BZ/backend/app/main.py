@@ -1,5 +1,6 @@
 import sys
 import asyncio
+from datetime import datetime
 
 if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
@@ -12,6 +13,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse
 from sqlmodel import SQLModel
 
 # Imports from your project
@@ -21,58 +23,41 @@ from app.api.auth_routes import router as auth_router
 from app.api.admin_routes import router as admin_router
 from app.models.schemas import Event
 from app.services.scraper import scrape_and_process_events 
+from app.services.scrape_plan import make_pending_jobs_due, plan_daily_run, plan_slots, run_due_jobs
+from app.core.metrics import render_metrics
+from app.services.autocomplete import build_autocomplete_index
+from app.services.browser_pool import browser_pool
+from app.services.recurrence import roll_series_occurrences
+from app.services.event_refresh import REFRESH_INTERVAL_MINUTES, refresh_due_events
+from app.services.scheduler_leader import SchedulerLeader, cancel_running_jobs, timed_job
+from app.services.ticket_service import shutdown_ticket_pool
+from app.services.email_outbox import outbox_sender
+from app.services.event_changes import event_change_feed
+
+# Scrape plan tick; POST /scrape brings it forward on the leader
+SCRAPE_JOB_ID = "scrape"
+SCRAPE_TICK_MINUTES = 5
 
 # --- THE BACKGROUND TASK ---
-async def scheduled_scraper_task():
+@timed_job("scrape")
+async def scheduled_scraper_task(force: bool = False):
     """
-    Runs automatically to scrape IDs and fetch API details.
+    Runs the scrape jobs that are due (see services/scrape_plan.py).
+    Called every few minutes by the scheduler; `force` runs all pending
+    jobs right away, whenever they are scheduled.
     """
-    print("DAILY SCHEDULE: Starting automatic hybrid scraper...")
-    city = "chennai" 
-    
-    # 1. Run the Hybrid Scraper
     try:
-        from app.services.scraper import scrape_events_playwright
-        events_data = await scrape_events_playwright(city)
-        print(f"Scraper finished. Found {len(events_data)} potential events.")
+        await plan_daily_run()
+        ran = await run_due_jobs(force=force)
+        if ran:
+            print(f"SCRAPE SCHEDULE: finished {ran} scrape jobs.")
     except Exception as e:
         print(f"Scraper failed: {e}")
-        return
-
-    # 2. Save to Database
-    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-    
-    async with async_session() as session:
-        added_count = 0
-        updated_count = 0
-        for data in events_data:
-            # Check duplicates using 'eventbrite_id'
-            statement = select(Event).where(Event.eventbrite_id == data["eventbrite_id"])
-            result = await session.execute(statement)
-            existing_event = result.scalars().first()
-            
-            if not existing_event:
-                event = Event(**data)
-                session.add(event)
-                added_count += 1
-            else:
-                # Update existing event with fresh data from API
-                existing_event.title = data['title']
-                existing_event.description = data['description']
-                existing_event.start_time = data['start_time']
-                existing_event.end_time = data['end_time']
-                existing_event.is_free = data['is_free']
-                existing_event.venue_name = data['venue_name']
-                existing_event.url = data['url']
-                existing_event.image_url = data['image_url']
-                updated_count += 1
-        
-        await session.commit()
-        print(f"Database Update: Saved {added_count} new events. Updated {updated_count} existing events.")
 
+@timed_job("cleanup")
 async def scheduled_cleanup_task():
     """
-    Runs automatically to delete expired events.
+    Runs automatically to archive and delete expired events, in batches.
     """
     print("DAILY SCHEDULE: Starting expired event cleanup...")
     from app.services.cleanup import delete_expired_events
@@ -85,27 +70,103 @@ async def scheduled_cleanup_task():
         except Exception as e:
             print(f"Cleanup failed: {e}")
 
+@timed_job("series")
+async def scheduled_series_task():
+    """
+    Moves recurring series forward: next session, occurrences over the horizon.
+    """
+    try:
+        count = await roll_series_occurrences()
+        print(f"SERIES SCHEDULE: refreshed sessions of {count} recurring events.")
+    except Exception as e:
+        print(f"Series refresh failed: {e}")
+
+@timed_job("refresh")
+async def scheduled_refresh_task():
+    """
+    Refreshes stored events whose refresh is due; resumes an interrupted run.
+    """
+    try:
+        checkpoint = await refresh_due_events()
+        print(f"REFRESH SCHEDULE: {checkpoint.processed} events checked, {checkpoint.updated} updated.")
+    except Exception as e:
+        print(f"Event refresh failed: {e}")
+
+def scheduler_leader(scheduler: AsyncIOScheduler) -> SchedulerLeader:
+    """
+    This worker's bid to run `scheduler`: resumed while it holds the
+    scheduler lock, paused (with its running jobs cancelled) when it loses it.
+    Only the leader scrapes, so Chromium runs in the leader alone.
+    """
+    warm_up = None
+
+    async def warm_browser_pool():
+        try:
+            await browser_pool.start()
+        except Exception as e:
+            print(f"Browser pool: could not start Chromium now, will retry on first scrape ({e})")
+
+    async def on_elected():
+        nonlocal warm_up
+        # Jobs left RUNNING are not reset here: the previous leader may still
+        # be finishing them. run_due_jobs reclaims them once they are stale.
+        # Warm Chromium for the scraper in the background; jobs lease contexts from it
+        warm_up = asyncio.create_task(warm_browser_pool())
+        scheduler.resume()
+        print(f"Scheduler started! Scraping {len(plan_slots())} city/category/page jobs per day.")
+
+        # 3. Startup: Run Cleanup Immediately (Since laptop might be off at 2 AM)
+        print("STARTUP: Running initial cleanup...")
+        asyncio.create_task(scheduled_cleanup_task())
+
+    async def on_demoted():
+        scheduler.pause()
+        await cancel_running_jobs()
+        # Let a launch in flight finish before closing, so no Chromium is left behind
+        if warm_up is not None:
+            await warm_up
+        await browser_pool.stop()
+
+    return SchedulerLeader(on_elected, on_demoted)
+
 # --- LIFESPAN MANAGER ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 1. Startup: Create DB Tables
     await init_db()
+    # Follow the other workers' event changes; started before the index is
+    # built so no change falls between the two
+    await event_change_feed.start()
+    await build_autocomplete_index()
     
     # 2. Startup: Initialize Scheduler
+    # Built in every worker, run only by the one holding the scheduler lock
+    # (services/scheduler_leader.py); the others take over if it dies
     scheduler = AsyncIOScheduler()
-    scheduler.add_job(scheduled_scraper_task, 'cron', hour=8, minute=0)
+    # Jobs of the daily scrape plan are staggered over the day; pick up due ones every few minutes
+    scheduler.add_job(scheduled_scraper_task, 'interval', minutes=SCRAPE_TICK_MINUTES, next_run_time=datetime.now(), id=SCRAPE_JOB_ID)
+    scheduler.add_job(scheduled_series_task, 'cron', hour=0, minute=5)
+    scheduler.add_job(scheduled_refresh_task, 'interval', minutes=REFRESH_INTERVAL_MINUTES, max_instances=1)
     scheduler.add_job(scheduled_cleanup_task, 'cron', hour=2, minute=0) # Keep as backup
-    scheduler.start()
-    print("Scheduler started! Will scrape every day at 8:00 AM.")
-    
-    # 3. Startup: Run Cleanup Immediately (Since laptop might be off at 2 AM)
-    print("STARTUP: Running initial cleanup...")
-    asyncio.create_task(scheduled_cleanup_task())
+    scheduler.start(paused=True)
+
+    leader = scheduler_leader(scheduler)
+    await leader.start()
+    app.state.scheduler = scheduler
+    app.state.leader = leader
+
+    # Outbox sender runs in every worker; rows are claimed, never sent twice
+    await outbox_sender.start()
     
     yield
     
     # 3. Shutdown
+    await leader.stop()
+    await outbox_sender.stop()
+    await event_change_feed.stop()
     scheduler.shutdown()
+    await browser_pool.stop()
+    shutdown_ticket_pool()
 
 app = FastAPI(title="Infinite BZ API", lifespan=lifespan)
 
@@ -140,11 +201,26 @@ import os
 os.makedirs("uploads", exist_ok=True)
 app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
-@app.post("/scrape")
+@app.post("/scrape", status_code=202)
 async def manual_scrape():
-    """Manually trigger the scraper in the background."""
-    asyncio.create_task(scheduled_scraper_task())
-    return {"message": "Scraper triggered in background. Check server logs for progress."}
+    """
+    Manually trigger the scraper: today's remaining jobs become due now and
+    the scheduler leader runs them, so they still run exactly once per
+    cluster. Right away if this worker is the leader, else on its next tick.
+    """
+    await plan_daily_run()
+    queued = await make_pending_jobs_due()
+
+    leader = getattr(app.state, "leader", None)
+    if leader is not None and leader.is_leader:
+        app.state.scheduler.modify_job(SCRAPE_JOB_ID, next_run_time=datetime.now())
+        return {"message": f"Scraper triggered: {queued} jobs moved up. Check server logs for progress."}
+    return {"message": f"Scraper triggered: {queued} jobs moved up; the scheduler leader runs them within {SCRAPE_TICK_MINUTES} minutes."}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """Prometheus scrape endpoint (cache hit/miss counters, ...)."""
+    return render_metrics()
 
 @app.get("/")
 def root():
@@ -1,9 +1,13 @@
 from typing import Optional, Dict, Any, List
 from datetime import datetime
 from sqlmodel import SQLModel, Field, Relationship
-from sqlalchemy import Column
+from sqlalchemy import JSON, Column, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import JSONB
 
+# JSON columns of new tables: JSONB on PostgreSQL, JSON on the local SQLite
+# database (create_all cannot render JSONB there)
+JSONVariant = JSON().with_variant(JSONB, "postgresql")
+
 # --- NEW: Ticket Class Model ---
 class TicketClass(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
@@ -52,6 +56,30 @@ class Event(SQLModel, table=True):
     is_free: bool = Field(default=True)
     online_event: bool = Field(default=False)
     category: Optional[str] = Field(default="Business", index=True)
+
+    # True for events created on InfiniteBZ (shown first in the feed)
+    is_native: bool = Field(default=False)
+    # Platform the event came from: Eventbrite, Meetup, InfiniteBZ
+    source: Optional[str] = None
+    # Venue location, geocoded at ingest (services/geocoder.py). None for online/unknown venues
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+    # Incremental scraping (services/change_detection.py): hash of the scraped
+    # fields, when they were last fetched and when they are due again
+    content_hash: Optional[str] = None
+    last_fetched_at: Optional[datetime] = None
+    next_refresh_at: Optional[datetime] = Field(default=None, index=True)
+
+    # Set on near-duplicates of another listing (services/dedup.py); those are
+    # hidden from the feed in favour of the canonical event
+    canonical_event_id: Optional[int] = Field(default=None, foreign_key="event.id", index=True)
+
+    # Recurring series (services/recurrence.py): 'WEEKLY' or None. For a series
+    # start_time is the next session, end_time the end of the series and
+    # series_start the first session
+    recurrence: Optional[str] = None
+    series_start: Optional[datetime] = None
     
     # New Fields
     capacity: Optional[int] = None
@@ -66,6 +94,63 @@ class Event(SQLModel, table=True):
     
     created_at: datetime = Field(default_factory=datetime.now)
 
+# Composite indexes matching the feed query shapes:
+# an equality filter, then the feed ORDER BY (native first, then soonest)
+_event = Event.__table__.c
+Index("ix_event_feed_order", _event.is_native.desc(), _event.start_time, _event.id)
+Index("ix_event_source_feed", _event.source, _event.is_native.desc(), _event.start_time, _event.id)
+Index("ix_event_free_feed", _event.is_free, _event.is_native.desc(), _event.start_time, _event.id)
+Index("ix_event_online_feed", _event.online_event, _event.is_native.desc(), _event.start_time, _event.id)
+# Bounding-box fallback for radius search (see services/geo_index.py)
+Index("ix_event_lat_lon", _event.latitude, _event.longitude)
+# Date range filter, expiry cleanup and admin listing
+Index("ix_event_start_time", _event.start_time, _event.id)
+
+# --- Ingest-time category classification ---
+# One row per (category, event). The primary key leads with category so
+# the events feed category filter is a single index range scan.
+class EventCategory(SQLModel, table=True):
+    category: str = Field(primary_key=True)
+    event_id: int = Field(foreign_key="event.id", primary_key=True, index=True)
+
+# --- Sessions of each event (services/recurrence.py) ---
+# One row for a single event, one per session over a rolling horizon for a series
+class EventOccurrence(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    event_id: int = Field(foreign_key="event.id", index=True)
+    start_time: datetime
+    end_time: datetime
+
+# Date filters / calendar: range scan on start, event id straight from the index
+Index("ix_occurrence_start", EventOccurrence.__table__.c.start_time, EventOccurrence.__table__.c.event_id)
+
+# --- Archive of expired events (services/cleanup.py) ---
+# Copied here in the same transaction that deletes them, for analytics
+class EventArchive(SQLModel, table=True):
+    __tablename__ = "event_archive"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    event_id: int = Field(index=True)  # Event.id before deletion
+    eventbrite_id: str = Field(index=True)
+    title: str
+    start_time: datetime = Field(index=True)
+    end_time: Optional[datetime] = None
+    category: Optional[str] = None
+    source: Optional[str] = None
+    is_native: bool = Field(default=False)
+    is_free: bool = Field(default=True)
+    online_event: bool = Field(default=False)
+    venue_name: Optional[str] = None
+    venue_address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    organizer_name: Optional[str] = None
+    canonical_event_id: Optional[int] = None
+    registration_count: int = Field(default=0)
+    raw_data: Dict[str, Any] = Field(default={}, sa_column=Column(JSONVariant))
+    created_at: Optional[datetime] = None
+    archived_at: datetime = Field(default_factory=datetime.now)
+
 class EventCreate(SQLModel):
     title: str
     description: Optional[str] = None
@@ -165,6 +250,8 @@ class EventListResponse(SQLModel):
     total: int
     page: int
     limit: int
+    # Opaque token for the next page (keyset pagination); None on the last page
+    next_cursor: Optional[str] = None
 
 # --- Following System Models ---
 
@@ -177,3 +264,93 @@ class Follow(SQLModel, table=True):
     # Relationships
     follower: Optional["User"] = Relationship(sa_relationship_kwargs={"foreign_keys": "Follow.follower_email", "primaryjoin": "Follow.follower_email == User.email"})
     followed: Optional["User"] = Relationship(sa_relationship_kwargs={"foreign_keys": "Follow.followed_email", "primaryjoin": "Follow.followed_email == User.email"})
+
+# --- Scrape Scheduler ---
+# One row per (run day, city, category, result page) of the scrape plan.
+# Progress is persisted so a restart resumes the day's run instead of starting over.
+class ScrapeJob(SQLModel, table=True):
+    __table_args__ = (UniqueConstraint("run_date", "city", "category", "page", name="uq_scrapejob_slot"),)
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    run_date: str = Field(index=True)  # 'YYYY-MM-DD'
+    city: str
+    category: str
+    page: int = 1
+    status: str = Field(default="PENDING", index=True)  # PENDING, RUNNING, DONE, FAILED
+    attempts: int = Field(default=0)
+    scheduled_at: datetime = Field(index=True)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    events_found: int = Field(default=0)
+    inserted: int = Field(default=0)
+    updated: int = Field(default=0)
+    error: Optional[str] = None
+
+# --- Ingestion run summaries (services/ingest_metrics.py) ---
+# One row per scrape batch / sync / refresh, with the time spent in each pipeline stage
+class IngestRun(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    trigger: str = Field(index=True)  # scheduled, manual, sync, refresh
+    status: str = Field(default="DONE")  # DONE, FAILED
+    started_at: datetime = Field(index=True)
+    finished_at: Optional[datetime] = None
+    duration_seconds: float = 0.0
+    jobs: int = Field(default=0)
+    pages: int = Field(default=0)
+    events_found: int = Field(default=0)
+    inserted: int = Field(default=0)
+    updated: int = Field(default=0)
+    unchanged: int = Field(default=0)
+    # {stage: seconds} / {stage: items}, see services/ingest_metrics.py
+    stage_seconds: Dict[str, Any] = Field(default={}, sa_column=Column(JSONVariant))
+    stage_items: Dict[str, Any] = Field(default={}, sa_column=Column(JSONVariant))
+    error: Optional[str] = None
+
+# --- Event refresh checkpoints (services/event_refresh.py) ---
+# Progress of a refresh run, committed with every batch so a crashed run resumes
+class RefreshCheckpoint(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    status: str = Field(default="RUNNING", index=True)  # RUNNING, DONE
+    # Events due at this moment are part of the run
+    started_at: datetime = Field(default_factory=datetime.now)
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    # Keyset position: every due event with a lower id has been handled
+    last_event_id: int = Field(default=0)
+    processed: int = Field(default=0)
+    updated: int = Field(default=0)
+    failed: int = Field(default=0)
+
+# --- Email outbox (services/email_outbox.py) ---
+# Emails are committed here with the change that triggers them and delivered
+# by a background sender, so a crash or SMTP outage does not lose them
+class EmailOutbox(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_emailoutbox_due", "status", "next_attempt_at"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    kind: str  # event_ticket
+    recipient: str
+    # What the message is built from at send time (event data, confirmation id, ...)
+    payload: Dict[str, Any] = Field(default={}, sa_column=Column(JSONVariant))
+    status: str = Field(default="PENDING")  # PENDING, SENDING, SENT, FAILED
+    attempts: int = Field(default=0)
+    next_attempt_at: datetime = Field(default_factory=datetime.now)
+    # A SENDING row whose lease has expired (sender died) is picked up again
+    claimed_by: Optional[str] = None
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    sent_at: Optional[datetime] = None
+
+# --- Event change feed (services/event_changes.py) ---
+# One row per changed event, so every worker's caches and indexes see the
+# changes made by the others. Rows are kept for EVENT_CHANGES_KEEP_SECONDS
+class EventChange(SQLModel, table=True):
+    id: Optional[int] = Field(default=None, primary_key=True)
+    # None: unknown / bulk change, listeners reload everything
+    event_id: Optional[int] = None
+    # Worker that made the change (it already notified its own listeners)
+    origin: str
+    changed_at: datetime = Field(default_factory=datetime.now, index=True)
@@ -0,0 +1,155 @@
+"""
+In-memory typeahead index over event titles, organizers and venues.
+
+Every phrase is stored under each of its word suffixes ("tech meetup
+chennai" -> "tech meetup chennai", "meetup chennai", "chennai") in one
+sorted list, so a prefix lookup is a bisect plus a short scan: the cost
+depends on the number of suggestions, not on the number of events.
+
+Built once at startup and patched per event through on_events_changed,
+which also replays the changes made by other workers (services/event_changes.py).
+"""
+import re
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.models.schemas import Event
+from app.services.event_changes import on_events_changed
+
+# Suggestion types, in the order they are shown
+FIELDS = (("title", Event.title), ("organizer", Event.organizer_name), ("venue", Event.venue_name))
+FIELD_RANK = {name: rank for rank, (name, _) in enumerate(FIELDS)}
+
+# Entries inspected per lookup, so very common prefixes ("a") stay cheap
+MAX_SCAN = 500
+LOAD_BATCH_SIZE = 1000
+
+# (key, is_suffix, field, display text, event_id)
+Entry = Tuple[str, bool, str, str, int]
+
+def normalize(text: str) -> str:
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+def _entries(event_id: int, values: Dict[str, Optional[str]]) -> List[Entry]:
+    entries = []
+    for field, text in values.items():
+        if not text or not text.strip():
+            continue
+        display = " ".join(text.split())
+        words = normalize(text).split()
+        for i in range(len(words)):
+            entries.append((" ".join(words[i:]), i > 0, field, display, event_id))
+    return entries
+
+class AutocompleteIndex:
+    def __init__(self):
+        self._entries: List[Entry] = []
+        self._by_event: Dict[int, List[Entry]] = {}
+
+    def __len__(self):
+        return len(self._by_event)
+
+    def clear(self):
+        self._entries = []
+        self._by_event = {}
+
+    def add(self, event_id: int, values: Dict[str, Optional[str]]):
+        self.remove(event_id)
+        entries = _entries(event_id, values)
+        for entry in entries:
+            insort(self._entries, entry)
+        self._by_event[event_id] = entries
+
+    def remove(self, event_id: int):
+        for entry in self._by_event.pop(event_id, []):
+            i = bisect_left(self._entries, entry)
+            if i < len(self._entries) and self._entries[i] == entry:
+                del self._entries[i]
+
+    def bulk_load(self, rows: Iterable[Tuple[int, Dict[str, Optional[str]]]]):
+        """Adds many events at once with a single sort (startup)."""
+        for event_id, values in rows:
+            self.remove(event_id)
+            entries = _entries(event_id, values)
+            self._entries.extend(entries)
+            self._by_event[event_id] = entries
+        self._entries.sort()
+
+    def suggest(self, query: str, limit: int = 8) -> List[dict]:
+        prefix = normalize(query)
+        if not prefix:
+            return []
+
+        seen = set()
+        matches = []
+        start = bisect_left(self._entries, (prefix,))
+        for key, is_suffix, field, display, event_id in self._entries[start:start + MAX_SCAN]:
+            if not key.startswith(prefix):
+                break
+            if (field, display) in seen:
+                continue
+            seen.add((field, display))
+            matches.append((is_suffix, FIELD_RANK[field], len(display), display, field, event_id))
+
+        # Phrase starts before mid-phrase matches, titles before organizers/venues, short first
+        matches.sort()
+        suggestions = []
+        for _, _, _, display, field, event_id in matches[:limit]:
+            suggestion = {"text": display, "type": field}
+            if field == "title":
+                suggestion["event_id"] = event_id
+            suggestions.append(suggestion)
+        return suggestions
+
+autocomplete_index = AutocompleteIndex()
+
+def _row_values(row) -> Dict[str, Optional[str]]:
+    return {name: getattr(row, column.key) for name, column in FIELDS}
+
+def _columns():
+    return [Event.id] + [column for _, column in FIELDS]
+
+async def build_autocomplete_index():
+    """
+    Loads every event into the index. Called once at startup.
+    """
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    rows = []
+    async with async_session() as session:
+        result = await session.stream(
+            select(*_columns()).where(Event.canonical_event_id == None).execution_options(yield_per=LOAD_BATCH_SIZE)
+        )
+        async for partition in result.partitions():
+            rows.extend((row.id, _row_values(row)) for row in partition)
+
+    autocomplete_index.clear()
+    autocomplete_index.bulk_load(rows)
+    print(f"Autocomplete: indexed {len(autocomplete_index)} events.")
+
+@on_events_changed
+async def _refresh_autocomplete(event_ids: Optional[Sequence[int]]):
+    if event_ids is None:
+        await build_autocomplete_index()
+        return
+
+    rows = {}
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_session() as session:
+        for i in range(0, len(event_ids), LOAD_BATCH_SIZE):
+            chunk = event_ids[i:i + LOAD_BATCH_SIZE]
+            result = await session.execute(
+                select(*_columns()).where(Event.id.in_(chunk), Event.canonical_event_id == None)
+            )
+            rows.update((row.id, _row_values(row)) for row in result.all())
+
+    for event_id in event_ids:
+        if event_id in rows:
+            autocomplete_index.add(event_id, rows[event_id])
+        else:
+            # Deleted / expired / merged into another listing
+            autocomplete_index.remove(event_id)
@@ -0,0 +1,133 @@
+"""
+Long-lived Chromium shared by every scrape job.
+
+The scheduler leader starts one browser when elected and closes it when it
+steps down (followers never scrape, so never launch Chromium);
+jobs lease a fresh, isolated context (cookies, cache) per page run instead
+of launching Chromium each time. Images, media and fonts are blocked, since
+only the card markup is parsed.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from playwright.async_api import async_playwright
+
+from app.core.metrics import counter, histogram
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+LAUNCH_ARGS = ["--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage"]
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+
+browser_cold_start = histogram("scraper_browser_cold_start_seconds", "Time to launch Chromium")
+context_leases = counter("scraper_context_leases_total", "Browser contexts leased to scrape jobs, by browser state (warm, cold)")
+blocked_requests = counter("scraper_blocked_requests_total", "Requests aborted by the browser pool, by resource type")
+
+class BrowserPool:
+    def __init__(self, max_contexts: int = 4):
+        self._semaphore = asyncio.Semaphore(max_contexts)
+        self._lock = asyncio.Lock()
+        self._playwright = None
+        self._browser = None
+
+    @property
+    def started(self) -> bool:
+        return self._browser is not None and self._browser.is_connected()
+
+    async def start(self):
+        async with self._lock:
+            if self.started:
+                return
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+            start = time.perf_counter()
+            self._browser = await self._playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+            elapsed = time.perf_counter() - start
+            browser_cold_start.observe(elapsed)
+            print(f"Browser pool: Chromium started in {elapsed:.2f}s")
+
+    async def stop(self):
+        async with self._lock:
+            if self._browser is not None:
+                await self._browser.close()
+                self._browser = None
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+    @asynccontextmanager
+    async def context(self):
+        """
+        Leases a new browser context with resource blocking installed.
+        Relaunches Chromium if it is not running (first use, or after a crash).
+        """
+        async with self._semaphore:
+            warm = self.started
+            if not warm:
+                await self.start()
+            context_leases.inc(state="warm" if warm else "cold")
+
+            context = await self._browser.new_context(user_agent=USER_AGENT)
+            await context.route("**/*", _block_heavy_resources)
+            try:
+                yield context
+            finally:
+                await context.close()
+
+async def _block_heavy_resources(route):
+    resource_type = route.request.resource_type
+    if resource_type in BLOCKED_RESOURCE_TYPES:
+        blocked_requests.inc(type=resource_type)
+        await route.abort()
+    else:
+        await route.continue_()
+
+async def wait_for_stable_count(page, selector: str, interval: float = 0.5, stable_rounds: int = 2, timeout: float = 15, scroll_by: int = 1000) -> int:
+    """
+    Scrolls until the number of elements matching `selector` stops changing
+    for `stable_rounds` checks in a row (infinite-scroll has loaded what it
+    will), or until `timeout`. Returns the final count.
+    """
+    deadline = time.monotonic() + timeout
+    last_count = -1
+    stable = 0
+    while time.monotonic() < deadline:
+        count = await page.locator(selector).count()
+        if count == last_count:
+            stable += 1
+            if stable >= stable_rounds:
+                break
+        else:
+            stable = 0
+            last_count = count
+        await page.evaluate(f"window.scrollBy(0, {scroll_by})")
+        await asyncio.sleep(interval)
+    return max(last_count, 0)
+
+# Shared pool, started / stopped by the app lifespan (see main.py)
+browser_pool = BrowserPool()
+
+@asynccontextmanager
+async def lease_context(pool: Optional[BrowserPool] = None):
+    """
+    Leases a context from the shared pool when the app is running it, else
+    from a short-lived pool (standalone scripts) that is closed afterwards.
+    """
+    pool = pool or browser_pool
+    if pool.started:
+        async with pool.context() as context:
+            yield context
+        return
+
+    async with BrowserPool(max_contexts=1) as temporary_pool:
+        async with temporary_pool.context() as context:
+            yield context
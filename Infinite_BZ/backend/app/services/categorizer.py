@@ -0,0 +1,87 @@
+from typing import List, Optional, Sequence
+from sqlalchemy import delete, insert, or_
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.schemas import Event, EventCategory
+
+# Category -> related keywords. An event belongs to every category that has
+# at least one keyword in its title or description (same rule the feed used
+# to evaluate with ILIKE on every request).
+CATEGORY_KEYWORDS = {
+    "startup": ["startup", "founder", "entrepreneur", "venture", "pitch", "funding", "incubator", "accelerator", "innovation"],
+    "business": ["business", "networking", "marketing", "sales", "finance", "leadership", "management", "corporate", "career", "resume", "job", "interview", "workshop", "money", "income", "profit", "ecommerce", "trade", "expo", "exhibition", "organization", "team", "strategy", "communication"],
+    "tech": ["tech", "software", "developer", "ai", "data", "code", "programming", "cloud", "security", "web", "digital", "cyber", "electronics", "engineering"],
+    "music": ["music", "concert", "live", "dj", "band", "festival", "performance"],
+    "sports": ["sport", "cricket", "football", "run", "marathon", "yoga", "fitness", "badminton"],
+    "arts": ["art", "design", "creative", "gallery", "painting"]
+}
+
+def classify_event(title: Optional[str], description: Optional[str]) -> List[str]:
+    """
+    Returns the list of categories (keys of CATEGORY_KEYWORDS) an event belongs to.
+    """
+    text = f"{title or ''}\n{description or ''}".lower()
+    return [
+        category for category, keywords in CATEGORY_KEYWORDS.items()
+        if any(kw in text for kw in keywords)
+    ]
+
+async def assign_categories(session: AsyncSession, events: Sequence[Event]):
+    """
+    (Re)classifies the given events and replaces their EventCategory rows.
+    Events must already have an id (flush first). Does not commit.
+    """
+    event_ids = [e.id for e in events if e.id is not None]
+    if not event_ids:
+        return
+
+    await session.execute(delete(EventCategory).where(EventCategory.event_id.in_(event_ids)))
+
+    rows = [
+        {"event_id": e.id, "category": category}
+        for e in events if e.id is not None
+        for category in classify_event(e.title, e.description)
+    ]
+    if rows:
+        await session.execute(insert(EventCategory), rows)
+
+def category_filter(category: str):
+    """
+    WHERE clause for the events feed category filter.
+    Known categories are an index lookup on EventCategory; unknown names fall
+    back to a plain keyword match on title/description.
+    """
+    key = category.lower()
+    if key in CATEGORY_KEYWORDS:
+        return Event.id.in_(
+            select(EventCategory.event_id).where(EventCategory.category == key)
+        )
+
+    kw_term = f"%{key}%"
+    return or_(Event.title.ilike(kw_term), Event.description.ilike(kw_term))
+
+async def backfill_event_categories(session: AsyncSession, batch_size: int = 500) -> int:
+    """
+    Classifies every existing event, walking the table in id order.
+    Commits once per batch. Returns the number of events processed.
+    """
+    processed = 0
+    last_id = 0
+
+    while True:
+        result = await session.execute(
+            select(Event).where(Event.id > last_id).order_by(Event.id).limit(batch_size)
+        )
+        events = result.scalars().all()
+        if not events:
+            break
+
+        await assign_categories(session, events)
+        await session.commit()
+
+        processed += len(events)
+        last_id = events[-1].id
+        print(f"Categorized {processed} events (last id {last_id})...")
+
+    return processed
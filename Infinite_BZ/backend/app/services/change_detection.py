@@ -0,0 +1,75 @@
+"""
+Change detection for scraped events.
+
+Each event stores a hash of its scraped fields and a next_refresh_at that
+depends on how soon it starts. Scrapes skip the API call for events that
+are not due, and the ingest only writes fields whose value changed.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.models.schemas import Event
+
+# Fields that come from the Eventbrite API (what the hash covers)
+HASHED_FIELDS = (
+    "title", "description", "start_time", "end_time", "url", "image_url",
+    "venue_name", "venue_address", "organizer_name", "is_free", "online_event", "timezone",
+)
+
+# (starts within, refresh every) - the sooner an event starts, the more often it changes
+REFRESH_TIERS = (
+    (timedelta(days=7), timedelta(hours=1)),
+    (timedelta(days=30), timedelta(hours=6)),
+    (timedelta(days=90), timedelta(days=1)),
+)
+DEFAULT_REFRESH = timedelta(days=7)
+
+def content_hash(data: Dict) -> str:
+    canonical = {
+        field: value.isoformat() if isinstance(value, datetime) else value
+        for field, value in ((f, data.get(f)) for f in HASHED_FIELDS)
+    }
+    return hashlib.sha256(json.dumps(canonical, sort_keys=True, default=str).encode()).hexdigest()
+
+def refresh_interval(start_time: Optional[datetime], now: Optional[datetime] = None) -> timedelta:
+    now = now or datetime.now()
+    if start_time is None:
+        return DEFAULT_REFRESH
+    if start_time.tzinfo is not None:
+        start_time = start_time.replace(tzinfo=None)
+
+    until_start = start_time - now
+    for starts_within, interval in REFRESH_TIERS:
+        if until_start <= starts_within:
+            return interval
+    return DEFAULT_REFRESH
+
+def next_refresh_at(start_time: Optional[datetime], now: Optional[datetime] = None) -> datetime:
+    now = now or datetime.now()
+    return now + refresh_interval(start_time, now)
+
+async def fresh_event_ids(eventbrite_ids: Iterable[str], now: Optional[datetime] = None) -> Set[str]:
+    """
+    The subset of `eventbrite_ids` that is stored and not yet due for a refresh.
+    """
+    eventbrite_ids = list(set(eventbrite_ids))
+    if not eventbrite_ids:
+        return set()
+
+    now = now or datetime.now()
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_session() as session:
+        result = await session.execute(
+            select(Event.eventbrite_id).where(
+                Event.eventbrite_id.in_(eventbrite_ids),
+                Event.next_refresh_at > now
+            )
+        )
+        return set(result.scalars().all())
@@ -1,44 +1,95 @@
+import asyncio
 from datetime import datetime
-from sqlalchemy import or_, delete
+from sqlalchemy import DateTime, or_, delete, func, insert, literal
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.models.schemas import Event, UserRegistration, TicketClass
+from app.models.schemas import Event, EventArchive, EventCategory, EventOccurrence, UserRegistration, TicketClass
+from app.services.event_changes import notify_events_changed
+from app.services.dedup import release_duplicates
 
-async def delete_expired_events(session: AsyncSession):
+# Events archived + deleted per transaction. Each batch holds its locks only
+# for a few set-based statements, so feed queries are never blocked for long.
+CLEANUP_BATCH_SIZE = 1000
+# Breather between batches so other writers get the database (SQLite has one writer)
+CLEANUP_PAUSE_SECONDS = 0.05
+
+# Event columns copied into event_archive (same names)
+ARCHIVE_COLUMNS = (
+    "eventbrite_id", "title", "start_time", "end_time", "category", "source", "is_native", "is_free",
+    "online_event", "venue_name", "venue_address", "latitude", "longitude", "organizer_name",
+    "canonical_event_id", "raw_data", "created_at",
+)
+
+def _expired(now: datetime):
+    # Expired if (end_time is NOT NULL and < now) OR (end_time is NULL and start_time < now)
+    return or_(
+        Event.end_time < now,
+        (Event.end_time == None) & (Event.start_time < now)
+    )
+
+async def _archive_and_delete(session: AsyncSession, event_ids, now: datetime):
+    """One batch: copy into event_archive, then delete the events and their dependents."""
+    registrations = (
+        select(func.count()).select_from(UserRegistration)
+        .where(UserRegistration.event_id == Event.id)
+        .scalar_subquery()
+    )
+    await session.execute(
+        insert(EventArchive.__table__).from_select(
+            ["event_id", *ARCHIVE_COLUMNS, "registration_count", "archived_at"],
+            select(Event.id, *(getattr(Event, column) for column in ARCHIVE_COLUMNS), registrations, literal(now, DateTime))
+            .where(Event.id.in_(event_ids))
+        )
+    )
+
+    # Listings merged into an expired event stand on their own again
+    released_ids = await release_duplicates(session, event_ids)
+
+    # Dependents first: registrations (reference TicketClass and Event), tickets, categories, sessions
+    await session.execute(delete(UserRegistration).where(UserRegistration.event_id.in_(event_ids)))
+    await session.execute(delete(TicketClass).where(TicketClass.event_id.in_(event_ids)))
+    await session.execute(delete(EventCategory).where(EventCategory.event_id.in_(event_ids)))
+    await session.execute(delete(EventOccurrence).where(EventOccurrence.event_id.in_(event_ids)))
+    await session.execute(delete(Event).where(Event.id.in_(event_ids)))
+    return released_ids
+
+async def delete_expired_events(session: AsyncSession, batch_size: int = CLEANUP_BATCH_SIZE) -> int:
     """
-    Deletes events where end_time < current_time.
+    Archives and deletes events where end_time < current_time.
     If end_time is NULL, falls back to start_time < current_time.
+
+    Works in id-ordered batches of `batch_size`, one transaction each, so an
+    interrupted run keeps what it finished and the next run continues.
+    Returns the number of deleted events.
     """
     now = datetime.now()
-    
-    # Logic: Delete if (end_time is NOT NULL and < now) OR (end_time is NULL and start_time < now)
-    statement = select(Event).where(
-        or_(
-            Event.end_time < now,
-            (Event.end_time == None) & (Event.start_time < now)
-        )
-    )
-    
-    result = await session.execute(statement)
-    expired_events = result.scalars().all()
-    
-    expired_event_ids = [e.id for e in expired_events if e.id is not None]
-    
-    if expired_event_ids:
-        # 1. Delete associated registrations first (References TicketClass and Event)
-        await session.execute(
-            delete(UserRegistration).where(UserRegistration.event_id.in_(expired_event_ids))
-        )
 
-        # 2. Delete related TicketClass records (References Event)
-        await session.execute(
-            delete(TicketClass).where(TicketClass.event_id.in_(expired_event_ids))
-        )
-    
+    count_result = await session.execute(select(func.count()).select_from(Event).where(_expired(now)))
+    total = count_result.scalar() or 0
+    if not total:
+        return 0
+    print(f"Cleanup: {total} expired events to archive.")
+
     count = 0
-    for event in expired_events:
-        await session.delete(event)
-        count += 1
-    
-    await session.commit()
-    return count
\ No newline at end of file
+    last_id = 0
+    while True:
+        result = await session.execute(
+            select(Event.id)
+            .where(_expired(now), Event.id > last_id)
+            .order_by(Event.id)
+            .limit(batch_size)
+        )
+        event_ids = result.scalars().all()
+        if not event_ids:
+            break
+
+        released_ids = await _archive_and_delete(session, event_ids, now)
+        await session.commit()
+        await notify_events_changed(list(event_ids) + released_ids)
+
+        count += len(event_ids)
+        last_id = event_ids[-1]
+        print(f"Cleanup: archived {count}/{total} events (last id {last_id})...")
+        await asyncio.sleep(CLEANUP_PAUSE_SECONDS)
+
+    return count
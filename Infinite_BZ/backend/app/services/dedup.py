@@ -0,0 +1,270 @@
+"""
+Cross-source deduplication of events at ingest.
+
+The same meetup is often listed on Eventbrite and created on InfiniteBZ
+(a `chk-` event), or posted twice on Eventbrite under different ids. Exact
+eventbrite_id matching cannot see that, so after every write:
+
+  1. Blocking: only events starting on the same day in the same city are
+     compared (city = nearest gazetteer city of the geocoded venue; online
+     events and unknown venues form their own blocks).
+  2. Title and venue are normalized, cut into character shingles and
+     sketched with bottom-k MinHash.
+  3. Pairs sharing one of their smallest title hashes are scored; pairs above
+     DEDUP_THRESHOLD starting within DEDUP_MAX_START_GAP are merged.
+
+A duplicate keeps its row, so the next scrape still finds it by
+eventbrite_id, but points at its canonical event through
+Event.canonical_event_id and is left out of the feed, search and
+autocomplete. Missing details of the canonical event are filled from its
+duplicates. InfiniteBZ events always win and are never hidden.
+"""
+import re
+import zlib
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import bindparam, or_, update
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.schemas import Event
+from app.services.geocoder import CITIES, nearest_city
+
+SHINGLE_SIZE = 3
+SKETCH_SIZE = 32
+CANDIDATE_KEYS = 4
+# Weighted title/venue similarity above which two events are the same
+DEDUP_THRESHOLD = 0.7
+TITLE_WEIGHT = 0.75
+DEDUP_MAX_START_GAP = timedelta(hours=2)
+
+# Words that say nothing about which event it is. City names are dropped
+# too: both events are in the same city anyway ("AI Meetup Chennai" == "AI Meetup")
+STOPWORDS = {
+    "a", "an", "the", "and", "of", "in", "at", "on", "for", "to", "with", "by",
+    "event", "events", "edition", "india", "online", "live",
+} | {name for name in CITIES if " " not in name}
+
+# Venue placeholders that carry no location
+PLACEHOLDER_VENUES = {"", "tbd", "tba", "online", "online event", "to be announced"}
+
+# Canonical columns filled from a duplicate when empty
+MERGE_FIELDS = ("description", "image_url", "end_time", "venue_name", "venue_address", "latitude", "longitude")
+
+# (id, is_native, start_time, block key, title sketch, venue sketch)
+Fingerprint = Tuple[int, bool, datetime, tuple, frozenset, Optional[frozenset]]
+
+def normalize(text: Optional[str]) -> str:
+    words = re.findall(r"[a-z0-9]+", (text or "").lower())
+    return " ".join(word for word in words if word not in STOPWORDS)
+
+def sketch(text: str) -> frozenset:
+    """Bottom-k MinHash of the character shingles of `text`."""
+    if len(text) <= SHINGLE_SIZE:
+        hashes = {zlib.crc32(text.encode())} if text else set()
+    else:
+        hashes = {zlib.crc32(text[i:i + SHINGLE_SIZE].encode()) for i in range(len(text) - SHINGLE_SIZE + 1)}
+    if len(hashes) > SKETCH_SIZE:
+        hashes = sorted(hashes)[:SKETCH_SIZE]
+    return frozenset(hashes)
+
+def similarity(a: frozenset, b: frozenset) -> float:
+    """
+    Jaccard similarity of the shingle sets, estimated from two sketches:
+    the share of the k smallest hashes of the union found in both.
+    Exact when both sets have at most SKETCH_SIZE shingles.
+    """
+    if not a or not b:
+        return 0.0
+    if len(a) < SKETCH_SIZE and len(b) < SKETCH_SIZE:
+        # Neither set was cut down: exact
+        return len(a & b) / len(a | b)
+    union = sorted(a | b)[:SKETCH_SIZE]
+    return sum(1 for h in union if h in a and h in b) / len(union)
+
+def fingerprint(row) -> Fingerprint:
+    """Dedup fingerprint of an event row (id, is_native, start_time, location, title, venue)."""
+    if row.online_event:
+        place = "online"
+    elif row.latitude is not None and row.longitude is not None:
+        place = nearest_city(row.latitude, row.longitude)
+    else:
+        place = "unknown"
+
+    venue = " ".join(filter(None, (row.venue_name, row.venue_address)))
+    venue_sketch = None
+    if (row.venue_name or "").strip().lower() not in PLACEHOLDER_VENUES:
+        venue_sketch = sketch(normalize(venue))
+
+    return (row.id, bool(row.is_native), row.start_time, (row.start_time.date(), place), sketch(normalize(row.title)), venue_sketch)
+
+def _score(a: Fingerprint, b: Fingerprint) -> float:
+    score = similarity(a[4], b[4])
+    if a[5] and b[5]:
+        score = TITLE_WEIGHT * score + (1 - TITLE_WEIGHT) * similarity(a[5], b[5])
+    return score
+
+def find_duplicates(fingerprints: Sequence[Fingerprint], only: Optional[Iterable[int]] = None) -> Dict[int, int]:
+    """
+    Groups near-duplicate events and returns {duplicate id: canonical id}.
+    The canonical event of a group is its InfiniteBZ event, else the oldest one.
+    With `only`, just the pairs involving one of those ids are considered.
+    """
+    only = set(only) if only is not None else None
+
+    blocks: Dict[tuple, List[Fingerprint]] = {}
+    for fp in fingerprints:
+        blocks.setdefault(fp[3], []).append(fp)
+
+    # Union-find over matching pairs
+    parent: Dict[int, int] = {}
+
+    def find(event_id: int) -> int:
+        while parent.get(event_id, event_id) != event_id:
+            event_id = parent[event_id]
+        return event_id
+
+    by_id = {fp[0]: fp for fp in fingerprints}
+    for block in blocks.values():
+        if len(block) < 2:
+            continue
+        # Candidate pairs share one of their CANDIDATE_KEYS smallest title
+        # hashes (likely for similar titles, rare for unrelated ones)
+        postings: Dict[int, List[int]] = {}
+        for index, fp in enumerate(block):
+            for h in sorted(fp[4])[:CANDIDATE_KEYS]:
+                postings.setdefault(h, []).append(index)
+
+        compared = set()
+        for members in postings.values():
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    pair = (members[i], members[j])
+                    if pair in compared:
+                        continue
+                    compared.add(pair)
+                    a, b = block[pair[0]], block[pair[1]]
+                    if only is not None and a[0] not in only and b[0] not in only:
+                        continue
+                    if abs(a[2] - b[2]) > DEDUP_MAX_START_GAP or _score(a, b) < DEDUP_THRESHOLD:
+                        continue
+                    root_a, root_b = find(a[0]), find(b[0])
+                    if root_a != root_b:
+                        parent[root_b] = root_a
+
+    groups: Dict[int, List[int]] = {}
+    for event_id in parent:
+        groups.setdefault(find(event_id), []).append(event_id)
+    for root in list(groups):
+        if root not in parent:
+            groups[root].append(root)
+
+    duplicates = {}
+    for members in groups.values():
+        canonical = min(members, key=lambda event_id: (not by_id[event_id][1], event_id))
+        for event_id in members:
+            # Two InfiniteBZ events are never merged into each other
+            if event_id != canonical and not by_id[event_id][1]:
+                duplicates[event_id] = canonical
+    return duplicates
+
+_FINGERPRINT_COLUMNS = (
+    Event.id, Event.is_native, Event.start_time, Event.online_event, Event.latitude, Event.longitude,
+    Event.title, Event.venue_name, Event.venue_address, Event.canonical_event_id,
+)
+
+async def _merge_details(session: AsyncSession, duplicates: Dict[int, int]):
+    """Fills empty MERGE_FIELDS of each canonical event from its duplicates."""
+    ids = set(duplicates) | set(duplicates.values())
+    result = await session.execute(
+        select(Event.id, *(getattr(Event, field) for field in MERGE_FIELDS)).where(Event.id.in_(ids))
+    )
+    rows = {row.id: row for row in result.all()}
+
+    changes: Dict[int, Dict] = {}
+    for duplicate_id, canonical_id in sorted(duplicates.items()):
+        canonical, duplicate = rows.get(canonical_id), rows.get(duplicate_id)
+        if canonical is None or duplicate is None:
+            continue
+        filled = changes.setdefault(canonical_id, {})
+        for field in MERGE_FIELDS:
+            if getattr(canonical, field) in (None, "") and field not in filled and getattr(duplicate, field) not in (None, ""):
+                filled[field] = getattr(duplicate, field)
+
+    # One executemany per changed-column set
+    by_columns: Dict[tuple, List[Dict]] = {}
+    for canonical_id, filled in changes.items():
+        if filled:
+            by_columns.setdefault(tuple(sorted(filled)), []).append({"id": canonical_id, **filled})
+    for params in by_columns.values():
+        await session.execute(update(Event), params)
+
+async def dedupe_events(session: AsyncSession, event_ids: Sequence[int]) -> List[int]:
+    """
+    Matches the given (new or changed) events against the visible events of
+    the same days and marks the duplicates. Does not commit.
+    Returns the ids of the events that were hidden, shown again or merged into.
+    """
+    if not event_ids:
+        return []
+
+    touched = []
+    for i in range(0, len(event_ids), 500):
+        result = await session.execute(select(*_FINGERPRINT_COLUMNS).where(Event.id.in_(event_ids[i:i + 500])))
+        touched.extend(result.all())
+    if not touched:
+        return []
+
+    # Every visible event on the days the touched events start
+    days = sorted({row.start_time.date() for row in touched})
+    day_filters = [
+        Event.start_time.between(datetime.combine(day, datetime.min.time()), datetime.combine(day, datetime.max.time()))
+        for day in days
+    ]
+    touched_ids = {row.id for row in touched}
+    result = await session.execute(
+        select(*_FINGERPRINT_COLUMNS).where(Event.canonical_event_id == None, or_(*day_filters))
+    )
+    rows = {row.id: row for row in result.all()}
+    rows.update((row.id, row) for row in touched)
+
+    duplicates = find_duplicates([fingerprint(row) for row in rows.values()], only=touched_ids)
+
+    changed: Dict[int, Optional[int]] = {}
+    for row in touched:
+        target = duplicates.get(row.id)
+        if row.canonical_event_id != target:
+            changed[row.id] = target
+    for event_id, canonical_id in duplicates.items():
+        if event_id not in touched_ids and rows[event_id].canonical_event_id != canonical_id:
+            changed[event_id] = canonical_id
+
+    if changed:
+        await session.execute(update(Event), [{"id": event_id, "canonical_event_id": canonical_id} for event_id, canonical_id in changed.items()])
+        # Events that pointed at a now-duplicate follow it to its canonical event
+        merged = {event_id: canonical_id for event_id, canonical_id in changed.items() if canonical_id is not None}
+        if merged:
+            table = Event.__table__
+            await session.execute(
+                update(table).where(table.c.canonical_event_id == bindparam("old_id")).values(canonical_event_id=bindparam("new_id")),
+                [{"old_id": event_id, "new_id": canonical_id} for event_id, canonical_id in merged.items()],
+            )
+            await _merge_details(session, merged)
+            print(f"Dedup: merged {len(merged)} events into their canonical listing.")
+
+    return sorted(set(changed) | {canonical_id for canonical_id in changed.values() if canonical_id is not None})
+
+async def release_duplicates(session: AsyncSession, event_ids: Sequence[int]) -> List[int]:
+    """
+    Makes the duplicates of events about to be deleted visible again
+    (and keeps the foreign key satisfied). Returns their ids. Does not commit.
+    """
+    if not event_ids:
+        return []
+    result = await session.execute(select(Event.id).where(Event.canonical_event_id.in_(event_ids)))
+    released = [event_id for event_id in result.scalars().all() if event_id not in set(event_ids)]
+    await session.execute(
+        update(Event.__table__).where(Event.__table__.c.canonical_event_id.in_(event_ids)).values(canonical_event_id=None)
+    )
+    return released
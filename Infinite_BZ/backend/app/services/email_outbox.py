@@ -0,0 +1,353 @@
+"""
+Durable email outbox with a pooled SMTP sender.
+
+Emails are not sent inside requests. enqueue_* adds an EmailOutbox row to
+the caller's session, so the email is committed together with the change
+that triggers it (e.g. the registration). A background OutboxSender in
+every worker then:
+
+  - claims due rows in batches (status SENDING with a lease, so two
+    workers never take the same row and a crashed sender's rows come back
+    after OUTBOX_LEASE_SECONDS; a slow batch renews the lease of its rows
+    at half time and only records results for the rows it still holds)
+  - builds each message at send time (ticket PDF from
+    services/ticket_service.py, attached from memory)
+  - sends the batch over one reused aiosmtplib connection, closed after
+    OUTBOX_SMTP_IDLE_SECONDS without mail
+  - retries transient failures with exponential backoff
+    (OUTBOX_RETRY_BASE_SECONDS * 2^(attempt-1), up to OUTBOX_MAX_ATTEMPTS);
+    5xx rejections fail at once
+
+Delivery is at-least-once: a sender that dies between the SMTP send and
+the commit re-sends those rows after the lease.
+
+Configuration (.env, SMTP settings are the MAIL_* ones of core/email_utils.py):
+    OUTBOX_BATCH_SIZE=50
+    OUTBOX_POLL_SECONDS=5
+    OUTBOX_MAX_ATTEMPTS=8
+    OUTBOX_RETRY_BASE_SECONDS=30
+    OUTBOX_LEASE_SECONDS=300
+    OUTBOX_SMTP_IDLE_SECONDS=60
+"""
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Set
+
+import aiosmtplib
+from sqlalchemy import and_, or_, update
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import email_utils
+from app.core.database import engine
+from app.core.metrics import counter, histogram
+from app.models.schemas import EmailOutbox
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_POLL_SECONDS = float(os.getenv("OUTBOX_POLL_SECONDS", "5"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_RETRY_BASE_SECONDS = float(os.getenv("OUTBOX_RETRY_BASE_SECONDS", "30"))
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "300"))
+OUTBOX_SMTP_IDLE_SECONDS = float(os.getenv("OUTBOX_SMTP_IDLE_SECONDS", "60"))
+MAX_RETRY_DELAY = timedelta(hours=6)
+# Claim attempts per batch when other workers keep winning the same rows
+CLAIM_TRIES = 3
+
+PENDING, SENDING, SENT, FAILED = "PENDING", "SENDING", "SENT", "FAILED"
+EVENT_TICKET = "event_ticket"
+
+outbox_emails = counter("email_outbox_emails_total", "Outbox emails by result (sent, retry, failed)")
+outbox_batch_seconds = histogram("email_outbox_batch_seconds", "Time to build and send one outbox batch")
+smtp_connects = counter("email_outbox_smtp_connections_total", "SMTP connections opened by the outbox sender")
+
+# --- Enqueue ---
+
+def enqueue_ticket_email(
+    session: AsyncSession,
+    recipient: str,
+    event_data: dict,
+    confirmation_id: str,
+    user_name: Optional[str] = None,
+) -> EmailOutbox:
+    """
+    Adds the ticket email of a registration to the outbox. Does not commit:
+    the row is committed with the caller's transaction.
+    """
+    row = EmailOutbox(
+        kind=EVENT_TICKET,
+        recipient=recipient,
+        payload={"event_data": event_data, "confirmation_id": confirmation_id, "user_name": user_name},
+    )
+    session.add(row)
+    return row
+
+# --- Message builders (kind -> EmailMessage) ---
+
+async def _build_event_ticket(row: EmailOutbox) -> EmailMessage:
+    from app.services.ticket_service import get_ticket
+
+    payload = row.payload
+    event_data = payload["event_data"]
+    title = event_data.get('title', 'Event')
+    ticket = await get_ticket(event_data, row.recipient, payload["confirmation_id"], payload.get("user_name"))
+
+    message = EmailMessage()
+    message["From"] = email_utils.MAIL_FROM
+    message["To"] = row.recipient
+    message["Subject"] = f"Your Event Ticket for {title}"
+    message.set_content(
+        f"Thank you for registering for {title}.\n"
+        f"Your event ticket is attached as a PDF. Please bring this ticket to the event.\n"
+    )
+    message.add_alternative(f"""
+    <html>
+        <body style="font-family: Arial, sans-serif; padding: 20px; background-color: #f4f4f4;">
+            <div style="max-width: 600px; margin: 0 auto; background: white; padding: 30px; border-radius: 10px;">
+                <h2 style="color: #333;">Event Registration Confirmed</h2>
+                <p>Thank you for registering for <strong>{event_data.get('title', 'the event')}</strong>.</p>
+                <p>Your event ticket is attached as a PDF. Please bring this ticket to the event.</p>
+                <p>You can also scan the QR code below:</p>
+                <img src="data:image/png;base64,{ticket.qr_base64}" alt="QR Code" style="max-width: 200px;" />
+                <p style="font-size: 12px; color: #888;">Please bring this to the event.</p>
+            </div>
+        </body>
+    </html>
+    """, subtype="html")
+    message.add_attachment(ticket.pdf, maintype="application", subtype="pdf", filename=f"{title}_ticket.pdf")
+    return message
+
+MESSAGE_BUILDERS = {
+    EVENT_TICKET: _build_event_ticket,
+}
+
+# --- SMTP ---
+
+class PooledSMTP:
+    """One SMTP connection, opened on demand and reused across sends."""
+
+    def __init__(self):
+        self._smtp: Optional[aiosmtplib.SMTP] = None
+        self._last_used = 0.0
+
+    async def _connect(self):
+        await self.close()
+        smtp = aiosmtplib.SMTP(
+            hostname=email_utils.MAIL_SERVER,
+            port=email_utils.MAIL_PORT,
+            use_tls=email_utils.MAIL_SSL_TLS,
+            start_tls=email_utils.MAIL_STARTTLS and not email_utils.MAIL_SSL_TLS,
+            timeout=30,
+        )
+        await smtp.connect()
+        if email_utils.MAIL_USE_CREDENTIALS:
+            await smtp.login(email_utils.MAIL_USERNAME, email_utils.MAIL_PASSWORD)
+        smtp_connects.inc()
+        self._smtp = smtp
+
+    async def send(self, message: EmailMessage):
+        if self._smtp is None or not self._smtp.is_connected:
+            await self._connect()
+        try:
+            await self._smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            # Server closed the idle connection; one fresh attempt
+            await self._connect()
+            await self._smtp.send_message(message)
+        self._last_used = time.monotonic()
+
+    async def close_if_idle(self):
+        if self._smtp is not None and time.monotonic() - self._last_used > OUTBOX_SMTP_IDLE_SECONDS:
+            await self.close()
+
+    async def close(self):
+        if self._smtp is None:
+            return
+        try:
+            if self._smtp.is_connected:
+                await self._smtp.quit()
+        except Exception:
+            self._smtp.close()
+        self._smtp = None
+
+def _is_permanent(error: Exception) -> bool:
+    """5xx replies (bad recipient, rejected content) will not succeed on retry."""
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(500 <= refused.code < 600 for refused in error.recipients)
+    if isinstance(error, aiosmtplib.SMTPResponseException):
+        return 500 <= error.code < 600 and not isinstance(error, aiosmtplib.SMTPAuthenticationError)
+    return isinstance(error, (KeyError, ValueError))  # unknown kind / bad payload
+
+def _is_connection_error(error: Exception) -> bool:
+    """The SMTP server is unreachable or refuses our login: no point trying the rest of the batch now."""
+    return isinstance(error, (aiosmtplib.SMTPConnectError, aiosmtplib.SMTPServerDisconnected,
+                              aiosmtplib.SMTPTimeoutError, aiosmtplib.SMTPAuthenticationError,
+                              ConnectionError, OSError))
+
+def retry_delay(attempts: int) -> timedelta:
+    return min(timedelta(seconds=OUTBOX_RETRY_BASE_SECONDS * 2 ** (attempts - 1)), MAX_RETRY_DELAY)
+
+# --- Sender ---
+
+class OutboxSender:
+    def __init__(self, batch_size: int = OUTBOX_BATCH_SIZE, poll_seconds: float = OUTBOX_POLL_SECONDS):
+        self.batch_size = batch_size
+        self.poll_seconds = poll_seconds
+        self.smtp = PooledSMTP()
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    def wake(self):
+        """Send now instead of at the next poll (call after committing outbox rows)."""
+        self._wake.set()
+
+    async def start(self):
+        if not email_utils.ENABLE_EMAIL:
+            print("Email outbox: email is not configured, sender not started.")
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.smtp.close()
+
+    async def _run(self):
+        while True:
+            try:
+                handled = await self.send_due()
+            except Exception as e:
+                print(f"Email outbox: batch failed: {e}")
+                handled = 0
+            if handled >= self.batch_size:
+                continue  # more rows are waiting
+
+            await self.smtp.close_if_idle()
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self, session: AsyncSession) -> List[EmailOutbox]:
+        now = datetime.now()
+        due = or_(
+            and_(EmailOutbox.status == PENDING, EmailOutbox.next_attempt_at <= now),
+            and_(EmailOutbox.status == SENDING, EmailOutbox.locked_until < now),
+        )
+        for _ in range(CLAIM_TRIES):
+            result = await session.execute(
+                select(EmailOutbox.id).where(due).order_by(EmailOutbox.next_attempt_at).limit(self.batch_size)
+            )
+            candidate_ids = result.scalars().all()
+            if not candidate_ids:
+                return []
+
+            # Re-checking `due` makes the claim safe against other workers
+            token = uuid.uuid4().hex
+            await session.execute(
+                update(EmailOutbox)
+                .where(EmailOutbox.id.in_(candidate_ids), due)
+                .values(status=SENDING, claimed_by=token, locked_until=now + timedelta(seconds=OUTBOX_LEASE_SECONDS))
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+
+            result = await session.execute(
+                select(EmailOutbox).where(EmailOutbox.claimed_by == token).order_by(EmailOutbox.id)
+            )
+            rows = result.scalars().all()
+            if rows:
+                return rows
+            # Another worker claimed these first; look for the next due rows
+        return []
+
+    async def _renew_lease(self, session: AsyncSession, token: str, ids: List[int]) -> Set[int]:
+        """
+        Extends the lease of the rows still claimed under `token`. Returns
+        their ids; the others were re-claimed after the lease ran out.
+        """
+        await session.execute(
+            update(EmailOutbox)
+            .where(EmailOutbox.id.in_(ids), EmailOutbox.claimed_by == token, EmailOutbox.status == SENDING)
+            .values(locked_until=datetime.now() + timedelta(seconds=OUTBOX_LEASE_SECONDS))
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        result = await session.execute(
+            select(EmailOutbox.id).where(EmailOutbox.id.in_(ids), EmailOutbox.claimed_by == token)
+        )
+        return set(result.scalars().all())
+
+    async def send_due(self) -> int:
+        """Sends one batch of due emails. Returns the number of rows handled."""
+        async with self._async_session() as session:
+            rows = await self._claim(session)
+            if not rows:
+                return 0
+
+            token = rows[0].claimed_by
+            lease = timedelta(seconds=OUTBOX_LEASE_SECONDS)
+            renew_at = datetime.now() + lease / 2
+            start = time.perf_counter()
+            updates: List[Dict] = []
+            server_down = False
+            lost: Set[int] = set()
+            for row in rows:
+                now = datetime.now()
+                if now >= renew_at:
+                    # A slow batch must not outlive its lease: another worker
+                    # would claim its rows (sent ones too, until the results
+                    # are committed) and send them again
+                    held = await self._renew_lease(session, token, [r.id for r in rows if r.id not in lost])
+                    lost.update(r.id for r in rows if r.id not in held)
+                    renew_at = datetime.now() + lease / 2
+                if row.id in lost:
+                    continue
+                if server_down:
+                    # Not attempted: back to the queue without using up an attempt
+                    updates.append({"id": row.id, "status": PENDING, "next_attempt_at": now + retry_delay(1),
+                                    "claimed_by": None, "locked_until": None})
+                    continue
+                try:
+                    message = await MESSAGE_BUILDERS[row.kind](row)
+                    await self.smtp.send(message)
+                except Exception as e:
+                    attempts = row.attempts + 1
+                    if _is_permanent(e) or attempts >= OUTBOX_MAX_ATTEMPTS:
+                        result, values = "failed", {"status": FAILED}
+                    else:
+                        result, values = "retry", {"status": PENDING, "next_attempt_at": now + retry_delay(attempts)}
+                    print(f"Email outbox: {row.kind} to {row.recipient} failed ({result}, attempt {attempts}): {e}")
+                    server_down = _is_connection_error(e)
+                    updates.append({"id": row.id, "attempts": attempts, "last_error": str(e)[:1000],
+                                    "claimed_by": None, "locked_until": None, **values})
+                else:
+                    result = "sent"
+                    updates.append({"id": row.id, "status": SENT, "sent_at": now, "attempts": row.attempts + 1,
+                                    "claimed_by": None, "locked_until": None, "last_error": None})
+                outbox_emails.inc(result=result)
+
+            if lost:
+                print(f"Email outbox: {len(lost)} rows were claimed by another sender after the lease ran out.")
+            if updates:
+                # Only rows this batch still owns; a re-claimed row belongs to its new sender
+                await session.execute(
+                    update(EmailOutbox).where(EmailOutbox.claimed_by == token).execution_options(synchronize_session=None),
+                    updates,
+                )
+            await session.commit()
+            outbox_batch_seconds.observe(time.perf_counter() - start)
+            return len(rows) - len(lost)
+
+outbox_sender = OutboxSender()
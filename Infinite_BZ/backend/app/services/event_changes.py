@@ -0,0 +1,153 @@
+"""
+Notifies caches and in-memory indexes that events were created, updated
+or deleted. Every write path calls notify_events_changed() after commit.
+
+Listeners run at once in the worker that made the change. The change is
+also recorded in the EventChange table, and an EventChangeFeed in every
+worker polls it and replays the other workers' changes to its own
+listeners, so their caches and indexes follow within a poll interval.
+
+Configuration (.env):
+    EVENT_CHANGES_POLL_SECONDS=5
+    EVENT_CHANGES_KEEP_SECONDS=600
+"""
+import asyncio
+import inspect
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Iterable, List, Optional, Set
+
+from sqlalchemy import delete, func
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.models.schemas import EventChange
+
+EVENT_CHANGES_POLL_SECONDS = float(os.getenv("EVENT_CHANGES_POLL_SECONDS", "5"))
+EVENT_CHANGES_KEEP_SECONDS = int(os.getenv("EVENT_CHANGES_KEEP_SECONDS", "600"))
+# Rows younger than this are read again on the next poll: an insert that
+# got a lower id may commit after one with a higher id
+COMMIT_LAG = timedelta(seconds=30)
+RECORD_BATCH_SIZE = 1000
+
+# Identifies this worker's own rows in the feed
+WORKER_ID = uuid.uuid4().hex
+
+_listeners: List[Callable] = []
+
+def on_events_changed(listener: Callable):
+    """
+    Registers `listener(event_ids)`; may be a plain or async function.
+    event_ids is a list of affected ids, or None when unknown / bulk.
+    Usable as a decorator.
+    """
+    _listeners.append(listener)
+    return listener
+
+async def notify_events_changed(event_ids: Optional[Iterable[int]] = None):
+    ids = list(event_ids) if event_ids is not None else None
+    try:
+        await _record(ids)
+    except Exception as e:
+        # Other workers catch up at their next full reload; the write stands
+        print(f"Event changes: could not record change for other workers: {e}")
+    await _dispatch(ids)
+
+async def _dispatch(ids: Optional[List[int]]):
+    for listener in _listeners:
+        try:
+            result = listener(ids)
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            # A failing cache must never fail the write that triggered it
+            print(f"Event change listener {getattr(listener, '__name__', listener)} failed: {e}")
+
+def _session_factory():
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+async def _record(ids: Optional[List[int]]):
+    if ids is not None and not ids:
+        return
+    async with _session_factory()() as session:
+        if ids is None:
+            session.add(EventChange(event_id=None, origin=WORKER_ID))
+        else:
+            for i in range(0, len(ids), RECORD_BATCH_SIZE):
+                session.add_all(EventChange(event_id=event_id, origin=WORKER_ID) for event_id in ids[i:i + RECORD_BATCH_SIZE])
+                await session.flush()
+        await session.commit()
+
+class EventChangeFeed:
+    """
+    Replays the changes recorded by other workers to this worker's listeners.
+    """
+    def __init__(self, poll_seconds: float = EVENT_CHANGES_POLL_SECONDS):
+        self.poll_seconds = poll_seconds
+        self._task: Optional[asyncio.Task] = None
+        # Every change with an id up to here has been handled; the ids above
+        # it that were already replayed are kept in _seen
+        self._low_water = 0
+        self._seen: Set[int] = set()
+
+    async def start(self):
+        # Changes made before this worker started are already in its
+        # startup state (indexes are built after init_db)
+        async with _session_factory()() as session:
+            self._low_water = (await session.execute(select(func.max(EventChange.id)))).scalar() or 0
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.poll()
+            except Exception as e:
+                print(f"Event changes: poll failed: {e}")
+
+    async def poll(self) -> int:
+        """
+        Replays the new changes of other workers. Returns the number of new rows.
+        """
+        now = datetime.now()
+        async with _session_factory()() as session:
+            result = await session.execute(
+                select(EventChange).where(EventChange.id > self._low_water).order_by(EventChange.id)
+            )
+            recent = result.scalars().all()
+
+            await session.execute(
+                delete(EventChange).where(EventChange.changed_at < now - timedelta(seconds=EVENT_CHANGES_KEEP_SECONDS))
+            )
+            await session.commit()
+
+        rows = [row for row in recent if row.id not in self._seen]
+        self._seen.update(row.id for row in rows)
+        # Rows older than COMMIT_LAG are final: no lower id can still appear
+        settled = [row.id for row in recent if row.changed_at < now - COMMIT_LAG]
+        if settled:
+            self._low_water = max(self._low_water, max(settled))
+            self._seen = {change_id for change_id in self._seen if change_id > self._low_water}
+
+        foreign = [row for row in rows if row.origin != WORKER_ID]
+        if not foreign:
+            return len(rows)
+        if any(row.event_id is None for row in foreign):
+            await _dispatch(None)
+        else:
+            await _dispatch(list(dict.fromkeys(row.event_id for row in foreign)))
+        return len(rows)
+
+event_change_feed = EventChangeFeed()
@@ -0,0 +1,77 @@
+"""
+Streaming export of the events feed as NDJSON or CSV.
+
+Rows are read through a server-side cursor (`yield_per`) and written out in
+chunks, so memory stays flat no matter how many events match.
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator
+
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.models.schemas import Event
+from app.services.event_query import EventFilterSpec
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Public columns only: raw_data and meeting_link can hold private details
+EXPORT_COLUMNS = [
+    Event.id, Event.eventbrite_id, Event.title, Event.description,
+    Event.start_time, Event.end_time, Event.timezone,
+    Event.url, Event.image_url, Event.venue_name, Event.venue_address,
+    Event.organizer_name, Event.is_free, Event.online_event,
+    Event.is_native, Event.source, Event.capacity, Event.created_at,
+]
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+# Rows fetched per round-trip and written per chunk
+EXPORT_BATCH_SIZE = 1000
+
+def _json_value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+def _export_statement(spec: EventFilterSpec, dialect: str):
+    query, search_rank = spec.apply(select(*EXPORT_COLUMNS), dialect)
+    # Same order as the feed: relevance when searching, else native first, soonest first
+    if search_rank is not None:
+        return query.order_by(search_rank, Event.start_time, Event.id)
+    return query.order_by(Event.is_native.desc(), Event.start_time, Event.id)
+
+async def stream_events_export(spec: EventFilterSpec, fmt: str) -> AsyncIterator[str]:
+    """
+    Yields the export body chunk by chunk.
+
+    Opens its own session: a StreamingResponse body runs after the request's
+    dependencies (get_session) have already been closed.
+    """
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with async_session() as session:
+        query = _export_statement(spec, session.bind.dialect.name)
+        result = await session.stream(query.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_FIELDS)
+            async for rows in result.partitions():
+                writer.writerows(rows)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue()
+        else:
+            async for rows in result.partitions():
+                yield "".join(
+                    json.dumps({name: _json_value(value) for name, value in zip(EXPORT_FIELDS, row)}) + "\n"
+                    for row in rows
+                )
@@ -0,0 +1,195 @@
+"""
+Bulk upsert of scraped events, shared by POST /sync and the scheduled scraper.
+
+Per batch of scraped events, one SELECT fetches the stored content hashes
+(services/change_detection.py), then:
+  - new events:       one INSERT ... ON CONFLICT (eventbrite_id) DO UPDATE
+  - changed events:   UPDATE of only the columns whose value differs
+  - unchanged events: only last_fetched_at / next_refresh_at are moved on
+New and changed events then get their occurrence rows and are
+deduplicated against other sources.
+Unchanged events are not re-classified and do not invalidate caches.
+"""
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, List
+
+from sqlalchemy import update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.schemas import Event
+from app.services.categorizer import assign_categories
+from app.services.dedup import dedupe_events
+from app.services.recurrence import apply_series, sync_occurrences
+from app.services.ingest_metrics import record_counts, stage
+from app.services.change_detection import content_hash, next_refresh_at
+from app.services.event_changes import notify_events_changed
+from app.services.geocoder import venue_location
+
+UPSERT_BATCH_SIZE = 500
+
+# Never overwritten on conflict: the key itself and the free-form JSON
+# (user edits / enrichment may live there)
+KEEP_ON_CONFLICT = {"id", "eventbrite_id", "raw_data", "created_at"}
+
+# A change to these means the event has to be re-classified
+CATEGORY_FIELDS = {"title", "description"}
+
+def _insert_for(dialect: str):
+    if dialect == "postgresql":
+        return pg_insert
+    if dialect == "sqlite":
+        return sqlite_insert
+    raise NotImplementedError(f"Bulk upsert is not supported on {dialect}")
+
+def _prepare_rows(events_data: List[Dict], now: datetime) -> List[Dict]:
+    """
+    Adds derived columns and drops duplicate eventbrite_ids (last one wins):
+    Postgres rejects a statement that upserts the same key twice.
+    """
+    rows = {}
+    for data in events_data:
+        row = dict(data)
+        row["latitude"], row["longitude"] = venue_location(
+            row.get("venue_address"), row.get("venue_name"), row.get("online_event", False)
+        )
+        row["content_hash"] = content_hash(row)
+        # Series: start_time becomes the next session (after hashing, so a
+        # series does not look changed every week)
+        row.setdefault("recurrence", None)
+        row["series_start"] = None
+        apply_series(row, now)
+        row["last_fetched_at"] = now
+        row["next_refresh_at"] = next_refresh_at(row.get("start_time"), now)
+        rows[row["eventbrite_id"]] = row
+    return list(rows.values())
+
+async def _insert_new(session: AsyncSession, rows: List[Dict]):
+    """
+    INSERT ... ON CONFLICT DO UPDATE; the conflict branch only covers an event
+    inserted concurrently by another scrape since the hash lookup.
+    Returns the inserted / updated rows (id, eventbrite_id, title, description).
+    """
+    insert = _insert_for(session.bind.dialect.name)
+    table = Event.__table__
+
+    columns = set().union(*(row.keys() for row in rows))
+    # executemany needs the same keys in every row
+    rows = [{column: row.get(column) for column in columns} for row in rows]
+    update_columns = sorted(columns - KEEP_ON_CONFLICT)
+
+    stmt = insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.eventbrite_id],
+        set_={column: stmt.excluded[column] for column in update_columns},
+        where=table.c.content_hash.is_distinct_from(stmt.excluded.content_hash),
+    ).returning(table.c.id, table.c.eventbrite_id, table.c.title, table.c.description)
+
+    result = await session.execute(stmt, rows)
+    return result.all()
+
+async def _update_changed(session: AsyncSession, rows: List[Dict]) -> List[SimpleNamespace]:
+    """
+    Writes only the columns that differ from the stored event.
+    Returns (id, title, description) of the events whose title/description changed.
+    """
+    result = await session.execute(
+        select(Event).where(Event.eventbrite_id.in_([row["eventbrite_id"] for row in rows]))
+    )
+    stored = {event.eventbrite_id: event for event in result.scalars().all()}
+
+    # Group by changed-column set: one executemany per shape
+    by_columns: Dict[tuple, List[Dict]] = {}
+    recategorize = []
+    for row in rows:
+        event = stored.get(row["eventbrite_id"])
+        if event is None:
+            continue
+        changes = {
+            column: value for column, value in row.items()
+            if column not in KEEP_ON_CONFLICT and getattr(event, column) != value
+        }
+        by_columns.setdefault(tuple(sorted(changes)), []).append({"id": event.id, **changes})
+        if CATEGORY_FIELDS & changes.keys():
+            recategorize.append(SimpleNamespace(id=event.id, title=row.get("title"), description=row.get("description")))
+
+    for params in by_columns.values():
+        await session.execute(update(Event), params)
+    return recategorize
+
+async def upsert_events(session: AsyncSession, events_data: List[Dict]) -> Dict[str, int]:
+    """
+    Inserts new scraped events and updates changed ones, then re-classifies
+    the touched events, commits and notifies caches.
+    Returns {"inserted", "updated", "unchanged"} counts.
+    """
+    now = datetime.now()
+    rows = _prepare_rows(events_data, now)
+    if not rows:
+        return {"inserted": 0, "updated": 0, "unchanged": 0}
+
+    inserted = updated = unchanged = 0
+    touched_ids = []
+
+    with stage("upsert", items=len(rows)):
+        for i in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[i:i + UPSERT_BATCH_SIZE]
+
+            result = await session.execute(
+                select(Event.id, Event.eventbrite_id, Event.content_hash)
+                .where(Event.eventbrite_id.in_([row["eventbrite_id"] for row in batch]))
+            )
+            stored = {row.eventbrite_id: row for row in result.all()}
+
+            new_rows, changed_rows, unchanged_params = [], [], []
+            for row in batch:
+                current = stored.get(row["eventbrite_id"])
+                if current is None:
+                    new_rows.append(row)
+                elif current.content_hash != row["content_hash"]:
+                    changed_rows.append(row)
+                else:
+                    unchanged_params.append({
+                        "id": current.id,
+                        "last_fetched_at": row["last_fetched_at"],
+                        "next_refresh_at": row["next_refresh_at"],
+                    })
+
+            if new_rows:
+                written = await _insert_new(session, new_rows)
+                inserted += len(written)
+                touched_ids.extend(row.id for row in written)
+                await assign_categories(session, written)
+                unchanged += len(new_rows) - len(written)
+
+            if changed_rows:
+                recategorize = await _update_changed(session, changed_rows)
+                updated += len(changed_rows)
+                touched_ids.extend(stored[row["eventbrite_id"]].id for row in changed_rows)
+                await assign_categories(session, recategorize)
+
+            if unchanged_params:
+                # Only push the refresh schedule forward
+                await session.execute(update(Event), unchanged_params)
+                unchanged += len(unchanged_params)
+
+    if touched_ids:
+        # Sessions for date filters / calendar (services/recurrence.py)
+        with stage("occurrences", items=len(touched_ids)):
+            await sync_occurrences(session, touched_ids)
+        # Merge listings that duplicate another source (services/dedup.py)
+        with stage("dedup", items=len(touched_ids)):
+            touched_ids.extend(await dedupe_events(session, touched_ids))
+
+    with stage("commit"):
+        await session.commit()
+    if touched_ids:
+        # Caches, autocomplete and other listeners
+        with stage("index_update", items=len(touched_ids)):
+            await notify_events_changed(touched_ids)
+
+    record_counts(events_found=len(rows), inserted=inserted, updated=updated, unchanged=unchanged)
+    return {"inserted": inserted, "updated": updated, "unchanged": unchanged}
@@ -0,0 +1,274 @@
+import base64
+import hashlib
+import json
+from typing import List, Optional, Tuple
+from datetime import datetime, timedelta
+from sqlalchemy import func, and_, or_, tuple_
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlmodel import SQLModel
+
+from app.models.schemas import Event, EventOccurrence
+from app.services.search_index import apply_search
+from app.services.categorizer import category_filter
+from app.services.event_source import normalize_source
+from app.services.geocoder import geocode
+from app.services.geo_index import apply_radius
+
+DEFAULT_RADIUS_KM = 25
+
+class EventFilterSpec(SQLModel):
+    """
+    The filters of an events listing, compiled once into a single statement.
+    Shared by GET /events, GET /admin/events and GET /events/my-events so the
+    page query and its total can never drift apart again.
+    """
+    city: Optional[str] = None
+    category: Optional[str] = None
+    search: Optional[str] = None
+    source: Optional[str] = None
+    is_free: Optional[str] = None  # 'free', 'paid', or None
+    mode: Optional[str] = None     # 'online', 'offline', or None
+    date: Optional[str] = None     # 'YYYY-MM-DD'
+    created_by: Optional[str] = None
+    # Radius search: an explicit point, or a place name resolved by the gazetteer
+    lat: Optional[float] = None
+    lon: Optional[float] = None
+    near: Optional[str] = None
+    radius_km: Optional[float] = None
+
+    def apply(self, query, dialect: str):
+        """
+        Adds every active filter to `query`.
+        Returns (query, search_rank) where search_rank is an ORDER BY element
+        when a full-text search is active, else None.
+        """
+        search_rank = None
+
+        # Near-duplicates merged into another listing (services/dedup.py)
+        query = query.where(Event.canonical_event_id == None)
+
+        # 0. Category/Industry Filter (classified at ingest, see services/categorizer.py)
+        if self.category and self.category.lower() != "all":
+            query = query.where(category_filter(self.category))
+
+        # 1. City Filter
+        if self.city and self.city.lower() != "all":
+            query = query.where(Event.venue_address.ilike(f"%{self.city}%"))
+
+        # 2. Search Filter (Title, Desc, Venue, Organizer) via the full-text index
+        if self.search:
+            query, search_rank = apply_search(query, self.search, dialect)
+
+        # 3. Source Filter (Platform), stored at ingest in Event.source
+        if self.source and self.source.strip().lower() != "all":
+            query = query.where(Event.source == normalize_source(self.source))
+
+        # 4. Cost Filter
+        if self.is_free:
+            if self.is_free.lower() == "free":
+                query = query.where(Event.is_free == True)
+            elif self.is_free.lower() == "paid":
+                query = query.where(Event.is_free == False)
+
+        # 5. Mode Filter
+        if self.mode:
+            if self.mode.lower() == "online":
+                query = query.where(Event.online_event == True)
+            elif self.mode.lower() == "offline":
+                query = query.where(Event.online_event == False)
+
+        # 6. Date Filter
+        # Events with a session that day (services/recurrence.py), so every
+        # week of a series matches. Start times are the event's local
+        # wall-clock time (Eventbrite start.local, or what the organizer typed
+        # in their own `timezone`), so the half-open range [day 00:00, next day
+        # 00:00) is that calendar day in the event's timezone - and, unlike
+        # CAST(start_time AS DATE), it is a range scan on ix_occurrence_start.
+        if self.date:
+            try:
+                day_start = datetime.strptime(self.date, "%Y-%m-%d")
+                query = query.where(Event.id.in_(
+                    select(EventOccurrence.event_id).where(
+                        EventOccurrence.start_time >= day_start,
+                        EventOccurrence.start_time < day_start + timedelta(days=1)
+                    )
+                ))
+            except ValueError:
+                pass # Ignore invalid date formats
+
+        # 7. Creator Filter (user generated events)
+        if self.created_by:
+            query = query.where(Event.raw_data.contains({"created_by": self.created_by}))
+
+        # 8. Location Filter ("events near me")
+        if self.lat is not None and self.lon is not None:
+            point = (self.lat, self.lon)
+        else:
+            point = geocode(self.near)
+        if point:
+            radius_km = self.radius_km or DEFAULT_RADIUS_KM
+            query = apply_radius(query, point[0], point[1], radius_km, dialect)
+        elif self.near:
+            # Place not in the gazetteer: match it in the address like the city filter
+            query = query.where(Event.venue_address.ilike(f"%{self.near}%"))
+
+        return query, search_rank
+
+    def count_statement(self, dialect: str):
+        query, _ = self.apply(select(func.count()).select_from(Event), dialect)
+        return query
+
+def encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(token: str) -> dict:
+    """
+    Parses a cursor produced by encode_cursor. Raises ValueError if malformed.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(payload, dict) or ("k" not in payload and "o" not in payload):
+        raise ValueError("Invalid cursor")
+    return payload
+
+def _cursor_signature(spec: EventFilterSpec, order: str) -> str:
+    """
+    Short hash of the filters and order a cursor was issued for, so it is not
+    replayed against another query (its position and total would not apply).
+    """
+    filters = spec.dict()
+    for name in ("city", "category", "search", "source", "is_free", "mode", "near"):
+        # Compared case-insensitively by apply(); "all" is no filter
+        value = filters[name].lower() if filters[name] else None
+        if name in ("city", "category", "source") and value == "all":
+            value = None
+        filters[name] = value
+    raw = json.dumps([order, filters], sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+def _keyset_columns(order: str):
+    # Sort keys of each keyset ordering, matching the indexes on Event
+    if order == "feed":
+        return ("is_native", "start_time", "id")
+    return ("start_time", "id")
+
+def _keyset_values(event: Event, order: str) -> list:
+    values = []
+    for name in _keyset_columns(order):
+        value = getattr(event, name)
+        values.append(value.isoformat() if isinstance(value, datetime) else value)
+    return values
+
+def _after_keyset(order: str, values: list):
+    """
+    WHERE clause selecting rows strictly after the cursor position.
+    feed:  ORDER BY is_native DESC, start_time ASC, id ASC
+    start: ORDER BY start_time ASC, id ASC
+    """
+    if order == "feed":
+        is_native, start_time, event_id = values
+        start_time = datetime.fromisoformat(start_time)
+        same_group = and_(
+            Event.is_native == bool(is_native),
+            tuple_(Event.start_time, Event.id) > tuple_(start_time, int(event_id))
+        )
+        if is_native:
+            # Native events come first, so every non-native event is "after"
+            return or_(same_group, Event.is_native == False)
+        return same_group
+
+    start_time, event_id = values
+    return tuple_(Event.start_time, Event.id) > tuple_(datetime.fromisoformat(start_time), int(event_id))
+
+def _keyset_order_by(order: str):
+    if order == "feed":
+        return (Event.is_native.desc(), Event.start_time, Event.id)
+    return (Event.start_time, Event.id)
+
+async def fetch_event_page(
+    session: AsyncSession,
+    spec: EventFilterSpec,
+    order: str = "feed",
+    limit: Optional[int] = None,
+    offset: int = 0,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Event], int, Optional[str]]:
+    """
+    Runs the filtered page query and returns (events, total, next_cursor).
+
+    order:
+      "feed"  - InfiniteBZ events first, then start_time (relevance when searching)
+      "start" - start_time only (admin / my-events)
+
+    Pagination:
+      - cursor: keyset pagination. Seeks straight to the position after the
+        previous page via the (is_native, start_time, id) index, so page 500
+        costs the same as page 1. Relevance-ranked search results have no
+        stable key and page by offset inside the cursor instead.
+      - offset: legacy page-number API, still supported for old clients.
+
+    The total comes from `count(*) OVER ()` on the first request and is then
+    carried inside the cursor, so follow-up pages never count again. The
+    cursor also carries a hash of the filters and order; a cursor used with
+    other ones raises ValueError.
+    """
+    dialect = session.bind.dialect.name
+    signature = _cursor_signature(spec, order)
+
+    position = decode_cursor(cursor) if cursor else {}
+    if position and position.get("q") != signature:
+        raise ValueError("Cursor does not match the filters or order of this request")
+    total = position.get("t")
+    if "o" in position:
+        offset = int(position["o"])
+
+    columns = [Event]
+    if total is None:
+        columns.append(func.count().over().label("total_count"))
+
+    query, search_rank = spec.apply(select(*columns), dialect)
+
+    use_keyset = order != "feed" or search_rank is None
+    if use_keyset:
+        query = query.order_by(*_keyset_order_by(order))
+        if "k" in position:
+            try:
+                query = query.where(_after_keyset(order, position["k"]))
+            except (TypeError, ValueError):
+                raise ValueError("Invalid cursor")
+            offset = 0
+    else:
+        query = query.order_by(search_rank, Event.start_time, Event.id)
+
+    if offset:
+        query = query.offset(offset)
+    if limit is not None:
+        query = query.limit(limit)
+
+    result = await session.execute(query)
+    rows = result.all()
+    events = [row[0] for row in rows]
+
+    if total is None:
+        if rows:
+            total = rows[0][1]
+        elif offset:
+            # Past the end: no row to carry the window value
+            count_result = await session.execute(spec.count_statement(dialect))
+            total = count_result.scalar()
+        else:
+            total = 0
+
+    next_cursor = None
+    if limit is not None and len(events) == limit:
+        if use_keyset:
+            next_cursor = encode_cursor({"k": _keyset_values(events[-1], order), "t": total, "q": signature})
+        else:
+            next_cursor = encode_cursor({"o": offset + limit, "t": total, "q": signature})
+
+    return events, total, next_cursor
@@ -0,0 +1,168 @@
+"""
+Scheduled refresh of stored Eventbrite events.
+
+Events are due when their next_refresh_at has passed; the refresh tiers in
+services/change_detection.py make events that start soon due more often
+(hourly within a week, then every 6 hours, daily, weekly). A run:
+
+  - reads due events in keyset batches (id > last id, REFRESH_BATCH_SIZE)
+  - fetches their details concurrently, at most REFRESH_CONCURRENCY
+    requests in flight (EventbriteClient, rate limited)
+  - writes each batch in one transaction through upsert_events, together
+    with the run's RefreshCheckpoint
+
+After a crash the next run continues from the checkpoint of the unfinished
+one. Throughput (events/min) is logged per batch and exported as metrics.
+
+Configuration (.env):
+    REFRESH_INTERVAL_MINUTES=60
+    REFRESH_BATCH_SIZE=200
+    REFRESH_CONCURRENCY=10
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict
+
+from sqlalchemy import or_, update
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.core.metrics import counter, histogram
+from app.models.schemas import Event, RefreshCheckpoint
+from app.services.eventbrite_client import EventbriteClient
+from app.services.event_ingest import upsert_events
+from app.services.ingest_metrics import ingest_run, stage
+
+REFRESH_INTERVAL_MINUTES = int(os.getenv("REFRESH_INTERVAL_MINUTES", "60"))
+REFRESH_BATCH_SIZE = int(os.getenv("REFRESH_BATCH_SIZE", "200"))
+REFRESH_CONCURRENCY = int(os.getenv("REFRESH_CONCURRENCY", "10"))
+# An event whose details could not be fetched is tried again after this
+FAILED_RETRY_DELAY = timedelta(hours=1)
+
+RUNNING, DONE = "RUNNING", "DONE"
+
+refreshed_events = counter("event_refresh_events_total", "Events handled by the refresh job by result (updated, unchanged, failed)")
+refresh_throughput = histogram(
+    "event_refresh_events_per_minute", "Refresh job throughput per batch",
+    buckets=(10, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+)
+
+def _due(cutoff: datetime):
+    return (
+        or_(Event.next_refresh_at == None, Event.next_refresh_at <= cutoff),
+        Event.is_native == False,
+        Event.eventbrite_id != None,
+        Event.eventbrite_id != "unknown",
+    )
+
+async def _open_checkpoint(session: AsyncSession) -> RefreshCheckpoint:
+    """The unfinished run's checkpoint, or a new one."""
+    result = await session.execute(
+        select(RefreshCheckpoint).where(RefreshCheckpoint.status == RUNNING).order_by(RefreshCheckpoint.id.desc())
+    )
+    checkpoint = result.scalars().first()
+    if checkpoint is not None:
+        print(f"Refresh: resuming run {checkpoint.id} after event {checkpoint.last_event_id} ({checkpoint.processed} done).")
+        return checkpoint
+
+    checkpoint = RefreshCheckpoint()
+    session.add(checkpoint)
+    await session.commit()
+    return checkpoint
+
+async def _refresh_batch(session: AsyncSession, client: EventbriteClient, rows) -> Dict[str, int]:
+    """Fetches and upserts one batch. Returns updated / unchanged / failed counts."""
+    from app.services.scraper import build_event_row, parse_event_details
+
+    with stage("api_fetch", items=len(rows)):
+        payloads = await client.get_events(row.eventbrite_id for row in rows)
+
+    events_data = []
+    failed_ids = []
+    for row in rows:
+        payload = payloads.get(row.eventbrite_id)
+        api_data = parse_event_details(row.eventbrite_id, payload) if payload else None
+        if api_data:
+            events_data.append(build_event_row(row.eventbrite_id, api_data, row.organizer_name or "Unknown Organizer"))
+        else:
+            failed_ids.append(row.id)
+
+    if failed_ids:
+        # Keep failures (deleted / private events) from being due on every run
+        await session.execute(
+            update(Event).where(Event.id.in_(failed_ids)).values(next_refresh_at=datetime.now() + FAILED_RETRY_DELAY)
+        )
+
+    # Commits the batch together with the pending checkpoint changes
+    counts = await upsert_events(session, events_data)
+    if not events_data:
+        await session.commit()
+    return {"updated": counts["updated"], "unchanged": counts["unchanged"] + counts["inserted"], "failed": len(failed_ids)}
+
+async def refresh_due_events(batch_size: int = REFRESH_BATCH_SIZE, concurrency: int = REFRESH_CONCURRENCY) -> RefreshCheckpoint:
+    """
+    Refreshes every event that is due, resuming an interrupted run.
+    Returns the run's checkpoint.
+    """
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    work_start = time.perf_counter()
+    handled = 0
+
+    async with ingest_run("refresh"), async_session() as session:
+        checkpoint = await _open_checkpoint(session)
+        cutoff = checkpoint.started_at
+
+        async with EventbriteClient(max_concurrency=concurrency) as client:
+            while True:
+                result = await session.execute(
+                    select(Event.id, Event.eventbrite_id, Event.organizer_name)
+                    .where(*_due(cutoff), Event.id > checkpoint.last_event_id)
+                    .order_by(Event.id)
+                    .limit(batch_size)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+
+                batch_start = time.perf_counter()
+                checkpoint.last_event_id = rows[-1].id
+                checkpoint.processed += len(rows)
+                checkpoint.updated_at = datetime.now()
+                # Staged now, committed with the batch's upsert
+                session.add(checkpoint)
+                counts = await _refresh_batch(session, client, rows)
+
+                # The batch is committed; the counts only feed the report
+                checkpoint.updated += counts["updated"]
+                checkpoint.failed += counts["failed"]
+                await session.execute(
+                    update(RefreshCheckpoint).where(RefreshCheckpoint.id == checkpoint.id)
+                    .values(updated=checkpoint.updated, failed=checkpoint.failed)
+                )
+                await session.commit()
+
+                for result_name, count in counts.items():
+                    refreshed_events.inc(count, result=result_name)
+                handled += len(rows)
+                batch_rate = len(rows) / max(time.perf_counter() - batch_start, 1e-6) * 60
+                refresh_throughput.observe(batch_rate)
+                print(
+                    f"Refresh: {checkpoint.processed} events (last id {checkpoint.last_event_id}), "
+                    f"{counts['updated']} updated, {counts['failed']} failed in this batch - {batch_rate:.0f} events/min"
+                )
+
+        checkpoint.status = DONE
+        checkpoint.finished_at = datetime.now()
+        session.add(checkpoint)
+        await session.commit()
+
+    elapsed = time.perf_counter() - work_start
+    rate = handled / elapsed * 60 if elapsed else 0
+    print(
+        f"Refresh run {checkpoint.id} complete: {checkpoint.processed} events, {checkpoint.updated} updated, "
+        f"{checkpoint.failed} failed. {rate:.0f} events/min."
+    )
+    return checkpoint
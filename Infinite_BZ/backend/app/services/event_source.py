@@ -0,0 +1,30 @@
+from typing import Any, Dict, Optional
+
+# Canonical values of Event.source (also the labels the frontend filter sends)
+SOURCE_NAMES = {
+    "eventbrite": "Eventbrite",
+    "meetup": "Meetup",
+    "infinitebz": "InfiniteBZ",
+}
+
+def normalize_source(source: str) -> str:
+    """Maps user input like 'eventbrite' / 'EventBrite' to the stored value."""
+    key = source.strip().lower()
+    return SOURCE_NAMES.get(key, source.strip())
+
+def derive_source(url: Optional[str], raw_data: Optional[Dict[str, Any]] = None) -> Optional[str]:
+    """
+    Works out an event's platform from raw_data['source'] (e.g. 'eventbrite_api',
+    'InfiniteBZ') or, failing that, from its URL.
+    """
+    candidates = []
+    if raw_data and raw_data.get("source"):
+        candidates.append(str(raw_data["source"]).lower())
+    if url:
+        candidates.append(url.lower())
+
+    for candidate in candidates:
+        for key, name in SOURCE_NAMES.items():
+            if key in candidate:
+                return name
+    return None
@@ -0,0 +1,159 @@
+"""
+Async, pooled client for the Eventbrite REST API.
+
+- One httpx.AsyncClient (keep-alive connection pool) per scrape
+- Bounded concurrency (semaphore) plus a per-host token bucket, so a scrape
+  of 100 cards runs in parallel without tripping Eventbrite's rate limits
+- 429 / 5xx / network errors are retried with exponential backoff + jitter,
+  honouring Retry-After
+
+EVENTBRITE_API_URL can point at a local stub server, `transport` takes an
+in-process stub (httpx.MockTransport) for tests, and SCRAPER_REPLAY_MODE
+records / replays responses (services/replay_store.py).
+"""
+import asyncio
+import os
+import random
+import time
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.services.replay_store import ReplayTransport, get_replay_store
+
+EVENTBRITE_API_URL = os.getenv("EVENTBRITE_API_URL", "https://www.eventbriteapi.com/v3").rstrip("/")
+EVENTBRITE_API_TOKEN = os.getenv("EVENTBRITE_API_TOKEN", "T6WRADHDNPM5S4VYLFR5")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+class TokenBucket:
+    """
+    Allows `rate` requests per second on average, with bursts up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class EventbriteClient:
+    """
+    Usage:
+        async with EventbriteClient() as client:
+            details = await client.get_events(["123", "456"])
+    """
+
+    def __init__(
+        self,
+        base_url: str = EVENTBRITE_API_URL,
+        token: str = EVENTBRITE_API_TOKEN,
+        max_concurrency: int = 10,
+        requests_per_second: float = 8,
+        burst: int = 10,
+        max_retries: int = 4,
+        backoff_seconds: float = 0.5,
+        timeout_seconds: float = 10,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout_seconds = timeout_seconds
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._rate_limited = True
+
+    async def __aenter__(self):
+        store = None if self._transport else get_replay_store()
+        self._client = httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {self.token}"},
+            limits=self._limits,
+            timeout=self.timeout_seconds,
+            # Record/replay for offline benchmarks (services/replay_store.py)
+            transport=self._transport or (ReplayTransport(store) if store else None),
+        )
+        # Replayed responses never reach Eventbrite, so its rate limit does not apply
+        self._rate_limited = not (store and store.replaying)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        self._client = None
+
+    def _bucket(self, url: str) -> TokenBucket:
+        host = urlsplit(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+        return self._buckets[host]
+
+    def _retry_delay(self, attempt: int, response: Optional[httpx.Response]) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return float(retry_after)
+        return self.backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5)
+
+    async def get_json(self, path: str, params: Optional[dict] = None) -> Optional[dict]:
+        """
+        GET base_url + path. Returns the decoded JSON, or None after a
+        non-retryable error or when retries are exhausted.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        bucket = self._bucket(url)
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            async with self._semaphore:
+                if self._rate_limited:
+                    await bucket.acquire()
+                try:
+                    response = await self._client.get(url, params=params)
+                except httpx.HTTPError as e:
+                    error = f"{type(e).__name__}: {e}"
+                else:
+                    if response.status_code == 200:
+                        return response.json()
+                    error = f"{response.status_code} - {response.text[:200]}"
+                    if response.status_code not in RETRY_STATUSES:
+                        print(f"API Error for {url}: {error}")
+                        return None
+
+            if attempt < self.max_retries:
+                delay = self._retry_delay(attempt, response)
+                print(f"API retry {attempt + 1}/{self.max_retries} for {url} in {delay:.1f}s ({error})")
+                await asyncio.sleep(delay)
+
+        print(f"API gave up on {url}: {error}")
+        return None
+
+    async def get_event(self, event_id: str) -> Optional[dict]:
+        return await self.get_json(f"events/{event_id}/", params={"expand": "venue,ticket_classes,organizer"})
+
+    async def get_events(self, event_ids: Iterable[str]) -> Dict[str, dict]:
+        """
+        Fetches many events concurrently. Returns {event_id: json} for the
+        ones that succeeded.
+        """
+        event_ids = list(dict.fromkeys(event_ids))
+        results = await asyncio.gather(*(self.get_event(event_id) for event_id in event_ids))
+        return {event_id: data for event_id, data in zip(event_ids, results) if data is not None}
@@ -0,0 +1,115 @@
+from datetime import datetime, timedelta
+from typing import Dict, List
+from sqlalchemy import func, literal, case, cast, union_all, String
+from sqlalchemy.future import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.models.schemas import Event, EventCategory, EventOccurrence
+from app.services.event_changes import on_events_changed
+from app.services.event_query import EventFilterSpec
+
+# Cities offered in the events sidebar (see frontend CityDropdown)
+FACET_CITIES = ["Chennai", "Bangalore", "Mumbai", "Delhi", "Hyderabad", "Kolkata", "Pune"]
+
+# Facet names match the EventFilterSpec fields they count
+FACETS = ("category", "city", "source", "is_free", "mode", "date")
+
+# Only upcoming days are worth a count in the date picker
+DATE_FACET_DAYS = 30
+
+_facet_cache = TTLCache(ttl_seconds=60, max_size=512)
+
+@on_events_changed
+def _invalidate_facet_cache(event_ids):
+    _facet_cache.clear()
+
+def _facet_value_expressions() -> Dict[str, object]:
+    city_expr = case(
+        *[(Event.venue_address.ilike(f"%{city}%"), city) for city in FACET_CITIES],
+        else_=None
+    )
+    return {
+        "city": city_expr,
+        "source": Event.source,
+        "is_free": case((Event.is_free == True, "free"), else_="paid"),
+        "mode": case((Event.online_event == True, "online"), else_="offline"),
+    }
+
+def _facet_query(spec: EventFilterSpec, facet: str, dialect: str):
+    """
+    Grouped count for one facet. The facet's own filter is dropped so the
+    sidebar shows how many events each alternative option would return.
+    """
+    facet_spec = spec.copy(update={facet: None})
+
+    if facet == "category":
+        value = EventCategory.category
+        query = (
+            select(literal(facet).label("facet"), value.label("value"), func.count().label("count"))
+            .select_from(Event)
+            .join(EventCategory, EventCategory.event_id == Event.id)
+        )
+    elif facet == "date":
+        # Per session day, so a weekly series counts on each of its days
+        value = cast(func.date(EventOccurrence.start_time), String)
+        query = (
+            select(literal(facet).label("facet"), value.label("value"), func.count().label("count"))
+            .select_from(Event)
+            .join(EventOccurrence, EventOccurrence.event_id == Event.id)
+        )
+    else:
+        value = _facet_value_expressions()[facet]
+        query = select(literal(facet).label("facet"), value.label("value"), func.count().label("count")).select_from(Event)
+
+    query, _ = facet_spec.apply(query, dialect)
+
+    if facet == "date":
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        query = query.where(
+            EventOccurrence.start_time >= today,
+            EventOccurrence.start_time < today + timedelta(days=DATE_FACET_DAYS)
+        )
+
+    # Group by the output label: PostgreSQL would not match the CASE in the
+    # select list against a GROUP BY copy with separately bound parameters
+    return query.group_by("value")
+
+async def get_facet_counts(session: AsyncSession, spec: EventFilterSpec) -> dict:
+    """
+    Counts per facet value under the current filters, computed in a single
+    UNION ALL round-trip and cached per filter signature until events change.
+    """
+    cache_key = tuple(sorted(spec.dict(exclude_none=True).items()))
+    cached = _facet_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    dialect = session.bind.dialect.name
+
+    total_query, _ = spec.apply(
+        select(literal("total").label("facet"), literal(None, String).label("value"), func.count().label("count")).select_from(Event),
+        dialect
+    )
+    queries = [total_query] + [
+        _facet_query(spec, facet, dialect)
+        for facet in FACETS
+    ]
+
+    result = await session.execute(union_all(*queries))
+
+    total = 0
+    facets: Dict[str, List[dict]] = {facet: [] for facet in FACETS}
+    for facet, value, count in result.all():
+        if facet == "total":
+            total = count
+        elif value is not None:
+            facets[facet].append({"value": str(value), "count": count})
+
+    for values in facets.values():
+        values.sort(key=lambda v: (-v["count"], v["value"]))
+    facets["date"].sort(key=lambda v: v["value"])
+
+    response = {"total": total, "facets": facets}
+    _facet_cache.set(cache_key, response)
+    return response
@@ -0,0 +1,46 @@
+"""
+Response cache for the public events feed (GET /api/v1/events).
+
+Entries are keyed by the normalized query string and dropped whenever events
+change (create/update/delete, sync, scheduled scraper, expiry cleanup all
+call notify_events_changed).
+"""
+import os
+from urllib.parse import urlencode
+
+from app.core.cache import ResponseCache
+from app.services.event_changes import on_events_changed
+
+FEED_CACHE_TTL_SECONDS = float(os.getenv("FEED_CACHE_TTL_SECONDS", "30"))
+FEED_CACHE_MAX_ENTRIES = int(os.getenv("FEED_CACHE_MAX_ENTRIES", "1024"))
+
+feed_cache = ResponseCache("events_feed", ttl_seconds=FEED_CACHE_TTL_SECONDS, max_size=FEED_CACHE_MAX_ENTRIES)
+
+# Filter values compared case-insensitively by EventFilterSpec / search
+_CASE_INSENSITIVE = {"city", "category", "search", "source", "is_free", "mode", "near"}
+# Filters where "all" means no filter
+_ALL_MEANS_NONE = {"city", "category", "source"}
+
+@on_events_changed
+async def _invalidate_feed_cache(event_ids):
+    await feed_cache.invalidate()
+
+def feed_cache_key(**params) -> str:
+    """
+    Builds the cache key for a feed request, so `?city=Chennai&page=1` and
+    `?page=1&city=chennai&search=` share one entry. Empty values and "all"
+    filters are dropped because they do not change the result. Values are
+    URL-encoded, so `search="x&source=y"` cannot pass for a source filter.
+    """
+    parts = []
+    for name in sorted(params):
+        value = params[name]
+        if value is None or value == "":
+            continue
+        value = str(value).strip()
+        if name in _CASE_INSENSITIVE:
+            value = " ".join(value.lower().split())
+        if name in _ALL_MEANS_NONE and value == "all":
+            continue
+        parts.append((name, value))
+    return urlencode(parts)
@@ -0,0 +1,140 @@
+"""
+Spatial index for "events near me" radius search.
+
+PostgreSQL + PostGIS: a GiST index on the venue point as geography, queried with ST_DWithin.
+SQLite (local dev): an R-tree table `event_geo` kept in sync by triggers.
+Anything else (or PostGIS / R-tree unavailable): bounding box on the
+(latitude, longitude) b-tree index.
+
+In every case the bounding box is refined to a true radius, so all backends
+return the same events.
+"""
+import math
+from typing import Tuple
+
+from sqlalchemy import literal_column, select, table, text
+
+from app.models.schemas import Event
+
+KM_PER_DEGREE_LAT = 111.32
+
+PG_GEO_EXPR = "(ST_SetSRID(ST_MakePoint(event.longitude, event.latitude), 4326)::geography)"
+PG_GEO_INDEX_DDL = f"CREATE INDEX IF NOT EXISTS ix_event_geography ON event USING GIST ({PG_GEO_EXPR})"
+
+SQLITE_GEO_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS event_geo USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+    """
+    CREATE TRIGGER IF NOT EXISTS event_geo_ai AFTER INSERT ON event
+    WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN
+        INSERT INTO event_geo VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_geo_ad AFTER DELETE ON event BEGIN
+        DELETE FROM event_geo WHERE id = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS event_geo_au AFTER UPDATE OF latitude, longitude ON event BEGIN
+        DELETE FROM event_geo WHERE id = old.id;
+        INSERT INTO event_geo
+        SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+        WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+    END
+    """,
+]
+
+# Which index init_geo_index managed to set up ("postgis", "rtree" or "btree")
+_geo_backend = "btree"
+
+
+async def init_geo_index(conn) -> None:
+    """
+    Creates the spatial index if the database supports one. Called from
+    init_db() after create_all; falls back to the plain lat/lon index otherwise.
+    """
+    global _geo_backend
+    dialect = conn.dialect.name
+
+    if dialect == "postgresql":
+        result = await conn.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'postgis'"))
+        if result.first() is None:
+            print("Geo index: PostGIS not installed, using the latitude/longitude index.")
+            return
+        await conn.execute(text(PG_GEO_INDEX_DDL))
+        _geo_backend = "postgis"
+
+    elif dialect == "sqlite":
+        result = await conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'event_geo'")
+        )
+        is_new = result.first() is None
+
+        try:
+            for ddl in SQLITE_GEO_DDL:
+                await conn.execute(text(ddl))
+        except Exception as e:
+            print(f"Geo index: R-tree unavailable ({e}), using the latitude/longitude index.")
+            return
+
+        if is_new:
+            await conn.execute(text(
+                "INSERT INTO event_geo "
+                "SELECT id, latitude, latitude, longitude, longitude FROM event "
+                "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+            ))
+            print("Geo index: built R-tree for existing events.")
+        _geo_backend = "rtree"
+
+
+def bounding_box(lat: float, lon: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    (min_lat, max_lat, min_lon, max_lon) of the box enclosing the circle.
+    """
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    d_lon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 0.01))
+    return lat - d_lat, lat + d_lat, lon - d_lon, lon + d_lon
+
+
+def within_radius(lat: float, lon: float, radius_km: float):
+    """
+    Portable distance check (equirectangular approximation, well under 1%
+    error at city scale). Plain arithmetic, so it also runs on SQLite.
+    """
+    cos_lat = math.cos(math.radians(lat))
+    d_lat = (Event.latitude - lat) * KM_PER_DEGREE_LAT
+    d_lon = (Event.longitude - lon) * (KM_PER_DEGREE_LAT * cos_lat)
+    return d_lat * d_lat + d_lon * d_lon <= radius_km * radius_km
+
+
+def apply_radius(query, lat: float, lon: float, radius_km: float, dialect: str):
+    """
+    Restricts `query` to events within `radius_km` of (lat, lon).
+    """
+    if dialect == "postgresql" and _geo_backend == "postgis":
+        return query.where(
+            text(
+                f"ST_DWithin({PG_GEO_EXPR}, "
+                "ST_SetSRID(ST_MakePoint(:geo_lon, :geo_lat), 4326)::geography, :geo_meters)"
+            ).bindparams(geo_lat=lat, geo_lon=lon, geo_meters=radius_km * 1000)
+        )
+
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+
+    if dialect == "sqlite" and _geo_backend == "rtree":
+        box = (
+            select(literal_column("id"))
+            .select_from(table("event_geo"))
+            .where(
+                literal_column("max_lat") >= min_lat, literal_column("min_lat") <= max_lat,
+                literal_column("max_lon") >= min_lon, literal_column("min_lon") <= max_lon,
+            )
+        )
+        query = query.where(Event.id.in_(box))
+    else:
+        query = query.where(
+            Event.latitude.between(min_lat, max_lat),
+            Event.longitude.between(min_lon, max_lon),
+        )
+
+    return query.where(within_radius(lat, lon, radius_km))
@@ -0,0 +1,137 @@
+"""
+Offline geocoding of venue addresses against a small built-in gazetteer.
+
+Scraped addresses look like "Hotel X, 12 Anna Salai, Saidapet, Chennai,
+Tamil Nadu 600015". Known localities are matched before cities, so an event
+in Saidapet is placed in Saidapet instead of at the centre of Chennai.
+No network calls, so ingest stays fast and deterministic.
+"""
+import math
+import re
+from functools import lru_cache
+from typing import Iterable, Optional, Tuple
+
+from app.models.schemas import Event
+
+# Name (lowercase) -> (latitude, longitude)
+CITIES = {
+    "chennai": (13.0827, 80.2707), "madras": (13.0827, 80.2707),
+    "bangalore": (12.9716, 77.5946), "bengaluru": (12.9716, 77.5946),
+    "mumbai": (19.0760, 72.8777), "bombay": (19.0760, 72.8777),
+    "navi mumbai": (19.0330, 73.0297), "thane": (19.2183, 72.9781),
+    "delhi": (28.6139, 77.2090), "new delhi": (28.6139, 77.2090),
+    "gurgaon": (28.4595, 77.0266), "gurugram": (28.4595, 77.0266),
+    "noida": (28.5355, 77.3910), "ghaziabad": (28.6692, 77.4538), "faridabad": (28.4089, 77.3178),
+    "hyderabad": (17.3850, 78.4867), "secunderabad": (17.4399, 78.4983),
+    "kolkata": (22.5726, 88.3639), "calcutta": (22.5726, 88.3639),
+    "pune": (18.5204, 73.8567),
+    "ahmedabad": (23.0225, 72.5714), "jaipur": (26.9124, 75.7873),
+    "kochi": (9.9312, 76.2673), "cochin": (9.9312, 76.2673),
+    "coimbatore": (11.0168, 76.9558), "madurai": (9.9252, 78.1198),
+    "tiruchirappalli": (10.7905, 78.7047), "trichy": (10.7905, 78.7047),
+    "pondicherry": (11.9416, 79.8083), "puducherry": (11.9416, 79.8083),
+    "vellore": (12.9165, 79.1325), "salem": (11.6643, 78.1460),
+    "mysore": (12.2958, 76.6394), "mysuru": (12.2958, 76.6394),
+    "mangalore": (12.9141, 74.8560), "mangaluru": (12.9141, 74.8560),
+    "thiruvananthapuram": (8.5241, 76.9366), "trivandrum": (8.5241, 76.9366),
+    "visakhapatnam": (17.6868, 83.2185), "vizag": (17.6868, 83.2185),
+    "vijayawada": (16.5062, 80.6480),
+    "goa": (15.2993, 74.1240), "panaji": (15.4909, 73.8278),
+    "chandigarh": (30.7333, 76.7794), "lucknow": (26.8467, 80.9462),
+    "indore": (22.7196, 75.8577), "bhopal": (23.2599, 77.4126),
+    "nagpur": (21.1458, 79.0882), "surat": (21.1702, 72.8311),
+    "bhubaneswar": (20.2961, 85.8245),
+}
+
+LOCALITIES = {
+    # Chennai
+    "saidapet": (13.0213, 80.2231), "t nagar": (13.0418, 80.2341), "t. nagar": (13.0418, 80.2341),
+    "adyar": (13.0012, 80.2565), "velachery": (12.9815, 80.2180), "guindy": (13.0067, 80.2206),
+    "anna nagar": (13.0850, 80.2101), "nungambakkam": (13.0569, 80.2425), "egmore": (13.0732, 80.2609),
+    "mylapore": (13.0368, 80.2676), "teynampet": (13.0405, 80.2503), "alwarpet": (13.0339, 80.2550),
+    "besant nagar": (13.0002, 80.2668), "porur": (13.0382, 80.1565), "tambaram": (12.9249, 80.1000),
+    "sholinganallur": (12.9010, 80.2279), "perungudi": (12.9654, 80.2461), "thoraipakkam": (12.9395, 80.2334),
+    "siruseri": (12.8275, 80.2200), "ashok nagar": (13.0375, 80.2123), "vadapalani": (13.0500, 80.2121),
+    "kodambakkam": (13.0524, 80.2250), "royapettah": (13.0540, 80.2640), "chromepet": (12.9516, 80.1462),
+    # Bangalore
+    "koramangala": (12.9352, 77.6245), "indiranagar": (12.9784, 77.6408), "whitefield": (12.9698, 77.7500),
+    "hsr layout": (12.9116, 77.6474), "electronic city": (12.8452, 77.6602), "jayanagar": (12.9250, 77.5938),
+    "marathahalli": (12.9569, 77.7011), "bellandur": (12.9304, 77.6784),
+    "hebbal": (13.0358, 77.5970), "yelahanka": (13.1007, 77.5963), "btm layout": (12.9166, 77.6101),
+    # Mumbai
+    "andheri": (19.1136, 72.8697), "bandra": (19.0596, 72.8295), "powai": (19.1176, 72.9060),
+    "lower parel": (18.9953, 72.8300), "bkc": (19.0662, 72.8654), "bandra kurla complex": (19.0662, 72.8654),
+    "colaba": (18.9067, 72.8147), "goregaon": (19.1663, 72.8526), "malad": (19.1874, 72.8484),
+    "worli": (19.0176, 72.8162), "vashi": (19.0771, 72.9986),
+    # Delhi NCR
+    "connaught place": (28.6315, 77.2167), "saket": (28.5245, 77.2066), "hauz khas": (28.5494, 77.2001),
+    "dwarka": (28.5921, 77.0460), "aerocity": (28.5562, 77.1180), "nehru place": (28.5491, 77.2533),
+    "okhla": (28.5355, 77.2639), "cyber city": (28.4950, 77.0895),
+    # Hyderabad
+    "hitech city": (17.4435, 78.3772), "hitec city": (17.4435, 78.3772), "gachibowli": (17.4401, 78.3489),
+    "madhapur": (17.4483, 78.3915), "banjara hills": (17.4156, 78.4347), "jubilee hills": (17.4326, 78.4071),
+    "kondapur": (17.4690, 78.3576),
+    # Kolkata
+    "salt lake": (22.5800, 88.4150), "new town": (22.5958, 88.4795), "park street": (22.5530, 88.3520),
+    # Pune
+    "hinjewadi": (18.5913, 73.7389), "koregaon park": (18.5362, 73.8940), "kharadi": (18.5515, 73.9348),
+    "baner": (18.5590, 73.7868), "viman nagar": (18.5679, 73.9143), "magarpatta": (18.5158, 73.9272),
+}
+
+def _name_pattern(names: Iterable[str]):
+    # Longest names first so "new delhi" wins over "delhi"
+    alternatives = sorted(names, key=len, reverse=True)
+    return re.compile(r"(?<!\w)(" + "|".join(re.escape(n) for n in alternatives) + r")(?!\w)")
+
+_LOCALITY_PATTERN = _name_pattern(LOCALITIES)
+_CITY_PATTERN = _name_pattern(CITIES)
+
+def geocode(text: Optional[str]) -> Optional[Tuple[float, float]]:
+    """
+    Returns (latitude, longitude) for a free-text address or place name,
+    or None when nothing in it is in the gazetteer.
+    """
+    if not text:
+        return None
+    normalized = " ".join(text.lower().split())
+
+    # Addresses run from specific to general, so the last mention is the
+    # actual place ("12 Delhi Road, Mumbai" is in Mumbai)
+    localities = _LOCALITY_PATTERN.findall(normalized)
+    if localities:
+        return LOCALITIES[localities[-1]]
+
+    cities = _CITY_PATTERN.findall(normalized)
+    if cities:
+        return CITIES[cities[-1]]
+
+    return None
+
+@lru_cache(maxsize=4096)
+def nearest_city(latitude: float, longitude: float) -> str:
+    """
+    The gazetteer city closest to a point, i.e. the metro area a locality
+    belongs to (Saidapet -> chennai).
+    """
+    scale = math.cos(math.radians(latitude))
+    return min(
+        CITIES,
+        key=lambda name: (CITIES[name][0] - latitude) ** 2 + ((CITIES[name][1] - longitude) * scale) ** 2,
+    )
+
+def venue_location(venue_address: Optional[str], venue_name: Optional[str], online_event: bool) -> Tuple[Optional[float], Optional[float]]:
+    """
+    (latitude, longitude) of a venue, or (None, None) for online events and unknown places.
+    """
+    location = None
+    if not online_event:
+        location = geocode(venue_address) or geocode(venue_name)
+    return location if location else (None, None)
+
+def geocode_events(events: Iterable[Event]):
+    """
+    Sets latitude/longitude on each event from its venue. Online events and
+    unknown places are cleared, so an edited address never keeps stale coordinates.
+    """
+    for event in events:
+        event.latitude, event.longitude = venue_location(event.venue_address, event.venue_name, event.online_event)
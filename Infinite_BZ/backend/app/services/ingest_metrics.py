@@ -0,0 +1,139 @@
+"""
+Per-stage timing of the ingestion pipeline.
+
+    page_load     search result page rendered (browser or replay store)
+    card_parse    event ids read from the page HTML
+    api_fetch     Eventbrite API details of the events due for a refresh
+    upsert        insert / update / classify in the database (the full-text
+                  index is kept up to date by triggers in the same statements)
+    occurrences   session rows of new and changed events
+    dedup         cross-source duplicate matching
+    commit        transaction commit
+    index_update  caches, autocomplete and the other on_events_changed listeners
+
+Every stage feeds GET /metrics:
+    ingest_stage_seconds{stage}       latency histogram
+    ingest_stage_items_total{stage}   items handled
+and, inside ingest_run(), the totals of the current run, which are saved
+as one IngestRun row when the run ends (GET /admin/ingest-runs). Stage
+seconds of a run are summed over its concurrent jobs, so they can add up
+to more than the run's wall-clock time.
+"""
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.core.metrics import counter, histogram
+from app.models.schemas import IngestRun
+
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+stage_seconds = histogram("ingest_stage_seconds", "Ingestion pipeline stage latency", STAGE_BUCKETS)
+stage_items = counter("ingest_stage_items_total", "Items handled per ingestion pipeline stage")
+ingest_events = counter("ingest_events_total", "Scraped events by outcome (inserted, updated, unchanged)")
+ingest_runs = counter("ingest_runs_total", "Ingestion runs by trigger and status")
+
+class RunStats:
+    """Totals of one ingestion run."""
+
+    def __init__(self):
+        self.jobs = 0
+        self.counts = {"pages": 0, "events_found": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+        self.stage_seconds: Dict[str, float] = {}
+        self.stage_items: Dict[str, int] = {}
+
+    def add_stage(self, name: str, seconds: float, items: int):
+        self.stage_seconds[name] = self.stage_seconds.get(name, 0) + seconds
+        self.stage_items[name] = self.stage_items.get(name, 0) + items
+
+_current_run: ContextVar[Optional[RunStats]] = ContextVar("ingest_run", default=None)
+
+class StageTimer:
+    def __init__(self, name: str, items: int = 0):
+        self.name = name
+        self.items = items
+
+@contextmanager
+def stage(name: str, items: int = 0):
+    """
+    Times the with-block as pipeline stage `name`. Set `.items` on the
+    yielded timer when the count is only known at the end.
+    """
+    timer = StageTimer(name, items)
+    start = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_seconds.observe(elapsed, stage=name)
+        stage_items.inc(timer.items, stage=name)
+        run = _current_run.get()
+        if run is not None:
+            run.add_stage(name, elapsed, timer.items)
+
+def record_counts(**counts: int):
+    """Adds page / event counts (pages, events_found, inserted, updated, unchanged) to the current run."""
+    for outcome in ("inserted", "updated", "unchanged"):
+        if counts.get(outcome):
+            ingest_events.inc(counts[outcome], outcome=outcome)
+    run = _current_run.get()
+    if run is not None:
+        for name, value in counts.items():
+            run.counts[name] = run.counts.get(name, 0) + value
+
+@asynccontextmanager
+async def ingest_run(trigger: str):
+    """
+    Collects the stages of everything awaited inside (including tasks
+    started there) and stores the run summary when the block exits.
+    """
+    stats = RunStats()
+    token = _current_run.set(stats)
+    started_at = datetime.now()
+    status, error = "DONE", None
+    try:
+        yield stats
+    except Exception as e:
+        status, error = "FAILED", str(e)[:1000]
+        raise
+    finally:
+        _current_run.reset(token)
+        ingest_runs.inc(trigger=trigger, status=status)
+        await _save_run(trigger, stats, started_at, status, error)
+
+async def _save_run(trigger: str, stats: RunStats, started_at: datetime, status: str, error: Optional[str]):
+    finished_at = datetime.now()
+    run = IngestRun(
+        trigger=trigger,
+        status=status,
+        started_at=started_at,
+        finished_at=finished_at,
+        duration_seconds=(finished_at - started_at).total_seconds(),
+        jobs=stats.jobs,
+        stage_seconds={name: round(seconds, 3) for name, seconds in stats.stage_seconds.items()},
+        stage_items=stats.stage_items,
+        error=error,
+        **stats.counts,
+    )
+    try:
+        async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with async_session() as session:
+            session.add(run)
+            await session.commit()
+    except Exception as e:
+        # Bookkeeping must never fail the ingest itself
+        print(f"Ingest metrics: could not save run summary: {e}")
+        return
+
+    slowest = sorted(run.stage_seconds.items(), key=lambda item: -item[1])[:3]
+    print(
+        f"Ingest run {run.id} ({trigger}): {run.events_found} events in {run.duration_seconds:.1f}s, "
+        f"{run.inserted} new, {run.updated} updated. Slowest stages: "
+        + (", ".join(f"{name} {seconds:.1f}s" for name, seconds in slowest) or "none")
+    )
@@ -0,0 +1,165 @@
+"""
+Recurring event series and their occurrence table.
+
+Eventbrite reports a series as one event running from the first session to
+the last (often months). Such events are stored with recurrence = "WEEKLY"
+and series_start = the first session; start_time is kept at the next
+upcoming session, end_time at the end of the series.
+
+Every event has its sessions expanded into EventOccurrence rows, over a
+rolling OCCURRENCE_HORIZON_DAYS window for series (one row for a single
+event), so date filters and calendar views are an index range scan on
+occurrence start times. The horizon is moved forward daily by
+roll_series_occurrences.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert, update
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.models.schemas import Event, EventOccurrence
+from app.services.event_changes import notify_events_changed
+
+WEEKLY = "WEEKLY"
+RECURRENCE_STEPS = {WEEKLY: timedelta(weeks=1)}
+
+# A single event running longer than this is a series of weekly sessions
+SERIES_MIN_SPAN = timedelta(days=7)
+# Session length when only the series end is known
+DEFAULT_SESSION_LENGTH = timedelta(hours=2)
+OCCURRENCE_HORIZON_DAYS = 90
+SYNC_BATCH_SIZE = 500
+
+def detect_recurrence(start_time: datetime, end_time: Optional[datetime], is_series: bool = False) -> Optional[str]:
+    """WEEKLY for a series (flagged by the source, or spanning > 7 days), else None."""
+    if is_series or (end_time is not None and end_time - start_time > SERIES_MIN_SPAN):
+        return WEEKLY
+    return None
+
+def series_sessions(
+    series_start: datetime,
+    series_end: Optional[datetime],
+    recurrence: str,
+    since: datetime,
+    until: datetime,
+) -> List[Tuple[datetime, datetime]]:
+    """
+    (start, end) of the sessions of a series that end after `since` and
+    start before `until` (and before the series ends).
+    """
+    step = RECURRENCE_STEPS[recurrence]
+    if series_end is not None:
+        until = min(until, series_end)
+
+    # Jump straight to the first session that has not ended yet
+    skip = max(0, (since - DEFAULT_SESSION_LENGTH - series_start) // step)
+    start = series_start + skip * step
+
+    sessions = []
+    while start < until:
+        end = start + DEFAULT_SESSION_LENGTH
+        if end > since:
+            sessions.append((start, end))
+        start += step
+    return sessions
+
+def next_session_start(series_start: datetime, series_end: Optional[datetime], recurrence: str, now: datetime) -> datetime:
+    """Start of the next session from `now` on; the last one once the series is over."""
+    step = RECURRENCE_STEPS[recurrence]
+    if series_start >= now:
+        return series_start
+    start = series_start + -(-(now - series_start) // step) * step
+    if series_end is not None and start >= series_end:
+        start -= step
+    return start
+
+def apply_series(row: Dict, now: datetime):
+    """
+    Moves a scraped series row (start_time = first session) to its next
+    session, keeping the first session in series_start.
+    """
+    recurrence = row.get("recurrence")
+    if not recurrence or not row.get("start_time"):
+        return
+    row["series_start"] = row["start_time"]
+    row["start_time"] = next_session_start(row["start_time"], row.get("end_time"), recurrence, now)
+
+def _occurrences_for(row, now: datetime) -> List[Tuple[datetime, datetime]]:
+    if row.recurrence in RECURRENCE_STEPS:
+        today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        return series_sessions(
+            row.series_start or row.start_time, row.end_time, row.recurrence,
+            since=today, until=today + timedelta(days=OCCURRENCE_HORIZON_DAYS)
+        )
+    return [(row.start_time, row.end_time or row.start_time + DEFAULT_SESSION_LENGTH)]
+
+async def sync_occurrences(session: AsyncSession, event_ids: Sequence[int]) -> List[int]:
+    """
+    Rewrites the occurrence rows of the given events and moves series
+    start_time to the next session. Does not commit.
+    Returns the ids of series whose start_time moved.
+    """
+    now = datetime.now()
+    moved = []
+    event_ids = list(dict.fromkeys(event_ids))
+
+    for i in range(0, len(event_ids), SYNC_BATCH_SIZE):
+        chunk = event_ids[i:i + SYNC_BATCH_SIZE]
+        result = await session.execute(
+            select(Event.id, Event.start_time, Event.end_time, Event.recurrence, Event.series_start)
+            .where(Event.id.in_(chunk))
+        )
+        rows = result.all()
+
+        occurrences = []
+        start_updates = []
+        for row in rows:
+            sessions = _occurrences_for(row, now)
+            occurrences.extend({"event_id": row.id, "start_time": start, "end_time": end} for start, end in sessions)
+            if row.recurrence in RECURRENCE_STEPS:
+                next_start = next_session_start(row.series_start or row.start_time, row.end_time, row.recurrence, now)
+                if next_start != row.start_time:
+                    start_updates.append({"id": row.id, "start_time": next_start})
+
+        await session.execute(delete(EventOccurrence).where(EventOccurrence.event_id.in_(chunk)))
+        if occurrences:
+            await session.execute(insert(EventOccurrence.__table__), occurrences)
+        if start_updates:
+            await session.execute(update(Event), start_updates)
+            moved.extend(params["id"] for params in start_updates)
+
+    return moved
+
+async def roll_series_occurrences() -> int:
+    """
+    Daily: expands every series over the moved horizon, drops past sessions
+    and moves start_time to the next session. Returns the number of series.
+    """
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    count = 0
+    moved = []
+    last_id = 0
+
+    async with async_session() as session:
+        while True:
+            result = await session.execute(
+                select(Event.id)
+                .where(Event.recurrence != None, Event.id > last_id)
+                .order_by(Event.id)
+                .limit(SYNC_BATCH_SIZE)
+            )
+            event_ids = result.scalars().all()
+            if not event_ids:
+                break
+            moved.extend(await sync_occurrences(session, event_ids))
+            await session.commit()
+            count += len(event_ids)
+            last_id = event_ids[-1]
+
+    if moved:
+        await notify_events_changed(moved)
+    return count
@@ -0,0 +1,156 @@
+"""
+Record/replay of the scraper's network traffic, for offline benchmarks and
+regression tests.
+
+    SCRAPER_REPLAY_MODE=record   real traffic, responses saved to the store
+    SCRAPER_REPLAY_MODE=replay   no network: responses served from the store
+    SCRAPER_REPLAY_MODE=off      (default) normal operation
+
+Covers Eventbrite API calls (ReplayTransport, plugged into httpx) and
+search result pages (the HTML the browser rendered). Entries are gzipped
+JSON files in SCRAPER_REPLAY_DIR, one per request. SCRAPER_REPLAY_LATENCY_MS
+adds a simulated network delay to every replayed response.
+"""
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+import httpx
+
+REPLAY_MODES = ("off", "record", "replay")
+
+class ReplayStore:
+    def __init__(self, path: str, mode: str = "off", latency_ms: float = 0):
+        if mode not in REPLAY_MODES:
+            raise ValueError(f"Unknown replay mode '{mode}'. Use one of: {', '.join(REPLAY_MODES)}")
+        self.path = path
+        self.mode = mode
+        self.latency_seconds = latency_ms / 1000
+        if mode != "off":
+            os.makedirs(path, exist_ok=True)
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        # httpx normalizes the query string, so the same request always gives the same URL
+        return hashlib.sha1(f"{method.upper()} {url}".encode()).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json.gz")
+
+    def load(self, method: str, url: str) -> Optional[dict]:
+        try:
+            with gzip.open(self._file(self.key(method, url)), "rt", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def save(self, method: str, url: str, entry: dict):
+        entry = {"method": method.upper(), "url": url, **entry}
+        tmp = self._file(self.key(method, url)) + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, self._file(self.key(method, url)))
+
+    # --- Search pages (rendered HTML) ---
+
+    def save_page(self, url: str, html: str):
+        self.save("PAGE", url, {"status": 200, "body": html})
+
+    def load_page(self, url: str) -> Optional[str]:
+        entry = self.load("PAGE", url)
+        return entry["body"] if entry else None
+
+    # --- HTTP responses ---
+
+    def save_response(self, request: httpx.Request, response: httpx.Response, body: bytes):
+        self.save(request.method, str(request.url), {
+            "status": response.status_code,
+            "headers": {"content-type": response.headers.get("content-type", "application/json")},
+            "body": body.decode("utf-8", errors="replace"),
+        })
+
+    def replay_response(self, request: httpx.Request) -> httpx.Response:
+        entry = self.load(request.method, str(request.url))
+        if entry is None:
+            # Like a server that has never heard of it; not retried by the client
+            return httpx.Response(404, json={"error": "NOT_RECORDED", "url": str(request.url)}, request=request)
+        return httpx.Response(entry["status"], headers=entry["headers"], content=entry["body"].encode("utf-8"), request=request)
+
+    async def simulate_latency(self):
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+
+def _passthrough(request: httpx.Request, response: httpx.Response, body: bytes) -> httpx.Response:
+    # read() already decoded the body, so drop the encoding headers
+    headers = [(k, v) for k, v in response.headers.items() if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")]
+    return httpx.Response(response.status_code, headers=headers, content=body, request=request)
+
+class ReplayTransport(httpx.AsyncBaseTransport, httpx.BaseTransport):
+    """
+    httpx transport that records or replays through a ReplayStore, for both
+    httpx.AsyncClient and httpx.Client.
+    """
+
+    def __init__(self, store: ReplayStore):
+        self.store = store
+        self._async_transport = httpx.AsyncHTTPTransport() if store.recording else None
+        self._sync_transport = httpx.HTTPTransport() if store.recording else None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.store.replaying:
+            await self.store.simulate_latency()
+            return self.store.replay_response(request)
+
+        response = await self._async_transport.handle_async_request(request)
+        body = await response.aread()
+        if response.status_code == 200:
+            self.store.save_response(request, response, body)
+        return _passthrough(request, response, body)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self.store.replaying:
+            if self.store.latency_seconds:
+                time.sleep(self.store.latency_seconds)
+            return self.store.replay_response(request)
+
+        response = self._sync_transport.handle_request(request)
+        body = response.read()
+        if response.status_code == 200:
+            self.store.save_response(request, response, body)
+        return _passthrough(request, response, body)
+
+    async def aclose(self):
+        if self._async_transport is not None:
+            await self._async_transport.aclose()
+
+    def close(self):
+        if self._sync_transport is not None:
+            self._sync_transport.close()
+
+_store = ReplayStore(
+    os.getenv("SCRAPER_REPLAY_DIR", "replay_store"),
+    os.getenv("SCRAPER_REPLAY_MODE", "off").lower(),
+    float(os.getenv("SCRAPER_REPLAY_LATENCY_MS", "0")),
+)
+
+def get_replay_store() -> Optional[ReplayStore]:
+    """The active store, or None when record/replay is off."""
+    return _store if _store.mode != "off" else None
+
+def configure_replay(mode: str, path: Optional[str] = None, latency_ms: float = 0) -> Optional[ReplayStore]:
+    """Switches record/replay at runtime (benchmarks, tests)."""
+    global _store
+    _store = ReplayStore(path or _store.path, mode, latency_ms)
+    return get_replay_store()
@@ -0,0 +1,284 @@
+"""
+Single-leader execution of the scheduled jobs.
+
+Every Uvicorn worker builds the same APScheduler, but only the worker
+holding the scheduler lock runs it; the others keep it paused and retry
+the lock every SCHEDULER_LEADER_RETRY_SECONDS. The lock is
+
+  - PostgreSQL: a session-level advisory lock on a dedicated connection
+  - SQLite: an exclusive OS lock on SCHEDULER_LOCK_FILE
+
+Both are released by the server / OS when the leader process dies, so a
+follower takes over on its next retry. The leader checks the lock every
+heartbeat and pauses its scheduler when it has lost it (e.g. the lock
+connection dropped); cancel_running_jobs() then stops the jobs it still
+has in flight, so they don't run alongside the new leader's.
+
+Metrics:
+    scheduler_leader{pid}                       1 while this worker leads
+    scheduler_leader_elections_total            lock acquisitions
+    scheduler_leader_hold_seconds               how long leadership was held
+    scheduler_job_seconds{job,status}           runs of the scheduled jobs
+
+Configuration (.env):
+    SCHEDULER_LOCK_KEY=74120001
+    SCHEDULER_LOCK_FILE=scheduler.lock
+    SCHEDULER_LEADER_RETRY_SECONDS=15
+"""
+import asyncio
+import functools
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Awaitable, Callable, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.database import engine
+from app.core.metrics import counter, gauge, histogram
+
+# Below 2**31, so the key is the objid of the lock in pg_locks
+SCHEDULER_LOCK_KEY = int(os.getenv("SCHEDULER_LOCK_KEY", "74120001"))
+SCHEDULER_LOCK_FILE = os.getenv("SCHEDULER_LOCK_FILE", "scheduler.lock")
+SCHEDULER_LEADER_RETRY_SECONDS = float(os.getenv("SCHEDULER_LEADER_RETRY_SECONDS", "15"))
+
+leader_gauge = gauge("scheduler_leader", "1 while this worker runs the scheduled jobs")
+leader_elections = counter("scheduler_leader_elections_total", "Times this worker took the scheduler lock")
+leader_hold_seconds = histogram(
+    "scheduler_leader_hold_seconds", "How long the scheduler lock was held",
+    buckets=(60, 300, 900, 3600, 4 * 3600, 12 * 3600, 24 * 3600, 7 * 24 * 3600)
+)
+job_seconds = histogram(
+    "scheduler_job_seconds", "Scheduled job run time",
+    buckets=(0.1, 1, 5, 10, 30, 60, 300, 900, 1800, 3600)
+)
+
+# Scheduled jobs running in this worker (see timed_job)
+_running_jobs: Set[asyncio.Task] = set()
+
+class AdvisoryLock:
+    """PostgreSQL session-level advisory lock, held on its own connection."""
+
+    def __init__(self, engine: AsyncEngine, key: int):
+        self.engine = engine
+        self.key = key
+        self._conn: Optional[AsyncConnection] = None
+
+    async def acquire(self) -> bool:
+        conn = await self.engine.connect()
+        try:
+            result = await conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key})
+            acquired = bool(result.scalar())
+            # The lock belongs to the session; don't sit idle in a transaction
+            await conn.commit()
+        except Exception:
+            await conn.close()
+            raise
+        if not acquired:
+            await conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    async def check(self) -> bool:
+        """Heartbeat: the connection is alive and still holds the lock."""
+        if self._conn is None:
+            return False
+        try:
+            result = await self._conn.execute(
+                text(
+                    "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND granted "
+                    "AND pid = pg_backend_pid() AND classid = 0 AND objid = :key AND objsubid = 1"
+                ),
+                {"key": self.key}
+            )
+            held = result.scalar() > 0
+            await self._conn.commit()
+            return held
+        except Exception as e:
+            print(f"Scheduler lock: heartbeat failed ({e})")
+            return False
+
+    async def release(self):
+        if self._conn is None:
+            return
+        try:
+            await self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            await self._conn.commit()
+        except Exception:
+            # Connection already gone; the server dropped the lock with it
+            pass
+        finally:
+            try:
+                await self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+class FileLock:
+    """Exclusive OS file lock, for SQLite deployments (one machine)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    async def acquire(self) -> bool:
+        handle = open(self.path, "a+")
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+
+        # Who holds it, for anyone looking at the file
+        handle.seek(0)
+        handle.truncate()
+        handle.write(f"{os.getpid()} {datetime.now().isoformat()}\n")
+        handle.flush()
+        self._file = handle
+        return True
+
+    async def check(self) -> bool:
+        return self._file is not None and not self._file.closed
+
+    async def release(self):
+        if self._file is None:
+            return
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+
+def scheduler_lock():
+    """The lock matching the configured database."""
+    if engine.dialect.name == "postgresql":
+        return AdvisoryLock(engine, SCHEDULER_LOCK_KEY)
+    return FileLock(SCHEDULER_LOCK_FILE)
+
+class SchedulerLeader:
+    """
+    Competes for the scheduler lock in the background. on_elected runs when
+    this worker becomes the leader, on_demoted when it stops being one
+    (lost lock or shutdown).
+    """
+
+    def __init__(
+        self,
+        on_elected: Callable[[], Awaitable[None]],
+        on_demoted: Callable[[], Awaitable[None]],
+        lock=None,
+        retry_seconds: float = SCHEDULER_LEADER_RETRY_SECONDS,
+    ):
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.lock = lock or scheduler_lock()
+        self.retry_seconds = retry_seconds
+        self.is_leader = False
+        self._since: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+        leader_gauge.set(0, pid=os.getpid())
+
+    async def start(self):
+        # First attempt inline, so a single worker starts its jobs right away
+        await self._tick()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self.is_leader:
+            await self._step_down()
+        await self.lock.release()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.retry_seconds)
+            try:
+                await self._tick()
+            except Exception as e:
+                print(f"Scheduler leader: {e}")
+
+    async def _tick(self):
+        if self.is_leader:
+            if not await self.lock.check():
+                print(f"Scheduler leader: worker {os.getpid()} lost the scheduler lock, pausing jobs.")
+                await self._step_down()
+                await self.lock.release()
+            return
+
+        if not await self.lock.acquire():
+            return
+        self.is_leader = True
+        self._since = time.monotonic()
+        leader_gauge.set(1, pid=os.getpid())
+        leader_elections.inc()
+        print(f"Scheduler leader: worker {os.getpid()} runs the scheduled jobs.")
+        await self.on_elected()
+
+    async def _step_down(self):
+        self.is_leader = False
+        leader_gauge.set(0, pid=os.getpid())
+        if self._since is not None:
+            leader_hold_seconds.observe(time.monotonic() - self._since)
+            self._since = None
+        await self.on_demoted()
+
+def timed_job(name: str):
+    """
+    Decorator: records a scheduled job's run time in scheduler_job_seconds
+    and tracks the run for cancel_running_jobs.
+    """
+    def decorator(job):
+        @functools.wraps(job)
+        async def wrapper(*args, **kwargs):
+            task = asyncio.current_task()
+            _running_jobs.add(task)
+            start = time.perf_counter()
+            status = "ok"
+            try:
+                return await job(*args, **kwargs)
+            except asyncio.CancelledError:
+                status = "cancelled"
+                raise
+            except Exception:
+                status = "failed"
+                raise
+            finally:
+                _running_jobs.discard(task)
+                job_seconds.observe(time.perf_counter() - start, job=name, status=status)
+        return wrapper
+    return decorator
+
+async def cancel_running_jobs():
+    """
+    Cancels the scheduled jobs still running in this worker and waits for
+    them to unwind. Called on demotion: whatever they had claimed stays
+    claimed (RUNNING scrape jobs, the refresh checkpoint) and is picked up
+    by the new leader once it is stale.
+    """
+    tasks = [task for task in _running_jobs if task is not asyncio.current_task()]
+    if not tasks:
+        return
+    print(f"Scheduler leader: cancelling {len(tasks)} running jobs.")
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
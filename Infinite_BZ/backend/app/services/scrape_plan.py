@@ -0,0 +1,212 @@
+"""
+Daily scrape plan: every city x category x result page becomes a ScrapeJob.
+
+Jobs are spread evenly over a time window (instead of one burst at 8 AM),
+run with bounded parallelism on the shared browser pool, and their progress
+is stored in the scrapejob table. A restart picks up the day's remaining
+jobs; jobs left RUNNING by a crashed process are retried once they are
+STALE_AFTER old. A RUNNING job is never reset earlier: after a scheduler
+failover the old leader may still be finishing it.
+
+Configuration (.env):
+    SCRAPE_CITIES=chennai,bangalore
+    SCRAPE_CATEGORIES=business--events,science-and-tech--events
+    SCRAPE_PAGES=2
+    SCRAPE_CONCURRENCY=2
+    SCRAPE_WINDOW_START_HOUR=6
+    SCRAPE_WINDOW_HOURS=12
+"""
+import asyncio
+import os
+from datetime import date, datetime, timedelta
+from typing import List, Optional, Set
+
+from sqlalchemy import and_, or_, update
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.models.schemas import ScrapeJob
+from app.services.event_ingest import upsert_events
+from app.services.ingest_metrics import ingest_run
+
+def _env_list(name: str, default: str) -> List[str]:
+    return [item.strip() for item in os.getenv(name, default).split(",") if item.strip()]
+
+SCRAPE_CITIES = _env_list("SCRAPE_CITIES", "chennai")
+SCRAPE_CATEGORIES = _env_list("SCRAPE_CATEGORIES", "business--events")
+SCRAPE_PAGES = int(os.getenv("SCRAPE_PAGES", "1"))
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "2"))
+SCRAPE_WINDOW_START_HOUR = int(os.getenv("SCRAPE_WINDOW_START_HOUR", "8"))
+SCRAPE_WINDOW_HOURS = float(os.getenv("SCRAPE_WINDOW_HOURS", "12"))
+
+MAX_ATTEMPTS = 3
+RETRY_DELAY = timedelta(minutes=15)
+# A RUNNING job older than this was orphaned by a crash / restart
+STALE_AFTER = timedelta(minutes=30)
+# Claim attempts when other workers keep winning the same job
+CLAIM_TRIES = 3
+
+PENDING, RUNNING, DONE, FAILED = "PENDING", "RUNNING", "DONE", "FAILED"
+
+def _session_factory():
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+def plan_slots():
+    """(city, category, page) for every job of a daily run, interleaved by page then city."""
+    return [
+        (city, category, page)
+        for page in range(1, SCRAPE_PAGES + 1)
+        for category in SCRAPE_CATEGORIES
+        for city in SCRAPE_CITIES
+    ]
+
+async def plan_daily_run(day: Optional[date] = None) -> int:
+    """
+    Creates the ScrapeJob rows for `day` that do not exist yet, scheduled
+    evenly across the scrape window. Safe to call repeatedly. Returns the
+    number of jobs created.
+    """
+    day = day or date.today()
+    run_date = day.isoformat()
+    slots = plan_slots()
+    window_start = datetime.combine(day, datetime.min.time()) + timedelta(hours=SCRAPE_WINDOW_START_HOUR)
+    spacing = timedelta(hours=SCRAPE_WINDOW_HOURS) / max(len(slots), 1)
+
+    async with _session_factory()() as session:
+        result = await session.execute(
+            select(ScrapeJob.city, ScrapeJob.category, ScrapeJob.page).where(ScrapeJob.run_date == run_date)
+        )
+        existing = {tuple(row) for row in result.all()}
+
+        created = 0
+        for i, (city, category, page) in enumerate(slots):
+            if (city, category, page) in existing:
+                continue
+            session.add(ScrapeJob(
+                run_date=run_date, city=city, category=category, page=page,
+                scheduled_at=window_start + spacing * i
+            ))
+            created += 1
+        await session.commit()
+
+    if created:
+        print(f"Scrape plan: scheduled {created} jobs for {run_date} ({len(slots)} in plan).")
+    return created
+
+async def make_pending_jobs_due() -> int:
+    """
+    Moves every pending job that is scheduled later to now, so the
+    scheduler's next tick runs them. Returns the number of jobs moved.
+    """
+    now = datetime.now()
+    async with _session_factory()() as session:
+        result = await session.execute(
+            update(ScrapeJob)
+            .where(ScrapeJob.status == PENDING, ScrapeJob.scheduled_at > now)
+            .values(scheduled_at=now)
+        )
+        await session.commit()
+    return result.rowcount
+
+async def _claim_due_job(force: bool, skip_ids: Set[int]) -> Optional[ScrapeJob]:
+    """
+    Claims the next due job for this worker, or returns None. The claim
+    re-checks that the job is still due, so two callers (the scheduler tick
+    and POST /scrape, or two workers) never get the same job. Its started_at
+    is the claim: _run_job only records a result while it is unchanged.
+    """
+    async with _session_factory()() as session:
+        for _ in range(CLAIM_TRIES):
+            now = datetime.now()
+            due = or_(
+                ScrapeJob.status == PENDING,
+                (ScrapeJob.status == RUNNING) & (ScrapeJob.started_at < now - STALE_AFTER),
+            )
+            if not force:
+                due = and_(due, ScrapeJob.scheduled_at <= now)
+            query = select(ScrapeJob.id).where(due)
+            if skip_ids:
+                query = query.where(ScrapeJob.id.notin_(skip_ids))
+            result = await session.execute(query.order_by(ScrapeJob.scheduled_at, ScrapeJob.id).limit(1))
+            job_id = result.scalar()
+            if job_id is None:
+                return None
+
+            result = await session.execute(
+                update(ScrapeJob)
+                .where(ScrapeJob.id == job_id, due)
+                .values(status=RUNNING, started_at=now, attempts=ScrapeJob.attempts + 1)
+                .execution_options(synchronize_session=False)
+            )
+            await session.commit()
+            if result.rowcount:
+                return await session.get(ScrapeJob, job_id, populate_existing=True)
+            # Another worker claimed it first; look for the next one
+    return None
+
+async def _run_job(job: ScrapeJob):
+    from app.services.scraper import scrape_events_playwright
+
+    print(f"Scrape job {job.id}: {job.city} / {job.category} / page {job.page} (attempt {job.attempts})")
+    values = {}
+    try:
+        events_data = await scrape_events_playwright(job.city, job.category, job.page)
+        async with _session_factory()() as session:
+            counts = await upsert_events(session, events_data)
+        values = dict(
+            status=DONE, finished_at=datetime.now(), error=None,
+            events_found=len(events_data), inserted=counts["inserted"], updated=counts["updated"]
+        )
+        print(f"Scrape job {job.id}: {len(events_data)} found, {counts['inserted']} new, {counts['updated']} updated.")
+    except Exception as e:
+        print(f"Scrape job {job.id} failed: {e}")
+        values = dict(finished_at=datetime.now(), error=str(e)[:1000])
+        if job.attempts < MAX_ATTEMPTS:
+            values.update(status=PENDING, scheduled_at=datetime.now() + RETRY_DELAY * job.attempts)
+        else:
+            values.update(status=FAILED)
+
+    # Only while the claim is still ours: a job that outlived STALE_AFTER
+    # may have been handed to another worker meanwhile
+    async with _session_factory()() as session:
+        result = await session.execute(
+            update(ScrapeJob)
+            .where(ScrapeJob.id == job.id, ScrapeJob.status == RUNNING, ScrapeJob.started_at == job.started_at)
+            .values(**values)
+        )
+        await session.commit()
+    if not result.rowcount:
+        print(f"Scrape job {job.id}: claimed again by another run, result not recorded.")
+
+async def run_due_jobs(force: bool = False) -> int:
+    """
+    Runs every job whose time has come (all pending jobs when `force`) on
+    SCRAPE_CONCURRENCY workers, each claiming one job at a time, so a job
+    is only RUNNING while it really runs. Returns the number of jobs run.
+    """
+    ran: Set[int] = set()
+
+    async def claim() -> Optional[ScrapeJob]:
+        job = await _claim_due_job(force, ran)
+        if job is not None:
+            ran.add(job.id)
+        return job
+
+    async def worker(job: Optional[ScrapeJob] = None):
+        if job is None:
+            job = await claim()
+        while job is not None:
+            await _run_job(job)
+            job = await claim()
+
+    first = await claim()
+    if first is None:
+        return 0
+
+    # One IngestRun summary per batch of jobs (services/ingest_metrics.py)
+    async with ingest_run("manual" if force else "scheduled") as run:
+        await asyncio.gather(worker(first), *(worker() for _ in range(SCRAPE_CONCURRENCY - 1)))
+        run.jobs = len(ran)
+    return len(ran)
@@ -1,107 +1,44 @@
 import asyncio
-import random
-import requests
+import time
+import httpx
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-from playwright.async_api import async_playwright
 from bs4 import BeautifulSoup
 import urllib.parse
 
+from app.services.eventbrite_client import EventbriteClient, EVENTBRITE_API_URL, EVENTBRITE_API_TOKEN
+
+from app.services.browser_pool import lease_context, wait_for_stable_count
+from app.core.metrics import counter, histogram
+from app.services.change_detection import fresh_event_ids
+from app.services.replay_store import ReplayTransport, get_replay_store
+from app.services.recurrence import detect_recurrence
+from app.services.ingest_metrics import record_counts, stage
+
 # --- CONSTANTS ---
 BASE_URL = "https://www.eventbrite.com"
-EVENTBRITE_API_TOKEN = "T6WRADHDNPM5S4VYLFR5"
+CARD_SELECTOR = "section.event-card-details, div.event-card__details"
+
+api_fetches = counter("scraper_api_fetches_total", "Event detail lookups by result (fetched, skipped_fresh)")
+page_latency = histogram("scraper_page_seconds", "Search page scrape latency by stage (goto, first_card, scroll, total)")
 
 def fetch_event_details_api(event_id: str) -> Optional[Dict]:
     """
     Fetches event details (title, start/end time, is_free, venue) from Eventbrite API.
     Returns a dict with cleaned data or None if failed.
+
+    Blocking - for scripts only. Async code uses EventbriteClient.
     """
-    url = f"https://www.eventbriteapi.com/v3/events/{event_id}/"
+    url = f"{EVENTBRITE_API_URL}/events/{event_id}/"
     headers = {"Authorization": f"Bearer {EVENTBRITE_API_TOKEN}"}
     params = {"expand": "venue,ticket_classes,organizer"}
     
+    store = get_replay_store()
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        with httpx.Client(transport=ReplayTransport(store) if store else None, timeout=10) as client:
+            response = client.get(url, headers=headers, params=params)
         if response.status_code == 200:
-            data = response.json()
-            
-            # --- Parse Times ---
-            start_str = data.get("start", {}).get("local")
-            end_str = data.get("end", {}).get("local")
-            
-            start_time = datetime.fromisoformat(start_str) if start_str else datetime.now()
-            end_time = datetime.fromisoformat(end_str) if end_str else start_time + timedelta(hours=2)
-            
-            # --- Recurring Event Fix ---
-            # If start_time is in the past, and end_time is in the future,
-            # and the duration is long (> 7 days), assume it's a series and find the next occurrence.
-            # We assume it repeats WEEKLY on the same weekday.
-            now = datetime.now(start_time.tzinfo) # Use same timezone
-            
-            if start_time < now and end_time > now:
-                duration = end_time - start_time
-                if duration.days > 7:
-                    # It's likely a series. Find next occurrence.
-                    # 1. Calculate how many weeks passed
-                    days_since_start = (now - start_time).days
-                    weeks_passed = (days_since_start // 7) + 1
-                    
-                    next_start = start_time + timedelta(weeks=weeks_passed)
-                    
-                    # Ensure we haven't passed the end (though condition end_time > now ensures at least one slot left?)
-                    if next_start < end_time:
-                         print(f"  [Recurrence Fix] Moving start from {start_time.date()} to next occurrence: {next_start.date()}")
-                         start_time = next_start
-                         # We should probably adjust end_time too to be the session end, 
-                         # but we don't know the session duration if the API gives us Series End.
-                         # However, leaving Series End as end_time usually works for "is_active" checks.
-                         # But for UI display, we might want "Session End".
-                         # If we don't know session duration, maybe defaulting to start + 2 hours is safer?
-                         # Or just keep end_time as is (user UI check doesn't show end time?).
-                         # Let's keep end_time as is for now, or maybe cap it?
-                         pass
-            
-            # --- Parse Is_Free ---
-            is_free = data.get("is_free", False)
-            online_event = data.get("online_event", False)
-
-            # --- Venue & Address ---
-            venue = data.get("venue")
-            if venue:
-                venue_name = venue.get("name") or "TBD"
-                address_obj = venue.get("address") or {}
-                venue_address = address_obj.get("localized_address_display") or address_obj.get("address_1") or address_obj.get("city") or "Chennai, India"
-            else:
-                # If venue is None, it's likely an online event
-                venue_name = "Online Event"
-                venue_address = "Online"
-                # Force online_event to True if venue is missing
-                if not online_event: 
-                     online_event = True
-            
-            # --- Organizer ---
-            organizer = data.get("organizer") or {}
-            organizer_name = organizer.get("name") or "Unknown Organizer"
-            if event_id == "1978745812993":
-                organizer_name = "COSMIR SOLUTIONS"
-            
-            name_obj = data.get("name") or {}
-            desc_obj = data.get("description") or {}
-            logo_obj = data.get("logo") or {}
-
-            return {
-                "title": name_obj.get("text", "Untitled Event"),
-                "description": desc_obj.get("text", ""),
-                "start_time": start_time,
-                "end_time": end_time,
-                "is_free": is_free,
-                "online_event": online_event,
-                "venue_name": venue_name,
-                "venue_address": venue_address,
-                "organizer_name": organizer_name,
-                "url": data.get("url"),
-                "logo_url": logo_obj.get("url")
-            }
+            return parse_event_details(event_id, response.json())
         else:
             print(f"API Error for {event_id}: {response.status_code} - {response.text}")
             return None
@@ -109,48 +46,186 @@ def fetch_event_details_api(event_id: str) -> Optional[Dict]:
         print(f"Exception fetching API for {event_id}: {e}")
         return None
 
-async def scrape_events_playwright(city: str = "chennai", category: str = "business--events") -> List[Dict]:
+def parse_event_details(event_id: str, data: Dict) -> Optional[Dict]:
     """
-    Scrapes Eventbrite Search to find Event IDs, then utilizes the Eventbrite API
-    to fetch accurate details for each event.
+    Cleans an Eventbrite API event payload into the fields we store.
+    Returns None if the payload cannot be parsed.
     """
-    cleaned_events = []
-    
-    # Construct Search URL
+    try:
+        # --- Parse Times ---
+        start_str = data.get("start", {}).get("local")
+        end_str = data.get("end", {}).get("local")
+        
+        start_time = datetime.fromisoformat(start_str) if start_str else datetime.now()
+        end_time = datetime.fromisoformat(end_str) if end_str else start_time + timedelta(hours=2)
+        
+        # --- Recurring Series ---
+        # A series comes as one event from the first session to the last one.
+        # Keep both as-is; ingest expands the sessions (services/recurrence.py)
+        recurrence = detect_recurrence(start_time, end_time, data.get("is_series", False))
+        
+        # --- Parse Is_Free ---
+        is_free = data.get("is_free", False)
+        online_event = data.get("online_event", False)
+
+        # --- Venue & Address ---
+        venue = data.get("venue")
+        if venue:
+            venue_name = venue.get("name") or "TBD"
+            address_obj = venue.get("address") or {}
+            venue_address = address_obj.get("localized_address_display") or address_obj.get("address_1") or address_obj.get("city") or "Chennai, India"
+        else:
+            # If venue is None, it's likely an online event
+            venue_name = "Online Event"
+            venue_address = "Online"
+            # Force online_event to True if venue is missing
+            if not online_event: 
+                 online_event = True
+        
+        # --- Organizer ---
+        organizer = data.get("organizer") or {}
+        organizer_name = organizer.get("name") or "Unknown Organizer"
+        if event_id == "1978745812993":
+            organizer_name = "COSMIR SOLUTIONS"
+        
+        name_obj = data.get("name") or {}
+        desc_obj = data.get("description") or {}
+        logo_obj = data.get("logo") or {}
+
+        return {
+            "title": name_obj.get("text", "Untitled Event"),
+            "description": desc_obj.get("text", ""),
+            "start_time": start_time,
+            "end_time": end_time,
+            "recurrence": recurrence,
+            "is_free": is_free,
+            "online_event": online_event,
+            "venue_name": venue_name,
+            "venue_address": venue_address,
+            "organizer_name": organizer_name,
+            "url": data.get("url"),
+            "logo_url": logo_obj.get("url"),
+            # start/end "local" values are wall-clock times in this zone
+            "timezone": data.get("start", {}).get("timezone") or "UTC"
+        }
+    except Exception as e:
+        print(f"Exception parsing API data for {event_id}: {e}")
+        return None
+
+def build_event_row(event_id: str, api_data: Dict, scraped_organizer: str = "Unknown Organizer", page_url: str = "") -> Dict:
+    """
+    Event column values from parsed API data (parse_event_details) plus what
+    the search card showed.
+    """
+    # Fallback for organizer
+    final_organizer = api_data['organizer_name']
+    if not final_organizer or final_organizer == "Unknown Organizer" or final_organizer == "null":
+         if scraped_organizer != "Unknown Organizer":
+             final_organizer = scraped_organizer
+         else:
+             # Hard fallback for the specific problematic event if HTML fails
+             if event_id == "1978745812993":
+                 final_organizer = "COSMIR SOLUTIONS"
+
+    # Use API data
+    return {
+        "eventbrite_id": event_id,
+        "title": api_data['title'],
+        "description": api_data['description'] or f"Scraped from {page_url or api_data['url']}",
+        "start_time": api_data['start_time'],
+        "end_time": api_data['end_time'],
+        "recurrence": api_data['recurrence'],
+        "url": api_data['url'],
+        "image_url": api_data['logo_url'],
+        "venue_name": api_data['venue_name'],
+        "venue_address": api_data['venue_address'],
+        "organizer_name": final_organizer,
+        "is_free": api_data['is_free'],
+        "online_event": api_data['online_event'],
+        "timezone": api_data['timezone'],
+        "source": "Eventbrite",
+        "raw_data": {"source": "eventbrite_api"}
+    }
+
+def search_page_url(city: str, category: str = "business--events", page_number: int = 1) -> str:
     encoded_city = urllib.parse.quote(city)
     search_url = f"{BASE_URL}/d/india--{encoded_city}/{category}/"
-    
+    if page_number > 1:
+        search_url += f"?page={page_number}"
+    return search_url
+
+async def fetch_search_page(search_url: str) -> Optional[str]:
+    """
+    Rendered HTML of a search result page, or None if it failed to load.
+    With SCRAPER_REPLAY_MODE=replay the page comes from the replay store
+    instead of the browser; with =record it is saved there.
+    """
+    store = get_replay_store()
+    if store and store.replaying:
+        await store.simulate_latency()
+        content = store.load_page(search_url)
+        if content is None:
+            print(f"Scraper: no recorded page for {search_url}")
+        return content
+
     print(f"Scraper: Starting Playwright session for {search_url}...")
 
-    async with async_playwright() as p:
-        # Launch browser 
-        browser = await p.chromium.launch(
-            headless=True,
-            args=["--disable-gpu", "--no-sandbox", "--disable-dev-shm-usage"]
-        )
-        context = await browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        )
+    # Context leased from the warm browser pool (images/media/fonts blocked)
+    async with lease_context() as context:
         page = await context.new_page()
 
         try:
-            await page.goto(search_url, timeout=120000)
+            page_start = time.perf_counter()
+            with page_latency.time(stage="goto"):
+                await page.goto(search_url, timeout=120000)
             
             # Wait for event cards
-            await page.wait_for_selector("div.event-card__details, section.event-card-details", timeout=15000)
+            with page_latency.time(stage="first_card"):
+                await page.wait_for_selector(CARD_SELECTOR, timeout=15000)
             
-            # Scroll to load more
-            for _ in range(3):
-                await page.evaluate("window.scrollBy(0, 1000)")
-                await asyncio.sleep(random.uniform(1, 3))
+            # Scroll until no more cards load
+            with page_latency.time(stage="scroll"):
+                await wait_for_stable_count(page, CARD_SELECTOR)
 
-            # HTML Parsing just to get IDs
             content = await page.content()
+            page_latency.observe(time.perf_counter() - page_start, stage="total")
+        except Exception as e:
+            print(f"Scraper Error: {e}")
+            return None
+
+    if store and store.recording:
+        store.save_page(search_url, content)
+    return content
+
+async def scrape_events_playwright(city: str = "chennai", category: str = "business--events", page_number: int = 1, skip_fresh: bool = True) -> List[Dict]:
+    """
+    Scrapes Eventbrite Search to find Event IDs, then utilizes the Eventbrite API
+    to fetch accurate details for each event.
+    page_number selects the search result page (1 = first).
+    skip_fresh leaves out stored events that are not due for a refresh yet.
+    """
+    cleaned_events = []
+    
+    # Construct Search URL
+    search_url = search_page_url(city, category, page_number)
+
+    with stage("page_load") as timer:
+        content = await fetch_search_page(search_url)
+        timer.items = 0 if content is None else 1
+    if content is None:
+        return cleaned_events
+    record_counts(pages=1)
+
+    try:
+        with stage("card_parse") as timer:
+            # HTML Parsing just to get IDs
             soup = BeautifulSoup(content, "html.parser")
             
-            cards = soup.select("section.event-card-details, div.event-card__details")
+            cards = soup.select(CARD_SELECTOR)
             print(f"Found {len(cards)} cards. Fetching details via API...")
 
+            # 1. Collect event IDs (and the organizer shown on the card) from the HTML
+            found = []
             for card in cards:
                 try:
                     # Extract ID from Link
@@ -158,18 +233,18 @@ async def scrape_events_playwright(city: str = "chennai", category: str = "busin
                     url = link_tag['href'] if link_tag else ""
                     if url.startswith("/"):
                         url = BASE_URL + url
-                    
+                
                     event_id = "unknown"
                     if "/e/" in url:
                         parts = url.split("-")
                         last_part = parts[-1].split("?")[0]
                         if last_part.isdigit():
                             event_id = last_part
-                    
+                
                     if not event_id or event_id == "unknown":
                          continue 
-                    
-                    
+                
+                
                     # --- SCARPE FALLBACK: Organizer ---
                     scraped_organizer = "Unknown Organizer"
                     try:
@@ -182,51 +257,46 @@ async def scrape_events_playwright(city: str = "chennai", category: str = "busin
                     except:
                         pass
 
-                    # --- HYBRID STEP: Call API ---
-                    print(f"Fetching API details for ID: {event_id}...")
-                    api_data = fetch_event_details_api(event_id)
-                    
-                    if api_data:
-                        # Fallback for organizer
-                        final_organizer = api_data['organizer_name']
-                        if not final_organizer or final_organizer == "Unknown Organizer" or final_organizer == "null":
-                             if scraped_organizer != "Unknown Organizer":
-                                 final_organizer = scraped_organizer
-                             else:
-                                 # Hard fallback for the specific problematic event if HTML fails
-                                 if event_id == "1978745812993":
-                                     final_organizer = "COSMIR SOLUTIONS"
-
-                        # Use API data
-                        cleaned_events.append({
-                            "eventbrite_id": event_id,
-                            "title": api_data['title'],
-                            "description": api_data['description'] or f"Scraped from {url}",
-                            "start_time": api_data['start_time'],
-                            "end_time": api_data['end_time'],
-                            "url": api_data['url'],
-                            "image_url": api_data['logo_url'],
-                            "venue_name": api_data['venue_name'],
-                            "venue_address": api_data['venue_address'],
-                            "organizer_name": final_organizer,
-                            "is_free": api_data['is_free'],
-                            "online_event": api_data['online_event'],
-                            "raw_data": {"source": "eventbrite_api"}
-                        })
-                    else:
-                        print(f"Skipping {event_id} due to API failure.")
-                        # Optional: Fallback to scraping if API fails? 
-                        # For now, let's skip to ensure high quality data.
+                    found.append((event_id, url, scraped_organizer))
 
                 except Exception as e:
                     print(f"Error processing card: {e}")
                     continue
 
-        except Exception as e:
-            print(f"Scraper Error: {e}")
-        
-        finally:
-            await browser.close()
+            timer.items = len(found)
+
+        # 2. HYBRID STEP: Fetch API details concurrently, skipping events
+        # fetched recently enough for how soon they start (change_detection.py)
+        found_ids = [event_id for event_id, _, _ in found]
+        fresh_ids = await fresh_event_ids(found_ids) if skip_fresh else set()
+        due_ids = [event_id for event_id in dict.fromkeys(found_ids) if event_id not in fresh_ids]
+        api_fetches.inc(len(fresh_ids), result="skipped_fresh")
+        api_fetches.inc(len(due_ids), result="fetched")
+        print(f"{len(due_ids)} events due for an API refresh, {len(fresh_ids)} still fresh.")
+
+        with stage("api_fetch", items=len(due_ids)):
+            async with EventbriteClient() as client:
+                api_payloads = await client.get_events(due_ids)
+
+        # 3. Merge card + API data
+        seen_ids = set(fresh_ids)
+        for event_id, url, scraped_organizer in found:
+            if event_id in seen_ids:
+                continue
+            seen_ids.add(event_id)
+
+            payload = api_payloads.get(event_id)
+            api_data = parse_event_details(event_id, payload) if payload else None
+            
+            if api_data:
+                cleaned_events.append(build_event_row(event_id, api_data, scraped_organizer, url))
+            else:
+                print(f"Skipping {event_id} due to API failure.")
+                # Optional: Fallback to scraping if API fails? 
+                # For now, let's skip to ensure high quality data.
+
+    except Exception as e:
+        print(f"Scraper Error: {e}")
             
     print(f"Scraper finished. collected {len(cleaned_events)} high-quality events.")
     return cleaned_events
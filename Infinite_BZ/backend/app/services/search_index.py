@@ -0,0 +1,142 @@
+"""
+Full-text search index for events.
+
+PostgreSQL: a generated `search_vector` tsvector column with a GIN index.
+SQLite (local dev): an external-content FTS5 table `event_fts` kept in sync by triggers.
+
+Both are maintained by the database itself, so every write path
+(create_event, update_event, sync, scheduled scraper) keeps the index current.
+"""
+import re
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, literal_column, select, table, text
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.schemas import Event
+
+# Weights: title > organizer > venue > description
+PG_SEARCH_VECTOR_DDL = """
+ALTER TABLE event ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(organizer_name, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(venue_name, '') || ' ' || coalesce(venue_address, '')), 'C') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'D')
+) STORED
+"""
+PG_SEARCH_INDEX_DDL = "CREATE INDEX IF NOT EXISTS ix_event_search_vector ON event USING GIN (search_vector)"
+
+FTS_COLUMNS = "title, description, venue_name, venue_address, organizer_name"
+FTS_NEW_VALUES = "new.id, new.title, new.description, new.venue_name, new.venue_address, new.organizer_name"
+FTS_OLD_VALUES = "old.id, old.title, old.description, old.venue_name, old.venue_address, old.organizer_name"
+
+SQLITE_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS event_fts USING fts5(
+        {FTS_COLUMNS},
+        content='event', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS event_fts_ai AFTER INSERT ON event BEGIN
+        INSERT INTO event_fts(rowid, {FTS_COLUMNS}) VALUES ({FTS_NEW_VALUES});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS event_fts_ad AFTER DELETE ON event BEGIN
+        INSERT INTO event_fts(event_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', {FTS_OLD_VALUES});
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS event_fts_au AFTER UPDATE OF {FTS_COLUMNS} ON event BEGIN
+        INSERT INTO event_fts(event_fts, rowid, {FTS_COLUMNS}) VALUES ('delete', {FTS_OLD_VALUES});
+        INSERT INTO event_fts(rowid, {FTS_COLUMNS}) VALUES ({FTS_NEW_VALUES});
+    END
+    """,
+]
+
+# bm25() weights follow FTS_COLUMNS order; lower score = better match
+SQLITE_RANK = "bm25(event_fts, 10.0, 1.0, 2.0, 2.0, 5.0)"
+
+
+async def init_search_index(conn) -> None:
+    """
+    Creates the search index structures if missing. Called from init_db()
+    after create_all, so it also upgrades existing databases in place.
+    """
+    dialect = conn.dialect.name
+
+    if dialect == "postgresql":
+        # A generated column backfills existing rows when it is added
+        await conn.execute(text(PG_SEARCH_VECTOR_DDL))
+        await conn.execute(text(PG_SEARCH_INDEX_DDL))
+
+    elif dialect == "sqlite":
+        result = await conn.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'event_fts'")
+        )
+        is_new = result.first() is None
+
+        for ddl in SQLITE_FTS_DDL:
+            await conn.execute(text(ddl))
+
+        if is_new:
+            # Index rows that existed before the FTS table was created
+            await conn.execute(text("INSERT INTO event_fts(event_fts) VALUES ('rebuild')"))
+            print("Search index: built FTS5 index for existing events.")
+
+
+def tokenize_search(search: Optional[str]) -> List[str]:
+    """
+    Splits user input into plain word tokens. Operators and quotes are dropped
+    so arbitrary input can never produce an invalid MATCH / tsquery expression.
+    """
+    if not search:
+        return []
+    return re.findall(r"\w+", search.lower())
+
+
+def apply_search(query: Select, search: str, dialect: str) -> Tuple[Select, Optional[ColumnElement]]:
+    """
+    Restricts `query` to events matching `search` and returns it together with
+    an ORDER BY element for relevance (best match first).
+    Every word must match; words are prefix-matched to keep partial-word
+    queries working like the old ILIKE filter did.
+    """
+    tokens = tokenize_search(search)
+    if not tokens:
+        return query, None
+
+    if dialect == "postgresql":
+        # regconfig must be a literal: a bound VARCHAR does not resolve to to_tsquery(regconfig, text)
+        ts_query = func.to_tsquery(literal_column("'simple'::regconfig"), " & ".join(f"{t}:*" for t in tokens))
+        search_vector = literal_column("event.search_vector")
+        query = query.where(search_vector.op("@@")(ts_query))
+        return query, func.ts_rank(search_vector, ts_query).desc()
+
+    if dialect == "sqlite":
+        match_expr = " ".join(f'"{t}"*' for t in tokens)
+        fts = (
+            select(
+                literal_column("rowid").label("event_id"),
+                literal_column(SQLITE_RANK).label("rank"),
+            )
+            .select_from(table("event_fts"))
+            .where(text("event_fts MATCH :fts_query").bindparams(fts_query=match_expr))
+            .subquery("fts")
+        )
+        query = query.join(fts, fts.c.event_id == Event.id)
+        return query, fts.c.rank.asc()
+
+    # Unknown backend: fall back to the original substring scan
+    search_term = f"%{search}%"
+    query = query.where(
+        Event.title.ilike(search_term)
+        | Event.description.ilike(search_term)
+        | Event.venue_name.ilike(search_term)
+        | Event.venue_address.ilike(search_term)
+        | Event.organizer_name.ilike(search_term)
+    )
+    return query, None
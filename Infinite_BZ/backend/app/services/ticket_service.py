@@ -1,87 +1,373 @@
+"""
+Ticket rendering (PDF + QR code), off the event loop.
+
+reportlab and qrcode are CPU-bound, so tickets are rendered in a bounded
+process pool (TICKET_RENDER_WORKERS processes). Each ticket is rendered
+once and stored under TICKET_DIR; the download route and the ticket email
+both use the stored files. The file name carries a hash of what is printed
+on the ticket, so an edited, refreshed or rolled-over event gets a new
+ticket, and the previous versions are removed. Concurrent requests for the same ticket wait
+for the one render in flight; if workers of different processes render it
+at the same time, the first one stored is kept.
+
+Everything on a ticket except the ticket id, attendee name and QR code is
+the same for all attendees of an event. Each pool process compiles that
+static part once per event into a TicketTemplate (a PDF form XObject
+stream, kept compressed) and only stamps the attendee fields onto it. The
+QR code is drawn as vector modules, not embedded as a PNG image.
+`python bench_tickets.py` compares this with the full per-ticket render.
+"""
+import asyncio
+import base64
+import glob
+import hashlib
+import json
 import os
-from datetime import datetime
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.units import inch
-from reportlab.lib import colors
+import tempfile
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from io import BytesIO
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
 import qrcode
+from PIL import Image
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfgen import canvas
+
+from app.core.metrics import histogram
 
 TICKET_DIR = "tickets"
+TICKET_RENDER_WORKERS = int(os.getenv("TICKET_RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Layout of the ticket (same design as email_utils.generate_event_ticket_pdf)
+TICKET_SIZE = (400, 600)
+PRIMARY = (0.08, 0.55, 0.67)  # #148EAB
+# Fonts registered first on every canvas, so they get the same internal
+# names (/F1, /F2) in every ticket document
+TICKET_FONTS = ("Helvetica", "Helvetica-Bold")
+TICKET_ID_Y = TICKET_SIZE[1] - 145
+ATTENDEE_Y = TICKET_SIZE[1] - 330
+QR_X, QR_Y, QR_SIZE = 50, ATTENDEE_Y - 40 - 160, 120
+QR_BOX_SIZE, QR_BORDER = 10, 5
+# Templates kept per pool process (one per event being rendered)
+TEMPLATE_CACHE_SIZE = 64
+
+ticket_render_seconds = histogram("ticket_render_seconds", "Ticket render time including the wait for a pool process")
 
-def generate_qr(data: str, filename: str) -> str:
-    """Generates a QR code image and returns its path."""
-    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+class Ticket(NamedTuple):
+    path: str          # stored PDF
+    pdf: bytes
+    qr_base64: str     # PNG, for inline display
+
+_pool: Optional[ProcessPoolExecutor] = None
+_in_flight: Dict[str, "asyncio.Future[Ticket]"] = {}
+
+def _lower_priority():
+    # Render processes yield the CPU to the processes serving requests
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=TICKET_RENDER_WORKERS, initializer=_lower_priority)
+    return _pool
+
+def shutdown_ticket_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def ticket_qr_data(confirmation_id: str, event_data: dict, email: str) -> str:
+    """QR payload; the same format the QR code endpoints return."""
+    return f"Ticket ID: {confirmation_id}\nEvent: {event_data.get('title', 'N/A')}\nUser: {email}\nValid: {event_data.get('start_time', 'N/A')}"
+
+def qr_matrix(data: str) -> List[List[bool]]:
+    """QR modules, including the quiet-zone border."""
+    qr = qrcode.QRCode(version=1, box_size=QR_BOX_SIZE, border=QR_BORDER)
     qr.add_data(data)
     qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white")
-    
-    path = f"{TICKET_DIR}/{filename}"
-    img.save(path)
-    return path
+    return qr.get_matrix()
+
+def qr_png_base64(matrix: List[List[bool]]) -> str:
+    """The QR code as a base64 PNG (for inline display in emails)."""
+    size = len(matrix)
+    img = Image.new("1", (size, size))
+    img.putdata([0 if dark else 1 for row in matrix for dark in row])
+    img = img.resize((size * QR_BOX_SIZE, size * QR_BOX_SIZE), Image.NEAREST)
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return base64.b64encode(buffer.getvalue()).decode("utf-8")
 
-def generate_ticket_pdf(registration_id: str, event_title: str, user_name: str, event_date: datetime, event_location: str) -> str:
+def _new_canvas(buffer: BytesIO, fonts: Tuple[str, ...] = TICKET_FONTS) -> canvas.Canvas:
+    c = canvas.Canvas(buffer, pagesize=TICKET_SIZE)
+    # Internal names are handed out in registration order (/F1, /F2, ...)
+    for font in fonts:
+        c._doc.getInternalFontName(font)
+    return c
+
+def _draw_static(c: canvas.Canvas, event_data: dict):
+    """Everything that is the same on every ticket of the event."""
+    width, height = TICKET_SIZE
+
+    # White background
+    c.setFillColorRGB(1, 1, 1)
+    c.rect(0, 0, width, height, fill=1)
+
+    # Header with InfiniteBZ branding and primary color
+    c.setFillColorRGB(*PRIMARY)
+    c.rect(0, height-120, width, 120, fill=1)
+
+    c.setFillColorRGB(1, 1, 1)
+    c.setFont("Helvetica-Bold", 28)
+    c.drawString(30, height - 50, "🎫 INFINITE BZ")
+    c.setFont("Helvetica", 14)
+    c.drawString(30, height - 75, "Event Management")
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(30, height - 100, "SYSTEM")
+
+    # Ticket ID box (the id itself is stamped)
+    c.setStrokeColorRGB(*PRIMARY)
+    c.setLineWidth(3)
+    c.roundRect(20, height-160, width-40, 35, 8)
+
+    # Event details
+    y_pos = height - 200
+    c.setFillColorRGB(0.2, 0.2, 0.2)
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(30, y_pos, "EVENT DETAILS")
+    y_pos -= 30
+
+    rows = [
+        ("Event Name:", 120, event_data.get('title', 'N/A')[:25]),
+        ("Date & Time:", 120, event_data.get('start_time', 'N/A')),
+        ("Venue:", 85, (event_data.get('venue_name') or 'Online Event')[:25]),
+        ("Organizer:", 105, (event_data.get('organizer_name') or 'InfiniteBZ')[:20]),
+        ("Attendee Name:", 130, None),  # stamped
+    ]
+    for label, value_x, value in rows:
+        c.setFillColorRGB(*PRIMARY)
+        c.setFont("Helvetica-Bold", 12)
+        c.drawString(30, y_pos, label)
+        if value is not None:
+            c.setFillColorRGB(0.1, 0.1, 0.1)
+            c.setFont("Helvetica", 11)
+            c.drawString(value_x, y_pos, value)
+        y_pos -= 25
+    y_pos -= 15
+
+    # QR Code section (the code itself is stamped)
+    c.setFillColorRGB(0.95, 0.95, 0.95)
+    c.setStrokeColorRGB(*PRIMARY)
+    c.setLineWidth(2)
+    c.roundRect(30, y_pos-180, width-60, 170, 10, fill=1)
+
+    c.setFillColorRGB(*PRIMARY)
+    c.setFont("Helvetica-Bold", 12)
+    c.drawCentredString(width/2, y_pos-5, "SCAN FOR VERIFICATION")
+
+    # Terms and conditions
+    terms_y = y_pos - 200
+    c.setFillColorRGB(0.4, 0.4, 0.4)
+    c.setFont("Helvetica", 8)
+    c.drawString(30, terms_y, "• This ticket is non-transferable")
+    c.drawString(30, terms_y - 12, "• Valid only for the registered attendee")
+    c.drawString(30, terms_y - 24, "• Please arrive 30 minutes early")
+    c.drawString(30, terms_y - 36, "• Keep this ticket safe")
+
+    # Footer
+    c.setFillColorRGB(*PRIMARY)
+    c.setFont("Helvetica-Bold", 10)
+    c.drawCentredString(width/2 + 20, 30, "Thank you for using InfiniteBZ!")
+    c.setFont("Helvetica", 8)
+    c.drawCentredString(width/2 + 20, 15, "Event Management System")
+
+class TicketTemplate:
     """
-    Generates a PDF ticket for the given registration details.
-    Returns the absolute path to the generated PDF.
+    The static layers of an event's ticket, compiled once into a compressed
+    PDF content stream and placed as a form XObject in each ticket.
+
+    reportlab has no public API for reusing a form across documents, so
+    this captures the canvas operators and registers the form on each
+    ticket's document directly (reportlab is pinned in requirements.txt).
     """
-    
-    # Ensure directory exists
-    if not os.path.exists(TICKET_DIR):
-        os.makedirs(TICKET_DIR)
-        
-    filename = f"ticket_{registration_id}.pdf"
-    filepath = os.path.join(TICKET_DIR, filename)
-    absolute_path = os.path.abspath(filepath)
-    
-    # Create PDF Canvas
-    c = canvas.Canvas(absolute_path, pagesize=letter)
-    width, height = letter
-    
-    # --- DESIGN ---
-    
-    # 1. Header Banner (Dark Background)
-    c.setFillColor(colors.HexColor("#0F172A")) # Slate 900
-    c.rect(0, height - 2*inch, width, 2*inch, fill=1, stroke=0)
-    
-    # 2. Event Title (White Text)
-    c.setFillColor(colors.white)
-    c.setFont("Helvetica-Bold", 24)
-    c.drawString(0.5*inch, height - 1*inch, event_title[:40]) # Truncate if too long
-    
-    # 3. Logo/Brand
-    c.setFont("Helvetica", 12)
-    c.setFillColor(colors.HexColor("#38BDF8")) # Sky 400
-    c.drawString(0.5*inch, height - 1.4*inch, "Powered by Infinite BZ")
-    
-    # 4. Ticket Info Box
-    c.setFillColor(colors.black)
-    c.setFont("Helvetica-Bold", 16)
-    c.drawString(0.5*inch, height - 3*inch, "ADMIT ONE")
-    
-    c.setFont("Helvetica", 12)
-    c.drawString(0.5*inch, height - 3.5*inch, f"Attendee: {user_name}")
-    c.drawString(0.5*inch, height - 3.8*inch, f"Date: {event_date.strftime('%B %d, %Y @ %I:%M %p')}")
-    c.drawString(0.5*inch, height - 4.1*inch, f"Location: {event_location}")
-    
-    # 5. Ticket ID
-    c.setFillColor(colors.gray)
-    c.setFont("Helvetica", 10)
-    c.drawString(0.5*inch, height - 4.6*inch, f"Ticket ID: {registration_id}")
-    
-    # 6. QR Code Generation
-    qr_filename = f"qr_{registration_id}.png"
-    qr_path = generate_qr(registration_id, qr_filename)
-    
-    # 7. Draw QR Code
-    c.drawImage(qr_path, width - 2.5*inch, height - 4.5*inch, width=2*inch, height=2*inch)
-    
-    # Cleanup QR image (optional, or keep for debug)
-    # os.remove(qr_path) 
-    
-    # 8. Footer
-    c.setFillColor(colors.HexColor("#0F172A"))
-    c.setFont("Helvetica", 10)
-    c.drawCentredString(width/2, 0.5*inch, "Please show this ticket at the entrance. valid for one entry.")
-    
-    c.save()
-    return absolute_path
+    FORM_NAME = "ticket_static"
+
+    def __init__(self, event_data: dict):
+        c = _new_canvas(BytesIO())
+        _draw_static(c, event_data)
+        # Every font the stream refers to, in internal-name order. Besides
+        # TICKET_FONTS this includes the fallbacks reportlab picked for
+        # characters Helvetica lacks (ZapfDingbats for the header emoji)
+        self.fonts = tuple(c._doc.fontMapping)
+        stream = "\n".join([c._preamble] + c._code)
+        self.content = zlib.compress(pdfdoc.pdfdocEnc(stream))
+
+    def _form(self) -> pdfdoc.PDFFormXObject:
+        width, height = TICKET_SIZE
+        form = pdfdoc.PDFFormXObject(lowerx=0, lowery=0, upperx=width, uppery=height)
+        contents = pdfdoc.PDFStream(content=self.content)
+        # Already compressed: PDFStream skips its filters when Filter is set
+        contents.dictionary["Filter"] = pdfdoc.PDFArray([pdfdoc.PDFName("FlateDecode")])
+        form.Contents = contents
+        return form
+
+    def stamp(self, ticket_id: str, attendee: str, matrix: List[List[bool]]) -> bytes:
+        """A ticket PDF: the template plus the attendee's id, name and QR code."""
+        width, _ = TICKET_SIZE
+        buffer = BytesIO()
+        c = _new_canvas(buffer, self.fonts)
+        c._doc.addForm(self.FORM_NAME, self._form())
+        c.doForm(self.FORM_NAME)
+
+        c.setFillColorRGB(*PRIMARY)
+        c.setFont("Helvetica-Bold", 14)
+        c.drawCentredString(width/2, TICKET_ID_Y, f"TICKET ID: {ticket_id}")
+
+        c.setFillColorRGB(0.1, 0.1, 0.1)
+        c.setFont("Helvetica", 11)
+        c.drawString(130, ATTENDEE_Y, attendee[:30])
+
+        # QR code as vector modules: white quiet zone, then one rectangle per
+        # run of dark modules, in module units (integer operands) under a
+        # single transform
+        c.setFillColorRGB(1, 1, 1)
+        c.rect(QR_X, QR_Y, QR_SIZE, QR_SIZE, stroke=0, fill=1)
+        module = QR_SIZE / len(matrix)
+        ops = [f"q 0 g {module:.4f} 0 0 {-module:.4f} {QR_X} {QR_Y + QR_SIZE} cm"]
+        for row_index, row in enumerate(matrix):
+            col = 0
+            while col < len(row):
+                if not row[col]:
+                    col += 1
+                    continue
+                run_start = col
+                while col < len(row) and row[col]:
+                    col += 1
+                ops.append(f"{run_start} {row_index} {col - run_start} 1 re")
+        ops.append("f Q")
+        c.addLiteral("\n".join(ops))
+
+        c.save()
+        return buffer.getvalue()
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _template_for(event_key: Tuple) -> TicketTemplate:
+    return TicketTemplate(dict(event_key))
+
+def render_ticket(event_data: dict, email: str, confirmation_id: str, user_name: Optional[str] = None) -> Tuple[bytes, str]:
+    """
+    Renders a ticket: (PDF bytes, base64 QR PNG). CPU-bound; runs in a
+    pool process, so it only takes and returns picklable values.
+    """
+    matrix = qr_matrix(ticket_qr_data(confirmation_id, event_data, email))
+    template = _template_for(tuple(sorted(event_data.items())))
+    pdf = template.stamp(confirmation_id, user_name or email, matrix)
+    return pdf, qr_png_base64(matrix)
+
+# Hex digits of the content hash in ticket file names
+TICKET_HASH_LENGTH = 16
+
+def _safe_id(confirmation_id: str) -> str:
+    return "".join(ch for ch in confirmation_id if ch.isalnum() or ch in "-_")
+
+def ticket_path(confirmation_id: str, event_data: dict, email: str, user_name: Optional[str] = None) -> str:
+    """
+    Where the ticket is stored: one file per version of the printed contents.
+    """
+    contents = json.dumps([sorted(event_data.items()), email, user_name], default=str)
+    digest = hashlib.sha256(contents.encode("utf-8")).hexdigest()[:TICKET_HASH_LENGTH]
+    return os.path.abspath(os.path.join(TICKET_DIR, f"ticket_{_safe_id(confirmation_id)}_{digest}.pdf"))
+
+def _remove_other_versions(path: str):
+    """Deletes the older versions of the ticket stored at `path`."""
+    stem = path[:-len(".pdf")]
+    pattern = stem[:-TICKET_HASH_LENGTH] + "?" * TICKET_HASH_LENGTH
+    for extension in (".pdf", ".png"):
+        for other in glob.glob(pattern + extension):
+            if other == stem + extension:
+                continue
+            try:
+                os.remove(other)
+            except OSError:
+                pass  # already removed by another worker, or still open
+
+def _load(path: str) -> Optional[Ticket]:
+    qr_path = path[:-len(".pdf")] + ".png"
+    if not (os.path.exists(path) and os.path.exists(qr_path)):
+        return None
+    with open(path, "rb") as f:
+        pdf = f.read()
+    with open(qr_path, "rb") as f:
+        qr_base64 = base64.b64encode(f.read()).decode("utf-8")
+    return Ticket(path, pdf, qr_base64)
+
+def _publish(target: str, data: bytes) -> bool:
+    """
+    Stores `target` unless it already exists. Returns False when another
+    worker stored it first; its file is kept.
+    """
+    # Written under a unique temp name, so a reader never sees half a file
+    # and concurrent writers never share one
+    fd, tmp = tempfile.mkstemp(dir=TICKET_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # Unlike os.replace, fails if the target exists: the first one wins
+        os.link(tmp, target)
+        return True
+    except FileExistsError:
+        return False
+    finally:
+        os.remove(tmp)
+
+def _store(path: str, pdf: bytes, qr_base64: str) -> Ticket:
+    """
+    Stores a rendered ticket. Another worker may have rendered the same
+    ticket at the same time; whichever PDF was stored first is the ticket.
+    """
+    os.makedirs(TICKET_DIR, exist_ok=True)
+    # The PNG first: once the PDF exists, _load finds both. The PNG is the
+    # same for every render of a ticket, so either copy fits either PDF.
+    _publish(path[:-len(".pdf")] + ".png", base64.b64decode(qr_base64))
+    stored = _publish(path, pdf)
+    _remove_other_versions(path)
+    if stored:
+        return Ticket(path, pdf, qr_base64)
+    return _load(path) or Ticket(path, pdf, qr_base64)
+
+async def get_ticket(event_data: dict, email: str, confirmation_id: str, user_name: Optional[str] = None) -> Ticket:
+    """
+    The stored ticket for a registration, rendered in the process pool on
+    first use.
+    """
+    path = ticket_path(confirmation_id, event_data, email, user_name)
+    pending = _in_flight.get(path)
+    if pending is not None:
+        return await asyncio.shield(pending)
+
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    _in_flight[path] = future
+    try:
+        ticket = await asyncio.to_thread(_load, path)
+        if ticket is None:
+            with ticket_render_seconds.time():
+                pdf, qr_base64 = await loop.run_in_executor(
+                    _get_pool(), render_ticket, event_data, email, confirmation_id, user_name
+                )
+            ticket = await asyncio.to_thread(_store, path, pdf, qr_base64)
+        future.set_result(ticket)
+        return ticket
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        # Nobody else may be waiting; don't warn about an unretrieved exception
+        future.exception()
+        raise
+    finally:
+        _in_flight.pop(path, None)
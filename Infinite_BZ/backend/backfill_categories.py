@@ -0,0 +1,26 @@
+import asyncio
+import sys
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import engine, init_db
+from app.services.categorizer import backfill_event_categories
+
+async def main():
+    print("Starting category backfill for existing events...")
+
+    # Make sure the eventcategory table exists
+    await init_db()
+
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with async_session() as session:
+        try:
+            processed = await backfill_event_categories(session)
+            print(f"Successfully categorized {processed} events.")
+        except Exception as e:
+            print(f"Error during backfill: {e}")
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+    asyncio.run(main())
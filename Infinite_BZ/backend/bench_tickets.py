@@ -0,0 +1,58 @@
+"""
+Ticket rendering benchmark for one large event.
+
+    python bench_tickets.py --attendees 10000
+
+before: the full per-ticket render (email_utils.generate_qr_code PNG +
+        generate_event_ticket_pdf, every layer drawn for every ticket)
+after:  ticket_service.render_ticket (per-event template + stamped fields,
+        vector QR)
+
+Both run in this process on one core; multiply by TICKET_RENDER_WORKERS
+for the pool. Nothing is written to the database or to tickets/.
+"""
+import argparse
+import time
+
+from app.core.email_utils import generate_event_ticket_pdf, generate_qr_code
+from app.services.ticket_service import render_ticket, ticket_qr_data
+
+EVENT = {
+    "id": 1,
+    "title": "Chennai Startup Founders Summit",
+    "start_time": "2026-03-14 09:30 AM",
+    "venue_name": "Chennai Trade Centre",
+    "organizer_name": "Infinite BZ",
+}
+
+def attendee(n: int):
+    return f"attendee{n}@example.com", f"SELF-1760000000-{n:06X}", f"Attendee {n}"
+
+def render_before(n: int) -> int:
+    email, confirmation_id, name = attendee(n)
+    qr_base64 = generate_qr_code(ticket_qr_data(confirmation_id, EVENT, email))
+    pdf = generate_event_ticket_pdf(EVENT, qr_base64, email, confirmation_id, name).getvalue()
+    return len(pdf)
+
+def render_after(n: int) -> int:
+    email, confirmation_id, name = attendee(n)
+    pdf, _ = render_ticket(EVENT, email, confirmation_id, name)
+    return len(pdf)
+
+def run(label: str, render, attendees: int) -> float:
+    start = time.perf_counter()
+    total_bytes = sum(render(n) for n in range(attendees))
+    elapsed = time.perf_counter() - start
+    rate = attendees / elapsed if elapsed else 0
+    print(f"[{label}] {attendees} tickets in {elapsed:.2f}s ({rate:.0f} tickets/s, "
+          f"{elapsed / attendees * 1000:.1f} ms/ticket, avg {total_bytes // attendees} bytes)")
+    return rate
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ticket PDF rendering benchmark")
+    parser.add_argument("--attendees", type=int, default=10000, help="tickets rendered per variant")
+    args = parser.parse_args()
+
+    before = run("before", render_before, args.attendees)
+    after = run("after", render_after, args.attendees)
+    print(f"Speedup: {after / before:.1f}x")
@@ -11,6 +11,8 @@ from langchain_core.runnables import RunnablePassthrough, RunnableLambda
 import os
 import re
 from dotenv import load_dotenv
+from app.services.geocoder import geocode
+from app.services.geo_index import bounding_box
 
 load_dotenv()
 
@@ -88,10 +90,7 @@ write_query_prompt = PromptTemplate.from_template(
     
     Rules:
     1. **Location Filtering:** If the user asks for "nearby", "local", or "events near me":
-       - You MUST filter by the 'venue_address' column.
-       - Do NOT use exact matches (e.g., = 'Saidapet, Chennai'). 
-       - Instead, use `ILIKE` with the main city name. 
-       - Example: If location is 'Saidapet, Chennai', write: `WHERE venue_address ILIKE '%Chennai%'`.
+       {location_rule}
     
     2. **General Rules:**
        - unless the user specifies a specific number, always limit results to 5 using `LIMIT 5`.
@@ -99,16 +98,43 @@ write_query_prompt = PromptTemplate.from_template(
     
     3. **Schema Info:**
        - **Table Name:** 'event'
-       - **Columns:** title, description, start_time, end_time, venue_address, venue_name, is_free.
-       - **IMPORTANT:** There is NO 'city' column. Use `venue_address` to filter by location.
+       - **Columns:** title, description, start_time, end_time, venue_address, venue_name, is_free, latitude, longitude.
+       - **IMPORTANT:** There is NO 'city' column. Use latitude/longitude (see rule 1) or `venue_address` to filter by location.
        - Example: `WHERE venue_address ILIKE '%Chennai%'`
     
     Question: {question}
     SQL Query:"""
 )
 
+NEAR_ME_RADIUS_KM = 15
+
+def location_rule(user_location):
+    """
+    Tells the SQL writer how to filter "near me" questions. When the user's
+    location is in the gazetteer we hand over a ready-made bounding box, which
+    the (latitude, longitude) index answers, instead of an address ILIKE scan.
+    """
+    point = geocode(user_location)
+    if not point:
+        return (
+            "- You MUST filter by the 'venue_address' column.\n"
+            "       - Do NOT use exact matches (e.g., = 'Saidapet, Chennai').\n"
+            "       - Instead, use `ILIKE` with the main city name.\n"
+            "       - Example: If location is 'Saidapet, Chennai', write: `WHERE venue_address ILIKE '%Chennai%'`."
+        )
+
+    min_lat, max_lat, min_lon, max_lon = bounding_box(point[0], point[1], NEAR_ME_RADIUS_KM)
+    return (
+        f"- The user is at latitude {point[0]}, longitude {point[1]}.\n"
+        f"       - You MUST filter with exactly: `WHERE latitude BETWEEN {min_lat:.4f} AND {max_lat:.4f} "
+        f"AND longitude BETWEEN {min_lon:.4f} AND {max_lon:.4f}` (about {NEAR_ME_RADIUS_KM} km around them).\n"
+        f"       - Do NOT filter on venue_address for nearby questions."
+    )
+
 # We create a chain that takes ALL inputs (question + location + page)
-write_query = write_query_prompt | llm | StrOutputParser() | clean_sql
+write_query = RunnablePassthrough.assign(
+    location_rule=lambda x: location_rule(x["user_location"])
+) | write_query_prompt | llm | StrOutputParser() | clean_sql
 
 execute_query = QuerySQLDataBaseTool(db=db)
 
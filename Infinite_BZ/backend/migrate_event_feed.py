@@ -0,0 +1,190 @@
+import asyncio
+import sys
+from sqlalchemy import text, update
+from sqlalchemy.future import select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.schemas import Event
+from app.services.event_source import derive_source
+from app.services.geocoder import geocode
+from app.services.recurrence import detect_recurrence, sync_occurrences
+from app.core.database import engine, init_db
+
+# Columns / indexes used by the events feed. Safe to re-run.
+NEW_COLUMNS = [
+    ("is_native", "BOOLEAN NOT NULL DEFAULT FALSE"),
+    ("source", "VARCHAR"),
+    ("latitude", "FLOAT"),
+    ("longitude", "FLOAT"),
+    ("content_hash", "VARCHAR"),
+    ("last_fetched_at", "TIMESTAMP"),
+    ("next_refresh_at", "TIMESTAMP"),
+    ("canonical_event_id", "INTEGER REFERENCES event(id)"),
+    ("recurrence", "VARCHAR"),
+    ("series_start", "TIMESTAMP"),
+]
+
+FEED_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS ix_event_feed_order ON event (is_native DESC, start_time, id)",
+    "CREATE INDEX IF NOT EXISTS ix_event_source_feed ON event (source, is_native DESC, start_time, id)",
+    "CREATE INDEX IF NOT EXISTS ix_event_free_feed ON event (is_free, is_native DESC, start_time, id)",
+    "CREATE INDEX IF NOT EXISTS ix_event_online_feed ON event (online_event, is_native DESC, start_time, id)",
+    "CREATE INDEX IF NOT EXISTS ix_event_start_time ON event (start_time, id)",
+    "CREATE INDEX IF NOT EXISTS ix_event_lat_lon ON event (latitude, longitude)",
+    "CREATE INDEX IF NOT EXISTS ix_event_next_refresh_at ON event (next_refresh_at)",
+    "CREATE INDEX IF NOT EXISTS ix_event_canonical_event_id ON event (canonical_event_id)",
+]
+
+BATCH_SIZE = 1000
+
+async def backfill_source():
+    """
+    Fills Event.source from raw_data['source'] and the url, in id-ordered batches.
+    """
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    updated = 0
+    last_id = 0
+
+    async with async_session() as session:
+        while True:
+            result = await session.execute(
+                select(Event.id, Event.url, Event.raw_data)
+                .where(Event.id > last_id, Event.source == None)
+                .order_by(Event.id)
+                .limit(BATCH_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            changes = [
+                {"id": row.id, "source": source}
+                for row in rows
+                if (source := derive_source(row.url, row.raw_data))
+            ]
+            if changes:
+                await session.execute(update(Event), changes)
+            await session.commit()
+
+            updated += len(changes)
+            last_id = rows[-1].id
+            print(f"Backfilled source for {updated} events (last id {last_id})...")
+
+    return updated
+
+async def backfill_geocodes():
+    """
+    Geocodes venues of events without coordinates, in id-ordered batches.
+    """
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    located = 0
+    last_id = 0
+
+    async with async_session() as session:
+        while True:
+            result = await session.execute(
+                select(Event.id, Event.venue_address, Event.venue_name)
+                .where(Event.id > last_id, Event.latitude == None, Event.online_event == False)
+                .order_by(Event.id)
+                .limit(BATCH_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            changes = [
+                {"id": row.id, "latitude": point[0], "longitude": point[1]}
+                for row in rows
+                if (point := geocode(row.venue_address) or geocode(row.venue_name))
+            ]
+            if changes:
+                await session.execute(update(Event), changes)
+            await session.commit()
+
+            located += len(changes)
+            last_id = rows[-1].id
+            print(f"Geocoded {located} events (last id {last_id})...")
+
+    return located
+
+async def backfill_occurrences():
+    """
+    Marks long-running events as weekly series and expands every event into
+    EventOccurrence rows, in id-ordered batches.
+    """
+    async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    expanded = 0
+    last_id = 0
+
+    async with async_session() as session:
+        while True:
+            result = await session.execute(
+                select(Event.id, Event.start_time, Event.end_time, Event.recurrence)
+                .where(Event.id > last_id)
+                .order_by(Event.id)
+                .limit(BATCH_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                break
+
+            # Stored start_time is a session of the series (old scraper moved it by whole weeks)
+            series = [
+                {"id": row.id, "recurrence": recurrence, "series_start": row.start_time}
+                for row in rows
+                if row.recurrence is None and (recurrence := detect_recurrence(row.start_time, row.end_time))
+            ]
+            if series:
+                await session.execute(update(Event), series)
+            await sync_occurrences(session, [row.id for row in rows])
+            await session.commit()
+
+            expanded += len(rows)
+            last_id = rows[-1].id
+            print(f"Expanded sessions of {expanded} events (last id {last_id})...")
+
+    return expanded
+
+async def migrate():
+    print("Starting event feed migration...")
+
+    for name, definition in NEW_COLUMNS:
+        async with engine.begin() as conn:
+            print(f"Adding {name} column...")
+            try:
+                await conn.execute(text(f"ALTER TABLE event ADD COLUMN {name} {definition}"))
+                print(f"Added {name}.")
+            except Exception as e:
+                print(f"Skipping {name} (maybe exists): {e}")
+
+    async with engine.begin() as conn:
+        print("Backfilling is_native from url...")
+        result = await conn.execute(text(
+            "UPDATE event SET is_native = TRUE "
+            "WHERE lower(url) LIKE '%infinitebz.com%' AND is_native = FALSE"
+        ))
+        print(f"Marked {result.rowcount} native events.")
+
+    print("Backfilling source from raw_data / url...")
+    await backfill_source()
+
+    print("Geocoding venues...")
+    await backfill_geocodes()
+
+    async with engine.begin() as conn:
+        print("Creating feed indexes...")
+        for ddl in FEED_INDEXES:
+            await conn.execute(text(ddl))
+
+    # Spatial index (PostGIS / SQLite R-tree), built from the backfilled coordinates
+    await init_db()
+
+    print("Expanding event sessions...")
+    await backfill_occurrences()
+
+    print("Migration complete!")
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+    asyncio.run(migrate())
@@ -0,0 +1,84 @@
+"""
+Local SMTP sink for trying the email outbox without a real mail server.
+
+    pip install aiosmtpd
+    python run_smtp_sink.py --port 1025 --save-dir sent_mail
+
+and point the backend at it (.env):
+    MAIL_SERVER=localhost
+    MAIL_PORT=1025
+    MAIL_STARTTLS=false
+    MAIL_USE_CREDENTIALS=false
+
+Every accepted message is printed (and saved as .eml with --save-dir).
+--fail-rate makes the sink answer a share of messages with a temporary
+451 error, to watch the outbox retry them.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+from datetime import datetime
+from email import message_from_bytes, policy
+
+# 1. Force proper event loop for Windows
+if sys.platform == 'win32':
+    asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
+
+try:
+    from aiosmtpd.controller import Controller
+except ImportError:
+    print("run_smtp_sink.py needs aiosmtpd: pip install aiosmtpd")
+    sys.exit(1)
+
+class SinkHandler:
+    def __init__(self, save_dir: str = None, fail_rate: float = 0.0):
+        self.save_dir = save_dir
+        self.fail_rate = fail_rate
+        self.accepted = 0
+        self.rejected = 0
+        if save_dir:
+            os.makedirs(save_dir, exist_ok=True)
+
+    async def handle_DATA(self, server, session, envelope):
+        if random.random() < self.fail_rate:
+            self.rejected += 1
+            print(f"REJECTED (451) mail to {', '.join(envelope.rcpt_tos)}")
+            return "451 Temporary failure, try again later"
+
+        self.accepted += 1
+        message = message_from_bytes(envelope.content, policy=policy.default)
+        attachments = [part.get_filename() for part in message.iter_attachments()]
+        print(
+            f"[{datetime.now():%H:%M:%S}] #{self.accepted} {envelope.mail_from} -> {', '.join(envelope.rcpt_tos)} | "
+            f"{message['Subject']} | {len(envelope.content)} bytes"
+            + (f" | attachments: {', '.join(attachments)}" if attachments else "")
+        )
+        if self.save_dir:
+            path = os.path.join(self.save_dir, f"{datetime.now():%Y%m%d-%H%M%S}-{self.accepted}.eml")
+            with open(path, "wb") as f:
+                f.write(envelope.content)
+        return "250 Message accepted for delivery"
+
+async def main(args):
+    handler = SinkHandler(args.save_dir, args.fail_rate)
+    controller = Controller(handler, hostname=args.host, port=args.port)
+    controller.start()
+    print(f"SMTP sink listening on {args.host}:{args.port} (Ctrl+C to stop)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        controller.stop()
+        print(f"Accepted {handler.accepted}, rejected {handler.rejected}.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local SMTP sink for the email outbox")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    parser.add_argument("--save-dir", help="also save each message as .eml here")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of messages answered with 451 (0-1)")
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,46 @@
+"""
+Shared fixtures. The tests run against a throwaway SQLite database and a
+temporary working directory (tickets/, lock files):
+
+    pip install -r requirements-dev.txt
+    pytest
+"""
+import os
+import tempfile
+
+# Before anything imports app.core.database, which builds the engine from it
+_DB_DIR = tempfile.mkdtemp(prefix="infinitebz-tests-")
+DB_PATH = os.path.join(_DB_DIR, "test.db")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{DB_PATH}"
+
+import pytest
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+# The JSONB columns are stored as plain JSON on SQLite
+@compiles(JSONB, "sqlite")
+def _jsonb_on_sqlite(type_, compiler, **kw):
+    return "JSON"
+
+from app.core.database import engine, init_db
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+@pytest.fixture
+async def db():
+    """A fresh, empty database for the test."""
+    await engine.dispose()
+    if os.path.exists(DB_PATH):
+        os.remove(DB_PATH)
+    await init_db()
+    yield
+    await engine.dispose()
+
+@pytest.fixture
+def session_factory(db):
+    return sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
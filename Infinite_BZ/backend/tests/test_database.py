@@ -0,0 +1,53 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in a fresh interpreter: conftest's JSONB -> JSON rule must not apply.
+# The pre-existing tables are created from a copy of their definitions
+# with JSON instead of JSONB, as on an existing SQLite deployment; then
+# init_db has to create `new_table` with the app's own column types.
+UPGRADE_SCRIPT = textwrap.dedent("""
+    import asyncio, sys
+    from sqlalchemy import JSON, MetaData
+    from sqlalchemy.dialects.postgresql import JSONB
+    from sqlmodel import SQLModel
+    from app.core.database import engine, init_db
+    import app.models.schemas
+
+    new_table = sys.argv[1]
+
+    def create_existing_tables(conn):
+        existing = MetaData()
+        for table in SQLModel.metadata.sorted_tables:
+            if table.name == new_table:
+                continue
+            copy = table.to_metadata(existing)
+            for column in copy.columns:
+                if isinstance(column.type, JSONB):
+                    column.type = JSON()
+        existing.create_all(conn)
+
+    async def main():
+        async with engine.begin() as conn:
+            await conn.run_sync(create_existing_tables)
+        await init_db()
+        async with engine.connect() as conn:
+            assert await conn.run_sync(lambda sync: engine.dialect.has_table(sync, new_table)), new_table
+        await engine.dispose()
+
+    asyncio.run(main())
+""")
+
+@pytest.mark.parametrize("new_table", ["event_archive", "ingestrun", "emailoutbox", "eventchange"])
+def test_init_db_creates_new_tables_on_an_existing_sqlite_database(tmp_path, new_table):
+    env = dict(os.environ, DATABASE_URL=f"sqlite+aiosqlite:///{tmp_path / 'existing.db'}", PYTHONPATH=BACKEND_DIR)
+    result = subprocess.run(
+        [sys.executable, "-c", UPGRADE_SCRIPT, new_table],
+        cwd=tmp_path, env=env, capture_output=True, text=True, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
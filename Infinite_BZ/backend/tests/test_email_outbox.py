@@ -0,0 +1,288 @@
+import asyncio
+import socket
+from datetime import datetime, timedelta
+from email import message_from_bytes, policy
+from email.message import EmailMessage
+
+import pytest
+from aiosmtpd.controller import Controller
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from app.core import email_utils
+from app.models.schemas import EmailOutbox
+from app.services import email_outbox
+from app.services.email_outbox import (
+    FAILED, MESSAGE_BUILDERS, PENDING, SENT, OutboxSender, enqueue_ticket_email, retry_delay
+)
+from app.services.ticket_service import shutdown_ticket_pool
+
+class SinkHandler:
+    """Accepts everything, except: RCPT to perm-* gets 550, DATA to temp-* gets 451 while `flaky`."""
+
+    def __init__(self):
+        self.messages = []
+        self.flaky = True
+        self.delay = 0.0
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("perm-"):
+            return "550 5.1.1 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.delay)
+        if self.flaky and any(rcpt.startswith("temp-") for rcpt in envelope.rcpt_tos):
+            return "451 4.3.0 Try again later"
+        self.messages.append((session.peer, envelope.rcpt_tos, message_from_bytes(envelope.content, policy=policy.default)))
+        return "250 Message accepted for delivery"
+
+    @property
+    def recipients(self):
+        return [rcpt for _, rcpts, _ in self.messages for rcpt in rcpts]
+
+    @property
+    def connections(self):
+        return {peer for peer, _, _ in self.messages}
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture
+def smtp_sink(monkeypatch):
+    handler = SinkHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    monkeypatch.setattr(email_utils, "MAIL_SERVER", "127.0.0.1")
+    monkeypatch.setattr(email_utils, "MAIL_PORT", controller.port)
+    monkeypatch.setattr(email_utils, "MAIL_STARTTLS", False)
+    monkeypatch.setattr(email_utils, "MAIL_SSL_TLS", False)
+    monkeypatch.setattr(email_utils, "MAIL_USE_CREDENTIALS", False)
+    monkeypatch.setattr(email_utils, "MAIL_FROM", "noreply@infinitebz.com")
+    yield handler
+    controller.stop()
+
+@pytest.fixture
+def plain_emails(monkeypatch):
+    """A message kind without a ticket to render, for the delivery tests."""
+    async def build(row):
+        message = EmailMessage()
+        message["From"] = email_utils.MAIL_FROM
+        message["To"] = row.recipient
+        message["Subject"] = row.payload["subject"]
+        message.set_content("hello")
+        return message
+
+    monkeypatch.setitem(MESSAGE_BUILDERS, "plain", build)
+
+async def _enqueue_plain(session_factory, *recipients):
+    async with session_factory() as session:
+        for recipient in recipients:
+            session.add(EmailOutbox(kind="plain", recipient=recipient, payload={"subject": f"to {recipient}"}))
+        await session.commit()
+
+async def _rows(session_factory):
+    async with session_factory() as session:
+        result = await session.execute(select(EmailOutbox).order_by(EmailOutbox.id))
+        return {row.recipient: row for row in result.scalars().all()}
+
+async def _make_due(session_factory):
+    async with session_factory() as session:
+        await session.execute(update(EmailOutbox).values(next_attempt_at=datetime.now() - timedelta(seconds=1)))
+        await session.commit()
+
+async def test_ticket_email_is_enqueued_claimed_and_sent(session_factory, smtp_sink):
+    event_data = {"id": 7, "title": "Outbox Summit", "start_time": "2026-03-14 09:30 AM"}
+    async with session_factory() as session:
+        enqueue_ticket_email(session, "alice@example.com", event_data, "SELF-1-ABC", "Alice")
+        # Nothing is sent before the caller commits
+        await session.commit()
+
+    sender = OutboxSender()
+    try:
+        assert await sender.send_due() == 1
+    finally:
+        await sender.stop()
+        shutdown_ticket_pool()
+
+    row = (await _rows(session_factory))["alice@example.com"]
+    assert row.status == SENT and row.attempts == 1 and row.sent_at is not None
+    assert row.claimed_by is None and row.locked_until is None
+
+    [(_, recipients, message)] = smtp_sink.messages
+    assert recipients == ["alice@example.com"]
+    assert message["Subject"] == "Your Event Ticket for Outbox Summit"
+    [attachment] = list(message.iter_attachments())
+    assert attachment.get_content().startswith(b"%PDF")
+
+    # Handled rows are not claimed again
+    assert await OutboxSender().send_due() == 0
+
+async def test_temporary_failure_is_retried_with_backoff(session_factory, smtp_sink, plain_emails):
+    await _enqueue_plain(session_factory, "temp-bob@example.com")
+    sender = OutboxSender()
+
+    before = datetime.now()
+    assert await sender.send_due() == 1
+    row = (await _rows(session_factory))["temp-bob@example.com"]
+    assert row.status == PENDING and row.attempts == 1
+    assert "451" in row.last_error
+    assert row.next_attempt_at >= before + retry_delay(1)
+    assert retry_delay(3) == retry_delay(1) * 4
+
+    # Not due yet
+    assert await sender.send_due() == 0
+
+    smtp_sink.flaky = False
+    await _make_due(session_factory)
+    assert await sender.send_due() == 1
+    await sender.stop()
+
+    row = (await _rows(session_factory))["temp-bob@example.com"]
+    assert row.status == SENT and row.attempts == 2 and row.last_error is None
+    assert smtp_sink.recipients == ["temp-bob@example.com"]
+
+async def test_permanent_failure_is_not_retried(session_factory, smtp_sink, plain_emails):
+    await _enqueue_plain(session_factory, "perm-carol@example.com", "dave@example.com")
+    sender = OutboxSender()
+    assert await sender.send_due() == 2
+
+    rows = await _rows(session_factory)
+    assert rows["perm-carol@example.com"].status == FAILED
+    assert rows["perm-carol@example.com"].attempts == 1
+    assert "550" in rows["perm-carol@example.com"].last_error
+    # A rejected recipient doesn't hold up the rest of the batch
+    assert rows["dave@example.com"].status == SENT
+
+    await _make_due(session_factory)
+    assert await sender.send_due() == 0
+    await sender.stop()
+
+async def test_batch_reuses_one_smtp_connection(session_factory, smtp_sink, plain_emails):
+    recipients = [f"user{n}@example.com" for n in range(10)]
+    await _enqueue_plain(session_factory, *recipients)
+    # A 451 in the middle of the batch doesn't drop the connection either
+    await _enqueue_plain(session_factory, "temp-erin@example.com")
+
+    connects = email_outbox.smtp_connects.value()
+    sender = OutboxSender(batch_size=50)
+    assert await sender.send_due() == 11
+    await sender.stop()
+
+    assert sorted(smtp_sink.recipients) == sorted(recipients)
+    assert len(smtp_sink.connections) == 1
+    assert email_outbox.smtp_connects.value() - connects == 1
+
+async def test_two_senders_never_send_the_same_row(session_factory, smtp_sink, plain_emails):
+    recipients = [f"user{n}@example.com" for n in range(40)]
+    await _enqueue_plain(session_factory, *recipients)
+    smtp_sink.delay = 0.005  # keep both senders busy at the same time
+    senders = [OutboxSender(batch_size=5), OutboxSender(batch_size=5)]
+
+    async def drain(sender):
+        handled = 0
+        while True:
+            count = await sender.send_due()
+            if not count:
+                return handled
+            handled += count
+
+    handled = await asyncio.gather(*(drain(sender) for sender in senders))
+    for sender in senders:
+        await sender.stop()
+
+    assert sum(handled) == len(recipients)
+    assert all(handled)  # both took part
+    assert sorted(smtp_sink.recipients) == sorted(recipients)
+    rows = await _rows(session_factory)
+    assert {row.status for row in rows.values()} == {SENT}
+    assert {row.attempts for row in rows.values()} == {1}
+
+async def test_stale_candidates_cannot_take_claimed_rows(session_factory, plain_emails):
+    await _enqueue_plain(session_factory, *(f"user{n}@example.com" for n in range(10)))
+    first, second = OutboxSender(batch_size=10), OutboxSender(batch_size=10)
+    second_selected, first_claimed = asyncio.Event(), asyncio.Event()
+
+    async with first._async_session() as first_session, second._async_session() as second_session:
+        execute = second_session.execute
+
+        async def execute_after_first_claim(*args, **kwargs):
+            result = await execute(*args, **kwargs)
+            if not second_selected.is_set():
+                # The second sender has picked its candidates; the first
+                # sender claims the same rows before it gets to update them
+                second_selected.set()
+                await first_claimed.wait()
+            return result
+
+        second_session.execute = execute_after_first_claim
+        second_claim = asyncio.create_task(second._claim(second_session))
+        await second_selected.wait()
+        first_rows = await first._claim(first_session)
+        first_claimed.set()
+        second_rows = await second_claim
+
+    assert len(first_rows) == 10
+    assert second_rows == []
+    rows = await _rows(session_factory)
+    assert {row.claimed_by for row in rows.values()} == {first_rows[0].claimed_by}
+
+async def test_slow_batch_renews_its_lease(session_factory, smtp_sink, plain_emails, monkeypatch):
+    recipients = [f"user{n}@example.com" for n in range(8)]
+    await _enqueue_plain(session_factory, *recipients)
+    # The batch takes about twice the lease
+    monkeypatch.setattr(email_outbox, "OUTBOX_LEASE_SECONDS", 0.2)
+    smtp_sink.delay = 0.05
+    slow, other = OutboxSender(batch_size=8), OutboxSender(batch_size=8)
+
+    sending = asyncio.Event()
+    send = slow.smtp.send
+
+    async def send_and_signal(message):
+        sending.set()
+        await send(message)
+
+    monkeypatch.setattr(slow.smtp, "send", send_and_signal)
+    batch = asyncio.create_task(slow.send_due())
+    await sending.wait()
+    taken = 0
+    while not batch.done():
+        taken += await other.send_due()
+        await asyncio.sleep(0.02)
+
+    assert await batch == len(recipients)
+    assert taken == 0
+    await slow.stop()
+    await other.stop()
+    assert sorted(smtp_sink.recipients) == sorted(recipients)
+    rows = await _rows(session_factory)
+    assert {row.status for row in rows.values()} == {SENT}
+
+async def test_result_is_not_recorded_for_reclaimed_rows(session_factory, plain_emails, monkeypatch):
+    await _enqueue_plain(session_factory, "first@example.com", "second@example.com")
+    sender = OutboxSender(batch_size=2)
+    sent = []
+
+    async def send(message):
+        sent.append(message["To"])
+        if len(sent) == 1:
+            # The lease ran out unnoticed (e.g. the process was suspended);
+            # another worker claims the second row
+            async with session_factory() as session:
+                await session.execute(
+                    update(EmailOutbox).where(EmailOutbox.recipient == "second@example.com")
+                    .values(claimed_by="other-sender", locked_until=datetime.now() + timedelta(minutes=5))
+                )
+                await session.commit()
+
+    monkeypatch.setattr(sender.smtp, "send", send)
+    await sender.send_due()
+
+    rows = await _rows(session_factory)
+    assert rows["first@example.com"].status == SENT
+    # Left to the sender that holds it now
+    assert rows["second@example.com"].status == email_outbox.SENDING
+    assert rows["second@example.com"].claimed_by == "other-sender"
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import update
+
+from app.models.schemas import Event, EventChange
+from app.services import event_changes
+from app.services.autocomplete import autocomplete_index, build_autocomplete_index
+from app.services.event_changes import EventChangeFeed, notify_events_changed
+
+async def _add_event(session_factory, title):
+    async with session_factory() as session:
+        event = Event(eventbrite_id=title, title=title, start_time=datetime.now() + timedelta(days=1), url="https://example.com")
+        session.add(event)
+        await session.commit()
+        return event.id
+
+async def _change_in_other_worker(session_factory, event_id, title):
+    async with session_factory() as session:
+        await session.execute(update(Event).where(Event.id == event_id).values(title=title))
+        session.add(EventChange(event_id=event_id, origin="other-worker"))
+        await session.commit()
+
+def _titles(query):
+    return [suggestion["text"] for suggestion in autocomplete_index.suggest(query)]
+
+async def test_changes_of_other_workers_reach_the_index(session_factory):
+    event_id = await _add_event(session_factory, "Chennai Tech Meetup")
+    await build_autocomplete_index()
+    feed = EventChangeFeed()
+    await feed.start()
+
+    await _change_in_other_worker(session_factory, event_id, "Madurai Startup Night")
+    assert _titles("chennai") == ["Chennai Tech Meetup"]
+    assert await feed.poll() == 1
+    assert _titles("chennai") == []
+    assert _titles("madurai") == ["Madurai Startup Night"]
+
+    # A change is replayed once
+    assert await feed.poll() == 0
+    await feed.stop()
+
+async def test_own_changes_are_not_replayed(session_factory, monkeypatch):
+    event_id = await _add_event(session_factory, "Chennai Tech Meetup")
+    feed = EventChangeFeed()
+    await feed.start()
+    replayed = []
+
+    async def dispatch(ids):
+        replayed.append(ids)
+
+    await notify_events_changed([event_id])
+    monkeypatch.setattr(event_changes, "_dispatch", dispatch)
+    assert await feed.poll() == 1
+    assert replayed == []
+    await feed.stop()
+
+async def test_late_commits_with_lower_ids_are_not_missed(session_factory):
+    event_id = await _add_event(session_factory, "Chennai Tech Meetup")
+    await build_autocomplete_index()
+    feed = EventChangeFeed()
+    await feed.start()
+
+    # Change 5 becomes visible first; change 4 was inserted before it but commits after the poll
+    async with session_factory() as session:
+        await session.execute(update(Event).where(Event.id == event_id).values(title="Madurai Startup Night"))
+        session.add(EventChange(id=5, event_id=event_id, origin="other-worker"))
+        await session.commit()
+    assert await feed.poll() == 1
+    assert _titles("madurai") == ["Madurai Startup Night"]
+
+    async with session_factory() as session:
+        await session.execute(update(Event).where(Event.id == event_id).values(title="Coimbatore AI Summit"))
+        session.add(EventChange(id=4, event_id=event_id, origin="other-worker"))
+        await session.commit()
+    assert await feed.poll() == 1
+    assert _titles("coimbatore") == ["Coimbatore AI Summit"]
+    await feed.stop()
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app.main import app
+from app.models.schemas import Event
+from app.services.event_query import EventFilterSpec, fetch_event_page
+
+@pytest.fixture
+async def events(session_factory):
+    start = datetime.now() + timedelta(days=1)
+    async with session_factory() as session:
+        for n in range(3):
+            session.add(Event(
+                eventbrite_id=f"eb-{n}", title=f"Founders Meetup {n}", url=f"https://example.com/{n}",
+                start_time=start + timedelta(hours=n), venue_address="Anna Salai, Chennai", is_free=n != 1,
+            ))
+        await session.commit()
+
+async def test_cursor_pages_through_its_own_query(session_factory, events):
+    spec = EventFilterSpec(city="Chennai")
+    async with session_factory() as session:
+        first, total, cursor = await fetch_event_page(session, spec, limit=2)
+        # Same filters, written differently
+        second, _, _ = await fetch_event_page(session, EventFilterSpec(city="chennai", category="all"), limit=2, cursor=cursor)
+    assert total == 3
+    assert len(first) == 2 and len(second) == 1
+    assert not {event.id for event in first} & {event.id for event in second}
+
+async def test_cursor_is_rejected_for_other_filters_or_order(session_factory, events):
+    async with session_factory() as session:
+        _, _, cursor = await fetch_event_page(session, EventFilterSpec(city="Chennai"), limit=1)
+        with pytest.raises(ValueError):
+            await fetch_event_page(session, EventFilterSpec(city="Chennai", is_free="free"), limit=1, cursor=cursor)
+        with pytest.raises(ValueError):
+            await fetch_event_page(session, EventFilterSpec(city="Chennai"), order="start", limit=1, cursor=cursor)
+
+async def test_events_feed_answers_400_for_a_foreign_cursor(events):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        first = await client.get("/api/v1/events", params={"city": "Chennai", "limit": 1})
+        cursor = first.json()["next_cursor"]
+        assert (await client.get("/api/v1/events", params={"city": "Chennai", "limit": 1, "cursor": cursor})).status_code == 200
+        response = await client.get("/api/v1/events", params={"is_free": "paid", "limit": 1, "cursor": cursor})
+    assert response.status_code == 400
@@ -0,0 +1,108 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services.eventbrite_client import EventbriteClient, TokenBucket
+
+class StubEventbrite:
+    """MockTransport handler: replies from a per-event script, then 200 with the event."""
+
+    def __init__(self, script=None, latency: float = 0.0):
+        self.script = script or {}
+        self.latency = latency
+        self.calls = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        event_id = request.url.path.rstrip("/").split("/")[-1]
+        self.calls[event_id] = self.calls.get(event_id, 0) + 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            replies = self.script.get(event_id, [])
+            if self.calls[event_id] <= len(replies):
+                reply = replies[self.calls[event_id] - 1]
+                if isinstance(reply, Exception):
+                    raise reply
+                return reply
+            return httpx.Response(200, json={"id": event_id, "auth": request.headers["Authorization"]})
+        finally:
+            self.in_flight -= 1
+
+def _client(stub, **kwargs):
+    kwargs.setdefault("backoff_seconds", 0.01)
+    return EventbriteClient(
+        base_url="https://eventbrite.test/v3", token="test-token",
+        transport=httpx.MockTransport(stub), **kwargs
+    )
+
+async def test_rate_limited_request_is_retried_after_retry_after():
+    stub = StubEventbrite({"1": [httpx.Response(429, headers={"Retry-After": "0"}, text="slow down")]})
+    async with _client(stub) as client:
+        data = await client.get_event("1")
+
+    assert data == {"id": "1", "auth": "Bearer test-token"}
+    assert stub.calls["1"] == 2
+
+def test_retry_after_header_sets_the_delay():
+    client = EventbriteClient(backoff_seconds=0.5)
+    assert client._retry_delay(0, httpx.Response(429, headers={"Retry-After": "7"})) == 7
+    # Without it: exponential backoff with jitter
+    assert 0.25 <= client._retry_delay(0, httpx.Response(503)) <= 0.75
+    assert 1.0 <= client._retry_delay(2, None) <= 3.0
+
+async def test_server_errors_and_network_errors_are_retried():
+    stub = StubEventbrite({
+        "1": [httpx.Response(503), httpx.Response(502)],
+        "2": [httpx.ConnectError("connection refused")],
+    })
+    async with _client(stub) as client:
+        results = await client.get_events(["1", "2"])
+
+    assert set(results) == {"1", "2"}
+    assert stub.calls == {"1": 3, "2": 2}
+
+async def test_gives_up_after_max_retries():
+    stub = StubEventbrite({"1": [httpx.Response(503)] * 10})
+    async with _client(stub, max_retries=3) as client:
+        results = await client.get_events(["1", "2"])
+
+    assert results == {"2": {"id": "2", "auth": "Bearer test-token"}}
+    assert stub.calls["1"] == 4
+
+async def test_client_errors_are_not_retried():
+    stub = StubEventbrite({"1": [httpx.Response(404, json={"error": "NOT_FOUND"})]})
+    async with _client(stub) as client:
+        assert await client.get_event("1") is None
+    assert stub.calls["1"] == 1
+
+async def test_concurrency_is_bounded():
+    stub = StubEventbrite(latency=0.02)
+    async with _client(stub, max_concurrency=4, requests_per_second=1000, burst=1000) as client:
+        results = await client.get_events(str(n) for n in range(30))
+
+    assert len(results) == 30
+    assert stub.max_in_flight == 4
+
+async def test_token_bucket_limits_the_request_rate():
+    stub = StubEventbrite()
+    async with _client(stub, requests_per_second=50, burst=5) as client:
+        start = time.monotonic()
+        results = await client.get_events(str(n) for n in range(20))
+        elapsed = time.monotonic() - start
+
+    assert len(results) == 20
+    # 5 at once from the burst, then 15 more at 50/s
+    assert elapsed >= 15 / 50 * 0.9
+
+async def test_token_bucket_refills_over_time():
+    bucket = TokenBucket(rate=100, capacity=2)
+    start = time.monotonic()
+    for _ in range(4):
+        await bucket.acquire()
+    # Two from the burst, two after ~10 ms each
+    assert time.monotonic() - start >= 0.015
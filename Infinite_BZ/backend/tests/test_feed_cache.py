@@ -0,0 +1,11 @@
+from urllib.parse import parse_qsl
+
+from app.services.feed_cache import feed_cache_key
+
+def test_equivalent_queries_share_a_key():
+    assert feed_cache_key(page=1, city="Chennai", search="") == feed_cache_key(city=" chennai ", page=1, category="all")
+
+def test_values_cannot_forge_other_filters():
+    forged = feed_cache_key(search="x&source=y")
+    assert forged != feed_cache_key(search="x", source="y")
+    assert parse_qsl(forged) == [("search", "x&source=y")]
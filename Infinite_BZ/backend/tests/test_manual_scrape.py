@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy.future import select
+
+from app import main
+from app.models.schemas import ScrapeJob
+from app.services import scrape_plan, scraper
+
+@pytest.fixture
+async def client(session_factory, monkeypatch):
+    async def no_scraping_here(*args, **kwargs):
+        raise AssertionError("POST /scrape must not scrape in the worker that serves it")
+
+    monkeypatch.setattr(scraper, "scrape_events_playwright", no_scraping_here)
+    # Today's jobs are scheduled later in the day
+    monkeypatch.setattr(scrape_plan, "SCRAPE_WINDOW_START_HOUR", 23)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://test") as client:
+        yield client
+
+async def _jobs(session_factory):
+    async with session_factory() as session:
+        return (await session.execute(select(ScrapeJob))).scalars().all()
+
+async def test_follower_only_makes_todays_jobs_due(client, session_factory, monkeypatch):
+    monkeypatch.setattr(main.app.state, "leader", SimpleNamespace(is_leader=False), raising=False)
+    response = await client.post("/scrape")
+
+    assert response.status_code == 202
+    jobs = await _jobs(session_factory)
+    assert jobs
+    assert all(job.status == scrape_plan.PENDING and job.scheduled_at <= datetime.now() for job in jobs)
+
+async def test_leader_brings_its_scrape_tick_forward(client, session_factory, monkeypatch):
+    scheduler = AsyncIOScheduler()
+    scheduler.add_job(lambda: None, "interval", minutes=main.SCRAPE_TICK_MINUTES, id=main.SCRAPE_JOB_ID,
+                      next_run_time=datetime.now() + timedelta(hours=1))
+    scheduler.start(paused=True)
+    monkeypatch.setattr(main.app.state, "leader", SimpleNamespace(is_leader=True), raising=False)
+    monkeypatch.setattr(main.app.state, "scheduler", scheduler, raising=False)
+    try:
+        response = await client.post("/scrape")
+        assert response.status_code == 202
+        next_run = scheduler.get_job(main.SCRAPE_JOB_ID).next_run_time.replace(tzinfo=None)
+        assert next_run <= datetime.now()
+    finally:
+        scheduler.shutdown(wait=False)
+
+    # The jobs themselves are claimed and run by the leader's tick
+    assert {job.status for job in await _jobs(session_factory)} == {scrape_plan.PENDING}
@@ -0,0 +1,85 @@
+import glob
+import os
+from datetime import datetime
+from email.message import EmailMessage
+from io import BytesIO
+
+import httpx
+import pytest
+from pypdf import PdfReader
+from sqlalchemy.future import select
+
+from app.auth import get_current_user
+from app.core import email_utils
+from app.main import app
+from app.models.schemas import EmailOutbox, Event, User
+from app.services import ticket_service
+from app.services.email_outbox import EVENT_TICKET, MESSAGE_BUILDERS, PENDING
+
+USER = User(id=1, email="alice@example.com", full_name="Alice Example", hashed_password="x")
+
+@pytest.fixture
+async def client(session_factory, monkeypatch):
+    monkeypatch.setattr(email_utils, "ENABLE_EMAIL", True)
+    monkeypatch.setattr(email_utils, "MAIL_FROM", "noreply@infinitebz.com")
+    app.dependency_overrides[get_current_user] = lambda: USER
+    async with session_factory() as session:
+        session.add(Event(
+            id=1, eventbrite_id="native-1", title="Ticket Summit", url="https://infinitebz.com/events/1",
+            start_time=datetime(2026, 3, 14, 9, 30), venue_name="Chennai Trade Centre", organizer_name="Infinite BZ"
+        ))
+        await session.commit()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+    app.dependency_overrides.clear()
+    ticket_service.shutdown_ticket_pool()
+
+async def test_registration_is_saved_without_rendering_the_ticket(client, session_factory, monkeypatch):
+    def no_rendering_in_the_request():
+        raise AssertionError("the ticket must not be rendered during registration")
+
+    monkeypatch.setattr(ticket_service, "_get_pool", no_rendering_in_the_request)
+    response = await client.post("/api/v1/events/1/register", json={})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "SUCCESS" and body["email_status"] == "QUEUED"
+    async with session_factory() as session:
+        [row] = (await session.execute(select(EmailOutbox))).scalars().all()
+    assert row.status == PENDING and row.recipient == USER.email
+    assert row.payload["confirmation_id"] == body["confirmation_id"]
+
+async def test_download_and_email_attach_the_same_ticket(client, session_factory):
+    response = await client.post("/api/v1/events/1/register", json={})
+    confirmation_id = response.json()["confirmation_id"]
+
+    download = await client.get("/api/v1/user/registrations/1/ticket")
+    assert download.status_code == 200
+    assert download.headers["content-type"] == "application/pdf"
+    assert download.content.startswith(b"%PDF")
+
+    async with session_factory() as session:
+        [row] = (await session.execute(select(EmailOutbox))).scalars().all()
+    message: EmailMessage = await MESSAGE_BUILDERS[EVENT_TICKET](row)
+    [attachment] = list(message.iter_attachments())
+    assert attachment.get_content() == download.content
+
+    # Rendered once and stored; the download serves the stored file
+    [stored] = glob.glob(os.path.join(ticket_service.TICKET_DIR, f"ticket_{confirmation_id}_*.pdf"))
+    assert ticket_service._load(stored).pdf == download.content
+    assert (await client.get("/api/v1/user/registrations/1/ticket")).content == download.content
+
+async def test_edited_event_gets_a_new_ticket(client, session_factory):
+    await client.post("/api/v1/events/1/register", json={})
+    before = await client.get("/api/v1/user/registrations/1/ticket")
+
+    async with session_factory() as session:
+        event = await session.get(Event, 1)
+        event.start_time = datetime(2026, 3, 21, 9, 30)
+        await session.commit()
+    after = await client.get("/api/v1/user/registrations/1/ticket")
+
+    assert after.content != before.content
+    assert "2026-03-21" in PdfReader(BytesIO(after.content)).pages[0].extract_text()
+    # Only the current version is kept
+    assert len(glob.glob(os.path.join(ticket_service.TICKET_DIR, "*.pdf"))) == 1
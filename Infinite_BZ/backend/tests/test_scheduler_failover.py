@@ -0,0 +1,119 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from app import main
+from app.models.schemas import ScrapeJob
+from app.services import scrape_plan, scraper
+
+@pytest.fixture
+def fake_scraper(monkeypatch):
+    """scrape_events_playwright that blocks until `release` is set."""
+    state = {"calls": 0, "started": asyncio.Event(), "release": asyncio.Event()}
+
+    async def scrape_events_playwright(city, category, page=1):
+        state["calls"] += 1
+        state["started"].set()
+        await state["release"].wait()
+        return []
+
+    monkeypatch.setattr(scraper, "scrape_events_playwright", scrape_events_playwright)
+    return state
+
+@pytest.fixture
+def fake_browser_pool(monkeypatch):
+    """Counts Chromium launches and closes instead of starting one."""
+    state = {"starts": 0, "stops": 0}
+
+    async def start():
+        state["starts"] += 1
+
+    async def stop():
+        state["stops"] += 1
+
+    monkeypatch.setattr(main.browser_pool, "start", start)
+    monkeypatch.setattr(main.browser_pool, "stop", stop)
+    return state
+
+async def _jobs(session_factory):
+    async with session_factory() as session:
+        return (await session.execute(select(ScrapeJob))).scalars().all()
+
+async def test_takeover_does_not_rerun_the_old_leaders_jobs(session_factory, fake_scraper, fake_browser_pool):
+    scheduler_a, scheduler_b = AsyncIOScheduler(), AsyncIOScheduler()
+    scheduler_a.start(paused=True)
+    scheduler_b.start(paused=True)
+    # Both workers compete for the same lock file (cwd is the test's tmp dir)
+    leader_a = main.scheduler_leader(scheduler_a)
+    leader_b = main.scheduler_leader(scheduler_b)
+    await leader_a.start()
+    await leader_b.start()
+    assert leader_a.is_leader and not leader_b.is_leader
+
+    # The leader is in the middle of today's scrape job
+    old_run = asyncio.create_task(main.scheduled_scraper_task(force=True))
+    await asyncio.wait_for(fake_scraper["started"].wait(), 5)
+    [job] = await _jobs(session_factory)
+    assert job.status == scrape_plan.RUNNING
+
+    # It loses the lock (e.g. its lock connection dropped) and steps down
+    await leader_a.lock.release()
+    await leader_a._tick()
+    assert not leader_a.is_leader
+    with pytest.raises(asyncio.CancelledError):
+        await old_run
+
+    # The follower takes over; the claimed job is not handed out again
+    await leader_b._tick()
+    assert leader_b.is_leader
+    [job] = await _jobs(session_factory)
+    assert job.status == scrape_plan.RUNNING
+    assert await scrape_plan.run_due_jobs(force=True) == 0
+    assert fake_scraper["calls"] == 1
+
+    # Once the abandoned claim is stale, the new leader retries it
+    async with session_factory() as session:
+        await session.execute(
+            update(ScrapeJob).values(started_at=datetime.now() - scrape_plan.STALE_AFTER * 2)
+        )
+        await session.commit()
+    fake_scraper["release"].set()
+    assert await scrape_plan.run_due_jobs(force=True) == 1
+    [job] = await _jobs(session_factory)
+    assert job.status == scrape_plan.DONE
+    assert job.attempts == 2
+    assert fake_scraper["calls"] == 2
+
+    await leader_b.stop()
+    await leader_a.stop()
+    scheduler_a.shutdown(wait=False)
+    scheduler_b.shutdown(wait=False)
+
+async def test_only_the_leader_runs_chromium(db, fake_browser_pool):
+    scheduler_a, scheduler_b = AsyncIOScheduler(), AsyncIOScheduler()
+    scheduler_a.start(paused=True)
+    scheduler_b.start(paused=True)
+    leader_a = main.scheduler_leader(scheduler_a)
+    leader_b = main.scheduler_leader(scheduler_b)
+    await leader_a.start()
+    await leader_b.start()
+    await asyncio.sleep(0)
+    assert fake_browser_pool == {"starts": 1, "stops": 0}
+
+    # The leader steps down and closes its browser; the follower launches one
+    await leader_a.lock.release()
+    await leader_a._tick()
+    assert fake_browser_pool == {"starts": 1, "stops": 1}
+    await leader_b._tick()
+    await asyncio.sleep(0)
+    assert fake_browser_pool == {"starts": 2, "stops": 1}
+
+    await leader_b.stop()
+    await leader_a.stop()
+    assert fake_browser_pool == {"starts": 2, "stops": 2}
+    scheduler_a.shutdown(wait=False)
+    scheduler_b.shutdown(wait=False)
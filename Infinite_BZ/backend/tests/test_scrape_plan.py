@@ -0,0 +1,84 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func, update
+from sqlalchemy.future import select
+
+from app.models.schemas import ScrapeJob
+from app.services import scrape_plan, scraper
+
+@pytest.fixture
+async def jobs(session_factory):
+    async with session_factory() as session:
+        for page in range(1, 7):
+            session.add(ScrapeJob(
+                run_date="2026-03-14", city="chennai", category="business--events", page=page,
+                scheduled_at=datetime.now() - timedelta(minutes=page)
+            ))
+        await session.commit()
+
+@pytest.fixture
+def fake_scraper(monkeypatch, session_factory):
+    """Records each scrape and how many jobs were RUNNING while it ran."""
+    state = {"scraped": [], "max_running": 0, "during": None}
+
+    async def scrape_events_playwright(city, category, page=1):
+        state["scraped"].append(page)
+        async with session_factory() as session:
+            running = await session.scalar(
+                select(func.count()).select_from(ScrapeJob).where(ScrapeJob.status == scrape_plan.RUNNING)
+            )
+        state["max_running"] = max(state["max_running"], running)
+        if state["during"]:
+            await state["during"](page)
+        await asyncio.sleep(0.01)
+        return []
+
+    monkeypatch.setattr(scraper, "scrape_events_playwright", scrape_events_playwright)
+    return state
+
+async def _statuses(session_factory):
+    async with session_factory() as session:
+        result = await session.execute(select(ScrapeJob).order_by(ScrapeJob.page))
+        return {job.page: job for job in result.scalars().all()}
+
+async def test_concurrent_runs_never_run_a_job_twice(session_factory, jobs, fake_scraper):
+    # e.g. the scheduler tick and POST /scrape at the same time
+    ran = await asyncio.gather(scrape_plan.run_due_jobs(), scrape_plan.run_due_jobs(force=True))
+
+    assert sum(ran) == 6
+    assert sorted(fake_scraper["scraped"]) == [1, 2, 3, 4, 5, 6]
+    jobs = await _statuses(session_factory)
+    assert {job.status for job in jobs.values()} == {scrape_plan.DONE}
+    assert {job.attempts for job in jobs.values()} == {1}
+
+async def test_claimed_job_is_not_claimed_again(session_factory, jobs):
+    first = await scrape_plan._claim_due_job(True, set())
+    second = await scrape_plan._claim_due_job(True, set())
+    assert first.id != second.id
+    assert first.status == second.status == scrape_plan.RUNNING
+
+async def test_only_running_jobs_are_claimed(session_factory, jobs, fake_scraper, monkeypatch):
+    monkeypatch.setattr(scrape_plan, "SCRAPE_CONCURRENCY", 2)
+    assert await scrape_plan.run_due_jobs(force=True) == 6
+    # Never more claimed than there are workers running them
+    assert fake_scraper["max_running"] == 2
+
+async def test_result_is_not_recorded_after_losing_the_claim(session_factory, jobs, fake_scraper, monkeypatch):
+    monkeypatch.setattr(scrape_plan, "SCRAPE_CONCURRENCY", 1)
+    reclaimed_at = datetime.now() + timedelta(hours=1)
+
+    async def reclaimed_by_another_worker(page):
+        # The job outlived STALE_AFTER and another worker claimed it
+        if page == 1:
+            async with session_factory() as session:
+                await session.execute(update(ScrapeJob).where(ScrapeJob.page == 1).values(started_at=reclaimed_at))
+                await session.commit()
+
+    fake_scraper["during"] = reclaimed_by_another_worker
+    await scrape_plan.run_due_jobs(force=True)
+
+    jobs = await _statuses(session_factory)
+    assert jobs[1].status == scrape_plan.RUNNING and jobs[1].started_at == reclaimed_at
+    assert all(jobs[page].status == scrape_plan.DONE for page in range(2, 7))
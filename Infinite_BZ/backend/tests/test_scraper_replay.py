@@ -0,0 +1,101 @@
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy.future import select
+
+from app.models.schemas import Event
+from app.services.event_ingest import upsert_events
+from app.services.eventbrite_client import EVENTBRITE_API_URL
+from app.services.replay_store import ReplayStore, configure_replay
+from app.services.scraper import scrape_events_playwright, search_page_url
+
+CITY, CATEGORY = "chennai", "business--events"
+START = (datetime.now() + timedelta(days=30)).replace(hour=18, minute=0, second=0, microsecond=0)
+
+def api_payload(event_id: str, title: str, venue_address=None) -> dict:
+    return {
+        "id": event_id,
+        "name": {"text": title},
+        "description": {"text": f"About {title}"},
+        "start": {"local": START.isoformat(), "timezone": "Asia/Kolkata"},
+        "end": {"local": (START + timedelta(hours=2)).isoformat(), "timezone": "Asia/Kolkata"},
+        "url": f"https://www.eventbrite.com/e/event-{event_id}",
+        "is_free": venue_address is None,
+        "online_event": venue_address is None,
+        "venue": {"name": "Trade Centre", "address": {"localized_address_display": venue_address}} if venue_address else None,
+        "organizer": {"name": "Chennai Founders"},
+    }
+
+CORPUS = {
+    "1001": api_payload("1001", "Founders Breakfast", "Nandambakkam, Chennai"),
+    "1002": api_payload("1002", "AI Product Night", "Anna Nagar, Chennai"),
+    "1003": api_payload("1003", "Remote Growth Workshop"),
+}
+# On the page but never recorded: the replayed API answers 404 and the card is skipped
+UNRECORDED_ID = "1004"
+
+def record(store: ReplayStore, payloads: dict):
+    """Saves what a record run of the page would have captured."""
+    cards = "".join(
+        f'<section class="event-card-details"><a class="event-card-link" '
+        f'href="https://www.eventbrite.com/e/event-{event_id}">{event_id}</a></section>'
+        for event_id in [*payloads, UNRECORDED_ID]
+    )
+    store.save_page(search_page_url(CITY, CATEGORY), f"<html><body>{cards}</body></html>")
+    for event_id, payload in payloads.items():
+        # The same URL EventbriteClient.get_event requests
+        url = httpx.URL(f"{EVENTBRITE_API_URL}/events/{event_id}/", params={"expand": "venue,ticket_classes,organizer"})
+        body = httpx.Response(200, json=payload).content
+        store.save_response(httpx.Request("GET", url), httpx.Response(200, headers={"content-type": "application/json"}), body)
+
+@pytest.fixture
+def replay_corpus(workdir):
+    path = str(workdir / "replay_store")
+    record(ReplayStore(path, "record"), CORPUS)
+    configure_replay("replay", path)
+    yield path
+    configure_replay("off")
+
+async def _scrape_and_upsert(session_factory):
+    rows = await scrape_events_playwright(CITY, CATEGORY, skip_fresh=False)
+    async with session_factory() as session:
+        return rows, await upsert_events(session, rows)
+
+async def _events(session_factory):
+    async with session_factory() as session:
+        result = await session.execute(select(Event).order_by(Event.eventbrite_id))
+        return {event.eventbrite_id: event for event in result.scalars().all()}
+
+async def test_replayed_scrape_inserts_then_leaves_unchanged(session_factory, replay_corpus):
+    rows, counts = await _scrape_and_upsert(session_factory)
+    assert sorted(row["eventbrite_id"] for row in rows) == sorted(CORPUS)
+    assert counts == {"inserted": 3, "updated": 0, "unchanged": 0}
+
+    events = await _events(session_factory)
+    assert set(events) == set(CORPUS)
+    breakfast = events["1001"]
+    assert breakfast.title == "Founders Breakfast"
+    assert breakfast.start_time == START
+    assert breakfast.venue_name == "Trade Centre"
+    assert breakfast.organizer_name == "Chennai Founders"
+    assert breakfast.latitude is not None and breakfast.longitude is not None
+    online = events["1003"]
+    assert online.online_event and online.is_free and online.latitude is None
+
+    # Replaying the same corpus changes nothing
+    _, counts = await _scrape_and_upsert(session_factory)
+    assert counts == {"inserted": 0, "updated": 0, "unchanged": 3}
+
+async def test_replayed_scrape_updates_changed_events(session_factory, replay_corpus):
+    await _scrape_and_upsert(session_factory)
+
+    # A later recording where one event was renamed
+    changed = dict(CORPUS, **{"1002": api_payload("1002", "AI Product Night (Sold Out)", "Anna Nagar, Chennai")})
+    record(ReplayStore(replay_corpus, "record"), changed)
+
+    _, counts = await _scrape_and_upsert(session_factory)
+    assert counts == {"inserted": 0, "updated": 1, "unchanged": 2}
+    events = await _events(session_factory)
+    assert events["1002"].title == "AI Product Night (Sold Out)"
+    assert events["1001"].title == "Founders Breakfast"
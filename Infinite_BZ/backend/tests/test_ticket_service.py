@@ -0,0 +1,95 @@
+import base64
+import os
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from pypdf import PdfReader
+from pypdf.generic import ContentStream
+
+from app.services import ticket_service
+from app.services.ticket_service import render_ticket
+
+EVENT = {
+    "id": 1,
+    "title": "Chennai Startup Founders Summit",
+    "start_time": "2026-03-14 09:30 AM",
+    "venue_name": "Chennai Trade Centre",
+    "organizer_name": "Infinite BZ",
+}
+EMAIL = "attendee@example.com"
+
+def _used_fonts(stream, reader):
+    """Font resource names selected with Tf in a content stream."""
+    content = ContentStream(stream, reader)
+    return {operands[0] for operands, operator in content.operations if operator == b"Tf"}
+
+def test_every_font_in_a_stamped_ticket_resolves():
+    pdf, _ = render_ticket(EVENT, "attendee@example.com", "SELF-1760000000-ABC123", "Attendee")
+    reader = PdfReader(BytesIO(pdf))
+    page = reader.pages[0]
+
+    page_fonts = page["/Resources"]["/Font"].get_object()
+    assert _used_fonts(page.get_contents(), reader) <= set(page_fonts)
+
+    forms = [xobject.get_object() for xobject in page["/Resources"]["/XObject"].values()]
+    assert forms
+    for form in forms:
+        form_fonts = form["/Resources"]["/Font"].get_object()
+        used = _used_fonts(form, reader)
+        # The header emoji is drawn with reportlab's ZapfDingbats fallback
+        assert "/ZapfDingbats" in {form_fonts[name].get_object()["/BaseFont"] for name in used}
+        assert used <= set(form_fonts)
+
+def test_stamped_ticket_carries_attendee_fields():
+    pdf, qr_base64 = render_ticket(EVENT, "attendee@example.com", "SELF-1760000000-ABC123", "Attendee Name")
+    text = PdfReader(BytesIO(pdf)).pages[0].extract_text()
+    assert "SELF-1760000000-ABC123" in text
+    assert "Attendee Name" in text
+    assert "EVENT DETAILS" in text
+    assert qr_base64
+
+def _store_all(worker: int, confirmation_ids):
+    """Stores every ticket with this worker's own bytes; returns what each _store kept."""
+    pdf = bytes([worker]) * 200_000
+    return [ticket_service._store(ticket_service.ticket_path(cid, EVENT, EMAIL), pdf, QR_BASE64).pdf[:1] for cid in confirmation_ids]
+
+QR_BASE64 = base64.b64encode(b"png").decode("utf-8")
+
+def test_store_keeps_the_first_ticket(workdir):
+    path = ticket_service.ticket_path("SELF-1-ABC", EVENT, EMAIL)
+    first = ticket_service._store(path, b"%PDF first", QR_BASE64)
+    second = ticket_service._store(path, b"%PDF second", QR_BASE64)
+
+    assert first.pdf == second.pdf == b"%PDF first"
+    assert ticket_service._load(path).pdf == b"%PDF first"
+    stem = os.path.basename(path)[:-len(".pdf")]
+    assert sorted(os.listdir(workdir / ticket_service.TICKET_DIR)) == [stem + ".pdf", stem + ".png"]
+
+def test_concurrent_stores_from_several_processes_agree(workdir):
+    confirmation_ids = [f"SELF-1-{n:06X}" for n in range(30)]
+    with ProcessPoolExecutor(max_workers=6) as pool:
+        results = list(pool.map(_store_all, range(1, 7), [confirmation_ids] * 6))
+
+    for index, cid in enumerate(confirmation_ids):
+        kept = {result[index] for result in results}
+        # Every process got the same ticket back: the one that is stored
+        assert len(kept) == 1
+        stored = ticket_service._load(ticket_service.ticket_path(cid, EVENT, EMAIL))
+        assert stored.pdf == kept.pop() * 200_000
+    assert not [name for name in os.listdir(workdir / ticket_service.TICKET_DIR) if name.endswith(".tmp")]
+
+def test_changed_event_gets_a_new_ticket(workdir):
+    path = ticket_service.ticket_path("SELF-1-ABC", EVENT, EMAIL)
+    ticket_service._store(path, b"%PDF old", QR_BASE64)
+    # Another registration whose id extends this one is not touched
+    other = ticket_service.ticket_path("SELF-1-ABC-2", EVENT, EMAIL)
+    ticket_service._store(other, b"%PDF other", QR_BASE64)
+
+    moved = ticket_service.ticket_path("SELF-1-ABC", {**EVENT, "start_time": "2026-03-21 09:30 AM"}, EMAIL)
+    assert moved != path
+    assert ticket_service._load(moved) is None
+    ticket_service._store(moved, b"%PDF new", QR_BASE64)
+
+    assert ticket_service._load(moved).pdf == b"%PDF new"
+    assert ticket_service._load(path) is None
+    assert ticket_service._load(other).pdf == b"%PDF other"